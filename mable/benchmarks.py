@@ -0,0 +1,835 @@
+"""
+Benchmarks for performance critical parts of the simulation.
+
+All benchmarks are functions with keyword arguments only that return a dict of the measured values. They can be run
+via the command line with 'mable benchmark <name>'.
+"""
+import collections
+import concurrent.futures
+import copy
+import math
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+import tracemalloc
+
+import networkx
+import numpy as np
+
+from mable.combinatorial_auction import BundleWinnerDetermination
+from mable.engine import SimulationEngine
+from mable.event_management import EventQueue
+from mable.extensions import world_ports
+from mable.extensions.routing_graph import CsrRoutingGraph
+from mable.extensions.cargo_distributions import DistributionShipping, DistributionClassFactory
+from mable.shipping_market import StaticShipping
+from mable.simulation_environment import World
+from mable.simulation_space.structure import ShippingNetwork, UnitShippingNetwork
+from mable.simulation_space.universe import Location, Port
+from mable.transport_operation import BundleBid
+
+
+def get_distribution_world(environment_files_path=".", seed=0):
+    """
+    A world with the real world ports but without routes.
+
+    :param environment_files_path: The directory of the environment files, i.e. 'ports.csv'.
+    :type environment_files_path: str
+    :param seed: The seed of the world's random.
+    :type seed: int
+    :return: The world.
+    :rtype: World
+    """
+    ports = world_ports.get_ports(os.path.join(environment_files_path, "ports.csv"))
+    network = world_ports.LatLongShippingNetwork(ports)
+    world = World(network, EventQueue(), np.random.RandomState(seed))
+    return world
+
+
+def get_distribution_shipping(world, trades_per_occurrence, num_auctions=1, trade_occurrence_frequency=30,
+                              environment_files_path=".", **kwargs):
+    """
+    A distribution shipping based on the distribution files without route restrictions. The shipping is part of an
+    engine without companies and market.
+
+    :param world: The world.
+    :type world: World
+    :param trades_per_occurrence: The number of trades per auction.
+    :type trades_per_occurrence: int
+    :param num_auctions: The number of auctions.
+    :type num_auctions: int
+    :param trade_occurrence_frequency: The number of days between each auction.
+    :type trade_occurrence_frequency: int
+    :param environment_files_path: The directory of the distribution files.
+    :type environment_files_path: str
+    :param kwargs: Further arguments of the shipping, e.g. 'lazy_trades'.
+    :return: The shipping.
+    :rtype: DistributionShipping
+    """
+    shipping = DistributionShipping(
+        world=world,
+        class_factory=DistributionClassFactory(),
+        trade_occurrence_frequency=trade_occurrence_frequency,
+        trades_per_occurrence=trades_per_occurrence,
+        simulation_length=(num_auctions - 1) * trade_occurrence_frequency,
+        precomputed_routes_file=None,
+        port_transition_duration_distributions_path=os.path.join(
+            environment_files_path, "time_transition_distribution.csv"),
+        port_cargo_weight_distribution_path=os.path.join(
+            environment_files_path, "port_cargo_weight_distribution.csv"),
+        port_trade_frequency_distribution_path=os.path.join(
+            environment_files_path, "port_trade_frequency_distribution.csv"),
+        **kwargs)
+    _set_up_engine(world, shipping)
+    return shipping
+
+
+def _set_up_engine(world, shipping):
+    """
+    Puts the world and the shipping into an engine without companies and market.
+    """
+    engine = SimulationEngine(world, [], shipping, None, DistributionClassFactory())
+    world.set_engine(engine)
+    shipping.set_engine(engine)
+    return engine
+
+
+def benchmark_combinatorial_auction(num_trades=100, num_bundles=300, num_companies=5, max_bundle_size=4,
+                                    time_budget=1, seed=0, environment_files_path="."):
+    """
+    Winner determination and payment computation on synthetic bundle bids for trades from the cargo distributions.
+
+    Every bundle is a random set of trades with an amount that is sub-additive in the number of trades.
+
+    :return: The number of bundles, the runtime of the greedy start, the runtime with payments and the number of
+        allocated trades and cost of the greedy start and the final allocation.
+    :rtype: dict
+    """
+    world = get_distribution_world(environment_files_path, seed)
+    shipping = get_distribution_shipping(world, num_trades, environment_files_path=environment_files_path)
+    trades = shipping.get_trades(0)
+    companies = [f"Company {i}" for i in range(num_companies)]
+    rates = world.random.uniform(0.5, 1.5, size=(num_companies, len(trades)))
+    bundle_bids = []
+    for _ in range(num_bundles):
+        company_idx = world.random.randint(num_companies)
+        bundle_size = world.random.randint(1, max_bundle_size + 1)
+        trade_indices = world.random.choice(len(trades), bundle_size, replace=False)
+        amount = sum(trades[i].amount * rates[company_idx, i] for i in trade_indices) * 0.85 ** (bundle_size - 1)
+        bundle_bids.append(BundleBid(
+            amount=amount, trades=[trades[i] for i in trade_indices], company=companies[company_idx]))
+    winner_determination = BundleWinnerDetermination(bundle_bids, trades)
+    start = time.perf_counter()
+    greedy_result = winner_determination.solve(time_budget=0)
+    greedy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result, _ = winner_determination.determine_payments(time_budget=time_budget)
+    full_time = time.perf_counter() - start
+    benchmark_results = {
+        "bundles": len(bundle_bids),
+        "greedy time [s]": greedy_time,
+        "greedy allocated trades": greedy_result.number_allocated_trades,
+        "greedy cost": greedy_result.cost,
+        "time incl. payments [s]": full_time,
+        "allocated trades": result.number_allocated_trades,
+        "cost": result.cost,
+    }
+    return benchmark_results
+
+
+def benchmark_trade_realisation(num_trades=10000, seed=0, environment_files_path="."):
+    """
+    Realisation of trades with random probabilities in one trading time compared to one draw per trade.
+
+    :return: The number of trades, the runtime of one draw per trade with a list based search for the not realised
+        trades, the runtime of :py:func:`Shipping.get_trades` and if both realised the same trades.
+    :rtype: dict
+    """
+    world = get_distribution_world(environment_files_path, seed)
+    input_random = np.random.RandomState(seed + 1)
+    ports = world.network.ports
+    port_indices = input_random.randint(len(ports), size=(num_trades, 2))
+    probabilities = input_random.uniform(size=num_trades)
+    fixed_trades = [
+        {"origin_port": ports[i].name, "destination_port": ports[j].name, "amount": 1,
+         "time": 0, "probability": p}
+        for (i, j), p in zip(port_indices, probabilities)]
+    shipping = StaticShipping(fixed_trades=fixed_trades, world=world, class_factory=DistributionClassFactory())
+    _set_up_engine(world, shipping)
+    trades = shipping._all_trades[0]
+    random_per_trade = np.random.RandomState(seed)
+    start = time.perf_counter()
+    realised_per_trade = [t for t in trades if random_per_trade.choice([0, 1], p=[1 - t.probability, t.probability])]
+    not_realised_per_trade = [t for t in trades if t not in realised_per_trade]
+    per_trade_time = time.perf_counter() - start
+    start = time.perf_counter()
+    realised = shipping.get_trades(0)
+    realisation_time = time.perf_counter() - start
+    benchmark_results = {
+        "trades": len(trades),
+        "one draw per trade and list search [s]": per_trade_time,
+        "get_trades [s]": realisation_time,
+        "realised trades": len(realised),
+        "not realised trades": len(not_realised_per_trade),
+        "same realisation": len(realised) == len(realised_per_trade) and all(
+            a is b for a, b in zip(realised, realised_per_trade)),
+    }
+    return benchmark_results
+
+
+def _get_synthetic_precomputed_routes(ports, random):
+    """
+    Precomputed routes for all pairs of ports in one direction with a straight route and a random length.
+    """
+    precomputed_routes = {}
+    for i, port_one in enumerate(ports):
+        for port_two in ports[i + 1:]:
+            route = world_ports.Route(
+                "", [(port_one.longitude, port_one.latitude), (port_two.longitude, port_two.latitude)],
+                float(random.randint(1, 10000)), [])
+            precomputed_routes[f"{port_one.name}{port_two.name}"] = [route]
+    return precomputed_routes
+
+
+def benchmark_distance_lookup(num_ports=485, num_queries=100000, seed=0, environment_files_path="."):
+    """
+    Port to port distances via the precomputed routes compared to the distance matrix.
+
+    The routes are synthetic routes for the first ports of 'ports.csv'.
+
+    :return: The number of ports, the time to build the distance matrix, the runtimes of the queries and if both
+        returned the same distances.
+    :rtype: dict
+    """
+    ports = world_ports.get_ports(os.path.join(environment_files_path, "ports.csv"))[:num_ports]
+    random = np.random.RandomState(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        precomputed_routes_file = os.path.join(directory, "precomputed_routes.pickle")
+        with open(precomputed_routes_file, "wb") as f:
+            pickle.dump(_get_synthetic_precomputed_routes(ports, random), f)
+        distance_matrix_file = os.path.join(directory, "port_distances.npy")
+        network_routes = world_ports.LatLongShippingNetwork(ports, precomputed_routes_file=precomputed_routes_file)
+        start = time.perf_counter()
+        network_matrix = world_ports.LatLongShippingNetwork(
+            ports, precomputed_routes_file=precomputed_routes_file, distance_matrix_file=distance_matrix_file)
+        build_time = time.perf_counter() - start
+        network_routes.set_distance_cache_size(0)
+        network_matrix.set_distance_cache_size(0)
+        pairs = [(ports[i], ports[j]) for i, j in random.randint(len(ports), size=(num_queries, 2))]
+        start = time.perf_counter()
+        distances_routes = [network_routes.get_distance(a, b) for a, b in pairs]
+        routes_time = time.perf_counter() - start
+        start = time.perf_counter()
+        distances_matrix = [network_matrix.get_distance(a, b) for a, b in pairs]
+        matrix_time = time.perf_counter() - start
+        del network_matrix
+    benchmark_results = {
+        "ports": len(ports),
+        "queries": num_queries,
+        "network incl. matrix build [s]": build_time,
+        "precomputed routes [s]": routes_time,
+        "distance matrix [s]": matrix_time,
+        "same distances": distances_routes == distances_matrix,
+    }
+    return benchmark_results
+
+
+def _get_resident_set_size():
+    """
+    The current resident set size of the process in MB (Linux only).
+    """
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def _measure_route_store_loading(precomputed_routes_file, ports_file, num_ports):
+    """
+    Load a route store and return the load time and the increase of the resident set size in MB.
+    Intended to be run in a fresh process.
+    """
+    ports = world_ports.get_ports(ports_file)[:num_ports]
+    rss_before = _get_resident_set_size()
+    start = time.perf_counter()
+    route_store = world_ports.load_route_store(precomputed_routes_file, ports)
+    load_time = time.perf_counter() - start
+    rss_increase = _get_resident_set_size() - rss_before
+    return load_time, rss_increase, len(route_store)
+
+
+def benchmark_route_loading(num_ports=150, routes_per_pair=2, points_per_route=100, seed=0,
+                            environment_files_path="."):
+    """
+    Loading of the precomputed routes from the pickle compared to the columnar format. Every load runs in a fresh
+    process.
+
+    The routes are synthetic routes for the first ports of 'ports.csv'.
+
+    :return: The number of routes and points, the load times and the increases of the resident set size.
+    :rtype: dict
+    """
+    ports_file = os.path.join(environment_files_path, "ports.csv")
+    ports = world_ports.get_ports(ports_file)[:num_ports]
+    random = np.random.RandomState(seed)
+    precomputed_routes = {}
+    for i, port_one in enumerate(ports):
+        for port_two in ports[i + 1:]:
+            precomputed_routes[f"{port_one.name}{port_two.name}"] = [
+                world_ports.Route(
+                    "", [tuple(p) for p in random.uniform(-90, 90, size=(points_per_route, 2)).tolist()],
+                    float(random.randint(1, 10000)), ("Suez",))
+                for _ in range(routes_per_pair)]
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_file = os.path.join(directory, "precomputed_routes.pickle")
+        with open(pickle_file, "wb") as f:
+            pickle.dump(precomputed_routes, f)
+        route_geometry_file = os.path.join(directory, "precomputed_routes.npz")
+        world_ports.convert_precomputed_routes(pickle_file, route_geometry_file, ports)
+        with context.Pool(1) as pool:
+            pickle_time, pickle_rss, _ = pool.apply(
+                _measure_route_store_loading, (pickle_file, ports_file, num_ports))
+        with context.Pool(1) as pool:
+            columnar_time, columnar_rss, _ = pool.apply(
+                _measure_route_store_loading, (route_geometry_file, ports_file, num_ports))
+    benchmark_results = {
+        "routes": len(precomputed_routes) * routes_per_pair,
+        "points": len(precomputed_routes) * routes_per_pair * points_per_route,
+        "pickle load [s]": pickle_time,
+        "pickle RSS increase [MB]": pickle_rss,
+        "columnar load [s]": columnar_time,
+        "columnar RSS increase [MB]": columnar_rss,
+    }
+    return benchmark_results
+
+
+def _compute_route_length_scalar(route):
+    """
+    The route length in metres as sum of the scalar haversine distances of the segments.
+    """
+    length = 0
+    for pt_index in range(1, len(route)):
+        lon_pt_start, lat_pt_start = route[pt_index - 1]
+        lon_pt_end, lat_pt_end = route[pt_index]
+        length += world_ports.LatLongShippingNetwork.get_long_lat_dist(
+            lat_pt_start, lon_pt_start, lat_pt_end, lon_pt_end)
+    return length
+
+
+def benchmark_haversine(num_routes=1000, points_per_route=200, seed=0, environment_files_path="."):
+    """
+    Route lengths with the vectorised haversine compared to the scalar haversine per segment.
+
+    :return: The number of routes, the runtimes, the largest relative difference of the unrounded lengths and
+        of the cumulative lengths and if all rounded lengths are the same.
+    :rtype: dict
+    """
+    random = np.random.RandomState(seed)
+    routes = [[tuple(p) for p in np.column_stack([random.uniform(-180, 180, points_per_route),
+                                                 random.uniform(-90, 90, points_per_route)]).tolist()]
+              for _ in range(num_routes)]
+    start = time.perf_counter()
+    scalar_lengths = [_compute_route_length_scalar(r) for r in routes]
+    scalar_time = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorised_lengths = [world_ports.LatLongShippingNetwork.compute_route_segment_lengths(r).sum() for r in routes]
+    vectorised_time = time.perf_counter() - start
+    max_relative_difference = max(abs(a - b) / a for a, b in zip(scalar_lengths, vectorised_lengths))
+    max_cumulative_relative_difference = 0
+    for one_route in routes[:10]:
+        scalar_cumulative = np.array([_compute_route_length_scalar(one_route[:i + 1])
+                                      for i in range(len(one_route))]) * world_ports.NAUTICAL_MILES_PER_METRE
+        vectorised_cumulative = world_ports.LatLongShippingNetwork.compute_cumulative_route_length(one_route)
+        max_cumulative_relative_difference = max(
+            max_cumulative_relative_difference,
+            float(np.max(np.abs(scalar_cumulative[1:] - vectorised_cumulative[1:]) / scalar_cumulative[1:])))
+    benchmark_results = {
+        "routes": num_routes,
+        "points per route": points_per_route,
+        "scalar [s]": scalar_time,
+        "vectorised [s]": vectorised_time,
+        "max relative difference": max_relative_difference,
+        "max relative difference cumulative": max_cumulative_relative_difference,
+        "same rounded lengths": all(
+            round(a * world_ports.NAUTICAL_MILES_PER_METRE, 2)
+            == world_ports.LatLongShippingNetwork.compute_route_length(r)
+            for a, r in zip(scalar_lengths, routes)),
+    }
+    return benchmark_results
+
+
+def _write_synthetic_graph_file(graph_file, step, random):
+    """
+    Write a lattice graph with a node every step degrees and about 15% of the edges removed as land.
+    """
+    longitudes = np.arange(-180, 180, step)
+    latitudes = np.arange(-80, 80 + step / 2, step)
+    rows = []
+    for i, long_one in enumerate(longitudes):
+        for j, lat_one in enumerate(latitudes):
+            for di, dj in [(1, 0), (0, 1), (1, 1), (1, -1)]:
+                k = j + dj
+                if 0 <= k < len(latitudes) and random.rand() >= 0.15:
+                    long_two = longitudes[(i + di) % len(longitudes)]
+                    lat_two = latitudes[k]
+                    rows.append((long_one, lat_one, long_two, lat_two,
+                                 world_ports.LatLongShippingNetwork.get_long_lat_dist(
+                                     lat_one, long_one, lat_two, long_two)))
+    np.savetxt(graph_file, np.array(rows))
+    return len(rows)
+
+
+def _measure_graph_loading(load_function):
+    """
+    Load a graph and return the graph, the load time and the peak of the traced memory in MB.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = load_function()
+    load_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return graph, load_time, peak / 2 ** 20
+
+
+def benchmark_routing_graph(step=2, num_queries=200, seed=0, environment_files_path="."):
+    """
+    Shortest paths on the CSR routing graph compared to the networkx graph.
+
+    The graph is a synthetic lattice graph.
+
+    :return: The graph size, the load times and memory, the mean query times and if all path lengths are the same.
+    :rtype: dict
+    """
+    random = np.random.RandomState(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        graph_file = os.path.join(directory, "graph.txt")
+        num_edges = _write_synthetic_graph_file(graph_file, step, random)
+        network = world_ports.LatLongShippingNetwork(graph_file=graph_file)
+        networkx_graph, networkx_load_time, networkx_memory = _measure_graph_loading(
+            network.generate_route_graph_from_file)
+        csr_graph, csr_load_time, csr_memory = _measure_graph_loading(
+            lambda: CsrRoutingGraph.from_file(graph_file))
+    node_id_pairs = random.randint(0, csr_graph.number_of_nodes, size=(num_queries, 2))
+    start = time.perf_counter()
+    networkx_lengths = []
+    for node_id_one, node_id_two in node_id_pairs:
+        try:
+            networkx_lengths.append(networkx.shortest_path_length(
+                networkx_graph, csr_graph.get_node(node_id_one), csr_graph.get_node(node_id_two), weight="weight"))
+        except networkx.exception.NetworkXNoPath:
+            networkx_lengths.append(None)
+    networkx_time = time.perf_counter() - start
+    start = time.perf_counter()
+    csr_paths = [csr_graph.get_shortest_path(node_id_one, node_id_two) for node_id_one, node_id_two in node_id_pairs]
+    csr_time = time.perf_counter() - start
+    csr_lengths = [None if path is None else sum(csr_graph.get_edge_weight(u, v) for u, v in zip(path, path[1:]))
+                   for path in csr_paths]
+    benchmark_results = {
+        "nodes": csr_graph.number_of_nodes,
+        "edges": num_edges,
+        "networkx load [s]": networkx_load_time,
+        "networkx memory [MB]": networkx_memory,
+        "csr load [s]": csr_load_time,
+        "csr memory [MB]": csr_memory,
+        "networkx query [ms]": networkx_time / num_queries * 1000,
+        "csr query [ms]": csr_time / num_queries * 1000,
+        "same lengths": all((a is None and b is None) or (a is not None and b is not None and abs(a - b) < 1e-6)
+                            for a, b in zip(networkx_lengths, csr_lengths)),
+    }
+    return benchmark_results
+
+
+def _get_path_length(graph, path):
+    """
+    The sum of the edge weights of a path of node ids or infinity for no path.
+    """
+    length = math.inf
+    if path is not None:
+        length = sum(graph.get_edge_weight(u, v) for u, v in zip(path, path[1:]))
+    return length
+
+
+def benchmark_astar_routing(step=1, num_queries=200, num_networkx_queries=20, num_landmarks=16, max_hop_degrees=15,
+                            seed=0, environment_files_path="."):
+    """
+    Point-to-point shortest path queries compared to the uninformed networkx Dijkstra search over the whole graph.
+
+    The searches are the compiled search on the landmark reduced weights (see
+    :py:func:`CsrRoutingGraph.get_shortest_path`), the Python A* fallback with the great-circle heuristic and with
+    landmarks (see :py:func:`CsrRoutingGraph.get_shortest_path_by_astar`) and scipy's Dijkstra to all nodes. The
+    graph is a synthetic lattice graph. Short queries are between nodes at most max_hop_degrees apart in longitude
+    and latitude and long queries are between random nodes. networkx is only timed on the first num_networkx_queries
+    queries of each type.
+
+    :return: The graph size, the landmark preprocessing time, the median query times, the speedups of the compiled
+        search over networkx and if all path lengths are the same as networkx's.
+    :rtype: dict
+    """
+    random = np.random.RandomState(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        graph_file = os.path.join(directory, "graph.txt")
+        _write_synthetic_graph_file(graph_file, step, random)
+        graph = CsrRoutingGraph.from_file(graph_file)
+        networkx_graph = world_ports.LatLongShippingNetwork(graph_file=graph_file).generate_route_graph_from_file()
+    coordinates = graph.coordinates
+    node_id_pairs = {"long": [tuple(p) for p in random.randint(0, graph.number_of_nodes, size=(num_queries, 2))],
+                     "short": []}
+    while len(node_id_pairs["short"]) < num_queries:
+        source_id = random.randint(graph.number_of_nodes)
+        close_node_ids = np.flatnonzero(
+            np.all(np.abs(coordinates - coordinates[source_id]) <= max_hop_degrees, axis=1))
+        node_id_pairs["short"].append((source_id, random.choice(close_node_ids)))
+    start = time.perf_counter()
+    landmark_graph = graph.with_edges()
+    landmark_graph.set_landmarks(*graph.compute_landmarks(num_landmarks))
+    landmarks_time = time.perf_counter() - start
+    benchmark_results = {
+        "nodes": graph.number_of_nodes,
+        "landmarks": num_landmarks,
+        "landmark preprocessing [s]": landmarks_time,
+    }
+    searches = {
+        "scipy dijkstra": lambda u, v: graph.get_path_from_tree(graph.get_shortest_path_tree(u)[1], u, v),
+        "python astar": graph.get_shortest_path_by_astar,
+        "python alt": landmark_graph.get_shortest_path_by_astar,
+        "compiled alt": landmark_graph.get_shortest_path,
+    }
+    is_same_length = True
+    for query_type, pairs in node_id_pairs.items():
+        networkx_times = []
+        networkx_lengths = {}
+        for source_id, target_id in pairs[:num_networkx_queries]:
+            start = time.perf_counter()
+            try:
+                networkx_lengths[source_id, target_id] = networkx.dijkstra_path_length(
+                    networkx_graph, graph.get_node(source_id), graph.get_node(target_id), weight="weight")
+            except networkx.exception.NetworkXNoPath:
+                networkx_lengths[source_id, target_id] = math.inf
+            networkx_times.append(time.perf_counter() - start)
+        benchmark_results[f"{query_type} networkx dijkstra median [ms]"] = float(np.median(networkx_times)) * 1000
+        for search_name, search in searches.items():
+            query_times = []
+            for source_id, target_id in pairs:
+                start = time.perf_counter()
+                path = search(source_id, target_id)
+                query_times.append(time.perf_counter() - start)
+                if (source_id, target_id) in networkx_lengths:
+                    length = _get_path_length(graph, path)
+                    expected_length = networkx_lengths[source_id, target_id]
+                    is_same_length &= bool(length == expected_length or abs(length - expected_length) < 1e-6)
+            benchmark_results[f"{query_type} {search_name} median [ms]"] = float(np.median(query_times)) * 1000
+        benchmark_results[f"{query_type} compiled alt speedup over networkx"] = (
+            benchmark_results[f"{query_type} networkx dijkstra median [ms]"]
+            / benchmark_results[f"{query_type} compiled alt median [ms]"])
+    benchmark_results["same lengths"] = is_same_length
+    return benchmark_results
+
+
+def _measure_distance_queries(network, pairs, num_threads=1):
+    """
+    Query the distances of all pairs split over a number of threads and return the distances and the runtime.
+    """
+    distances = [None] * len(pairs)
+
+    def query(thread_index):
+        for k in range(thread_index, len(pairs), num_threads):
+            distances[k] = network.get_distance(*pairs[k])
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(num_threads) as executor:
+        list(executor.map(query, range(num_threads)))
+    return distances, time.perf_counter() - start
+
+
+def benchmark_distance_cache(num_ports=100, num_pairs=2000, num_queries=100000, num_threads=4, seed=0,
+                             environment_files_path="."):
+    """
+    Distance queries with the distance cache compared to without for a unit network and a lat long network.
+
+    The queries repeat a limited number of port pairs as in schedule construction. The lat long network uses
+    synthetic routes for the first ports of 'ports.csv' and no distance matrix. The cached queries are also run from
+    several threads.
+
+    :return: The runtimes without and with the cache, the cache statistics and if all distances are the same.
+    :rtype: dict
+    """
+    random = np.random.RandomState(seed)
+    unit_ports = [Port(f"port_{i}", x, y) for i, (x, y) in enumerate(random.uniform(size=(num_ports, 2)))]
+    lat_long_ports = world_ports.get_ports(os.path.join(environment_files_path, "ports.csv"))[:num_ports]
+    with tempfile.TemporaryDirectory() as directory:
+        precomputed_routes_file = os.path.join(directory, "precomputed_routes.pickle")
+        with open(precomputed_routes_file, "wb") as f:
+            pickle.dump(_get_synthetic_precomputed_routes(lat_long_ports, random), f)
+        lat_long_network = world_ports.LatLongShippingNetwork(
+            lat_long_ports, precomputed_routes_file=precomputed_routes_file)
+    benchmark_results = {"queries": num_queries, "port pairs": num_pairs}
+    is_same = True
+    for network_name, network, ports in [("unit", UnitShippingNetwork(unit_ports), unit_ports),
+                                         ("lat long", lat_long_network, lat_long_ports)]:
+        pair_indices = random.randint(num_ports, size=(num_pairs, 2))
+        pairs = [(ports[i], ports[j]) for i, j in pair_indices[random.randint(num_pairs, size=num_queries)]]
+        network.set_distance_cache_size(0)
+        uncached_distances, uncached_time = _measure_distance_queries(network, pairs)
+        network.set_distance_cache_size(ShippingNetwork.DISTANCE_CACHE_SIZE)
+        cached_distances, cached_time = _measure_distance_queries(network, pairs)
+        network.set_distance_cache_size(ShippingNetwork.DISTANCE_CACHE_SIZE)
+        threaded_distances, threaded_time = _measure_distance_queries(network, pairs, num_threads)
+        cache_info = network.distance_cache_info
+        is_same &= uncached_distances == cached_distances == threaded_distances
+        benchmark_results[f"{network_name} uncached [s]"] = uncached_time
+        benchmark_results[f"{network_name} cached [s]"] = cached_time
+        benchmark_results[f"{network_name} cached {num_threads} threads [s]"] = threaded_time
+        benchmark_results[f"{network_name} hit rate {num_threads} threads"] = cache_info.hits / (
+            cache_info.hits + cache_info.misses)
+    benchmark_results["same distances"] = is_same
+    return benchmark_results
+
+
+def _measure_port_operations(locations, pairs):
+    """
+    Compare, hash and deep copy locations and return the runtimes.
+    """
+    start = time.perf_counter()
+    number_equal = sum(locations[i] == locations[j] for i, j in pairs)
+    equality_time = time.perf_counter() - start
+    start = time.perf_counter()
+    counts = {}
+    for i, j in pairs:
+        key = (locations[i], locations[j])
+        counts[key] = counts.get(key, 0) + 1
+    dict_time = time.perf_counter() - start
+    start = time.perf_counter()
+    [copy.deepcopy((locations[i], locations[j])) for i, j in pairs]
+    copy_time = time.perf_counter() - start
+    return number_equal, equality_time, dict_time, copy_time
+
+
+def benchmark_port_interning(num_queries=100000, seed=0, environment_files_path="."):
+    """
+    Equality, hashing and deep copying of interned ports compared to the same operations on locations with the
+    same names and coordinates, i.e. with comparisons of the names and coordinates.
+
+    :return: The number of ports, the runtimes of the operations and if both compared the same.
+    :rtype: dict
+    """
+    ports = world_ports.get_ports(os.path.join(environment_files_path, "ports.csv"))
+    locations = [Location(p.x, p.y, p.name) for p in ports]
+    random = np.random.RandomState(seed)
+    pairs = random.randint(len(ports), size=(num_queries, 2)).tolist()
+    benchmark_results = {"ports": len(ports), "queries": num_queries}
+    number_equal = []
+    for name, one_locations in [("locations", locations), ("ports", ports)]:
+        one_number_equal, equality_time, dict_time, copy_time = _measure_port_operations(one_locations, pairs)
+        number_equal.append(one_number_equal)
+        benchmark_results[f"{name} equality [s]"] = equality_time
+        benchmark_results[f"{name} dict [s]"] = dict_time
+        benchmark_results[f"{name} deepcopy [s]"] = copy_time
+    network = world_ports.LatLongShippingNetwork(ports)
+    start = time.perf_counter()
+    indices = [network.get_port_index(ports[i]) for i, _ in pairs]
+    benchmark_results["port index [s]"] = time.perf_counter() - start
+    benchmark_results["same comparisons"] = number_equal[0] == number_equal[1] and indices == [i for i, _ in pairs]
+    return benchmark_results
+
+
+def _sample_periods(shipping, world, num_periods, trades_per_period, distribution_model, seed):
+    """
+    Sample the trades of a number of periods of 30 days as the shipping does and return the trades and the runtime.
+    """
+    world.random.seed(seed)
+    trades = []
+    start = time.perf_counter()
+    for k in range(num_periods):
+        trades.extend(shipping.sample_cargoes_from_port_distributions(
+            world, DistributionClassFactory(), trades_per_period, shipping._cargo_weight_dist,
+            shipping._frequency_dist, shipping._time_transition_dist, (k * 30, k * 30 + 29), time=k * 720,
+            distribution_model=distribution_model))
+    return trades, time.perf_counter() - start
+
+
+def benchmark_distribution_model(trades_per_period=10, num_periods=(1, 10, 40), seed=0,
+                                 environment_files_path="."):
+    """
+    Trade generation over an increasing number of periods with the distribution model that is built once in
+    :py:func:`DistributionShipping.load_distributions` compared to deriving the tables in every period.
+
+    :return: The runtimes per number of periods and if both generated the same trades.
+    :rtype: dict
+    """
+    world = get_distribution_world(environment_files_path, seed)
+    shipping = get_distribution_shipping(world, 0, environment_files_path=environment_files_path)
+    benchmark_results = {"trades per period": trades_per_period}
+    is_same = True
+    for one_num_periods in num_periods:
+        per_period_trades, per_period_time = _sample_periods(
+            shipping, world, one_num_periods, trades_per_period, None, seed)
+        model_trades, model_time = _sample_periods(
+            shipping, world, one_num_periods, trades_per_period, shipping.distribution_model, seed)
+        is_same &= per_period_trades == model_trades
+        benchmark_results[f"{one_num_periods} periods per period tables [s]"] = per_period_time
+        benchmark_results[f"{one_num_periods} periods model [s]"] = model_time
+    benchmark_results["same trades"] = is_same
+    return benchmark_results
+
+
+def benchmark_batch_sampling(num_trades=100000, seed=0, environment_files_path="."):
+    """
+    Trade generation with the batch sampler compared to the sampler with one candidate trade at a time.
+
+    :return: The runtimes, if the batch sampler is reproducible and for a comparison of the distributions of
+        the trades the mean amounts and the total variation distance of the origins.
+    :rtype: dict
+    """
+    world = get_distribution_world(environment_files_path, seed)
+    shipping = get_distribution_shipping(world, 0, environment_files_path=environment_files_path)
+    world.random.seed(seed)
+    start = time.perf_counter()
+    loop_trades = shipping.sample_cargoes_from_port_distributions(
+        world, DistributionClassFactory(), num_trades, None, None, None, (0, 29), time=0,
+        distribution_model=shipping.distribution_model)
+    loop_time = time.perf_counter() - start
+    batch_times = []
+    batch_trades = []
+    for _ in range(2):
+        world.random.seed(seed)
+        start = time.perf_counter()
+        batch_trades.append(shipping.batch_sample_cargoes_from_port_distributions(
+            world, DistributionClassFactory(), num_trades, (0, 29), time=0))
+        batch_times.append(time.perf_counter() - start)
+    loop_origins = collections.Counter(t.origin_port.name for t in loop_trades)
+    batch_origins = collections.Counter(t.origin_port.name for t in batch_trades[0])
+    benchmark_results = {
+        "trades": num_trades,
+        "one at a time [s]": loop_time,
+        "batch [s]": batch_times[0],
+        "batch reproducible": batch_trades[0] == batch_trades[1],
+        "one at a time mean amount": float(np.mean([t.amount for t in loop_trades])),
+        "batch mean amount": float(np.mean([t.amount for t in batch_trades[0]])),
+        "origins total variation distance": sum(
+            abs(loop_origins[p] - batch_origins[p]) for p in loop_origins.keys() | batch_origins.keys()
+        ) / (2 * num_trades),
+    }
+    return benchmark_results
+
+
+def _measure_trading_times(environment_files_path, seed, trades_per_auction, num_auctions, lazy_trades, evict,
+                           trace_memory=False):
+    """
+    Set up a shipping and request the trades of all trading times in order, optionally evicting the trades of the
+    previous times. Returns the set-up time, the time of the requests and the peak of the traced memory in MB if the
+    memory is traced.
+    """
+    world = get_distribution_world(environment_files_path, seed)
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    shipping = get_distribution_shipping(world, trades_per_auction, num_auctions=num_auctions,
+                                         environment_files_path=environment_files_path, lazy_trades=lazy_trades)
+    set_up_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for one_time in shipping.get_trading_times():
+        shipping.get_trades(one_time)
+        if evict:
+            shipping.evict_trades(one_time)
+    requests_time = time.perf_counter() - start
+    peak_memory = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_memory = peak / 2 ** 20
+    return set_up_time, requests_time, peak_memory
+
+
+def benchmark_lazy_trades(trades_per_auction=100, num_auctions=120, seed=0, environment_files_path="."):
+    """
+    Trade generation on first request per trading time with and without eviction of the previous trading times
+    compared to the generation of all trades on construction.
+
+    :return: The set-up times, the times to request the trades of all trading times and the peaks of the traced
+        memory (measured in a separate run).
+    :rtype: dict
+    """
+    benchmark_results = {"auctions": num_auctions, "trades per auction": trades_per_auction}
+    for name, lazy_trades, evict in [("eager", False, False), ("lazy", True, False), ("lazy evicting", True, True)]:
+        set_up_time, requests_time, _ = _measure_trading_times(
+            environment_files_path, seed, trades_per_auction, num_auctions, lazy_trades, evict)
+        *_, peak_memory = _measure_trading_times(
+            environment_files_path, seed, trades_per_auction, num_auctions, lazy_trades, evict, trace_memory=True)
+        benchmark_results[f"{name} set-up [s]"] = set_up_time
+        benchmark_results[f"{name} all trading times [s]"] = requests_time
+        benchmark_results[f"{name} peak memory [MB]"] = peak_memory
+    return benchmark_results
+
+
+def benchmark_alias_sampling(num_draws=100000, seed=0, environment_files_path="."):
+    """
+    Port draws with the alias tables compared to single draws with the cumulative probabilities and with
+    :py:func:`np.random.RandomState.choice`, and loading the distributions for a second shipping.
+
+    :return: The runtimes of the draws of start and end ports and the load times of the distributions.
+    :rtype: dict
+    """
+    DistributionShipping.clear_loaded_distributions()
+    world = get_distribution_world(environment_files_path, seed)
+    start = time.perf_counter()
+    shipping = get_distribution_shipping(world, 0, environment_files_path=environment_files_path)
+    first_load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    get_distribution_shipping(world, 0, environment_files_path=environment_files_path)
+    second_load_time = time.perf_counter() - start
+    model = shipping.distribution_model
+    random = np.random.RandomState(seed)
+    supply_probabilities = np.diff(model._supply_cumulative_probabilities, prepend=0)
+    supply_port_names = model.port_names[model._supply_port_indices]
+    start = time.perf_counter()
+    start_port_names = [random.choice(supply_port_names, 1, p=supply_probabilities)[0] for _ in range(num_draws)]
+    choice_time = time.perf_counter() - start
+    random.seed(seed)
+    start = time.perf_counter()
+    start_port_indices = np.array([model.sample_supply_port(random) for _ in range(num_draws)])
+    cumulative_time = time.perf_counter() - start
+    start = time.perf_counter()
+    model.sample_supply_ports(random, num_draws)
+    alias_time = time.perf_counter() - start
+    start = time.perf_counter()
+    [model.sample_demand_port(random, i) for i in start_port_indices]
+    demand_cumulative_time = time.perf_counter() - start
+    start = time.perf_counter()
+    model.sample_demand_ports(random, start_port_indices)
+    demand_alias_first_time = time.perf_counter() - start
+    start = time.perf_counter()
+    model.sample_demand_ports(random, start_port_indices)
+    demand_alias_time = time.perf_counter() - start
+    benchmark_results = {
+        "draws": num_draws,
+        "first distributions load [s]": first_load_time,
+        "second distributions load [s]": second_load_time,
+        "start ports choice [s]": choice_time,
+        "start ports cumulative [s]": cumulative_time,
+        "start ports alias [s]": alias_time,
+        "end ports cumulative [s]": demand_cumulative_time,
+        "end ports alias incl. tables [s]": demand_alias_first_time,
+        "end ports alias [s]": demand_alias_time,
+        "same start ports": list(model.port_names[start_port_indices]) == start_port_names,
+    }
+    return benchmark_results
+
+
+BENCHMARKS = {
+    "combinatorial_auction": benchmark_combinatorial_auction,
+    "trade_realisation": benchmark_trade_realisation,
+    "distance_lookup": benchmark_distance_lookup,
+    "route_loading": benchmark_route_loading,
+    "haversine": benchmark_haversine,
+    "routing_graph": benchmark_routing_graph,
+    "astar_routing": benchmark_astar_routing,
+    "distance_cache": benchmark_distance_cache,
+    "port_interning": benchmark_port_interning,
+    "distribution_model": benchmark_distribution_model,
+    "batch_sampling": benchmark_batch_sampling,
+    "lazy_trades": benchmark_lazy_trades,
+    "alias_sampling": benchmark_alias_sampling,
+}
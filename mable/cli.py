@@ -10,6 +10,9 @@ import argcomplete
 from loguru import logger
 from prettytable import PrettyTable
 
+from mable import benchmarks
+from mable.extensions import world_ports, route_building
+
 
 class ArgumentParserExtensions:
     """
@@ -94,6 +97,67 @@ def task_metrics_overview(parsed_args):
         print(table)
 
 
+def task_benchmark(parsed_args):
+    """
+    Run a benchmark and print the measured values.
+
+    :param parsed_args:
+        The parameter from the arg parser.
+        - name: str: the name of the benchmark.
+        - resources: str: the directory of the environment files.
+    :type parsed_args: dict
+    """
+    benchmark_name = parsed_args["name"]
+    print(f"Benchmark {benchmark_name}.")
+    benchmark_results = benchmarks.BENCHMARKS[benchmark_name](environment_files_path=parsed_args["resources"])
+    table = PrettyTable()
+    table.field_names = ["Name", "Value"]
+    table.align["Value"] = "r"
+    for one_key, one_value in benchmark_results.items():
+        if isinstance(one_value, float):
+            one_value = round(one_value, 6)
+        table.add_row([one_key, one_value])
+    print(table)
+
+
+def task_routes(parsed_args):
+    """
+    Process precomputed routes.
+
+    :param parsed_args:
+        The parameter from the arg parser.
+        - routes_task: str: the routes task. 'convert' converts pickled routes to the columnar format, 'build'
+          computes the routes between all ports and 'landmarks' computes the landmarks of the routing graph.
+        - input: str: the pickle file (convert).
+        - graph: str: the routing graph file (build, landmarks).
+        - landmarks: int: the number of landmarks (landmarks).
+        - output: str: the '.npz' file.
+        - distances: str: the '.npy' file of the distance matrix (build).
+        - processes: int: the number of processes (build).
+        - ports: str: the ports file.
+    :type parsed_args: dict
+    """
+    routes_task = parsed_args["routes_task"]
+    if routes_task == "convert":
+        ports = world_ports.get_ports(parsed_args["ports"])
+        route_geometry = world_ports.convert_precomputed_routes(parsed_args["input"], parsed_args["output"], ports)
+        print(f"Converted {len(route_geometry.lengths)} routes between {len(route_geometry.origins)} port pairs"
+              f" to {parsed_args['output']}.")
+    elif routes_task == "build":
+        ports = world_ports.get_ports(parsed_args["ports"])
+        route_geometry = route_building.build_routes(
+            ports, parsed_args["graph"], parsed_args["output"], distance_matrix_file=parsed_args["distances"],
+            processes=parsed_args["processes"])
+        print(f"Built {len(route_geometry.lengths)} routes between {len(route_geometry.origins)} port pairs"
+              f" to {parsed_args['output']}.")
+    elif routes_task == "landmarks":
+        network = world_ports.LatLongShippingNetwork(graph_file=parsed_args["graph"])
+        landmarks_file = network.build_routing_landmarks(parsed_args["landmarks"])
+        print(f"Built {parsed_args['landmarks']} landmarks to {landmarks_file}.")
+    else:
+        logger.error(f"Unknown routes task {routes_task}")
+
+
 def select_task(parsed_args):
     """
     Calls the respective function for the task as specified by the cmd args.
@@ -104,6 +168,10 @@ def select_task(parsed_args):
     task = parsed_args["task"]
     if task == "overview":
         task_metrics_overview(parsed_args)
+    elif task == "benchmark":
+        task_benchmark(parsed_args)
+    elif task == "routes":
+        task_routes(parsed_args)
     else:
         logger.error(f"Unknown task {task}")
 
@@ -137,6 +205,97 @@ def main():
         type=lambda x: ArgumentParserExtensions.is_valid_file(x, overview_parser),
         help="Filename for which to produce the overview."
     )
+    # Benchmark
+    benchmark_parser = task_parsers.add_parser(
+        'benchmark',
+        parents=[],
+        help='Run a performance benchmark.'
+    )
+    benchmark_parser.add_argument(
+        'name',
+        choices=list(benchmarks.BENCHMARKS.keys()),
+        help="Name of the benchmark."
+    )
+    benchmark_parser.add_argument(
+        '-r', '--resources',
+        default=".",
+        help="Directory of the environment files. Default is the working directory."
+    )
+    # Routes
+    routes_parser = task_parsers.add_parser(
+        'routes',
+        parents=[],
+        help='Process precomputed routes.'
+    )
+    routes_task_parsers = routes_parser.add_subparsers(dest='routes_task', required=True)
+    routes_convert_parser = routes_task_parsers.add_parser(
+        'convert',
+        parents=[],
+        help='Convert pickled precomputed routes to the columnar format.'
+    )
+    routes_convert_parser.add_argument(
+        'input',
+        type=lambda x: ArgumentParserExtensions.is_valid_file(x, routes_convert_parser),
+        help="The pickle file of the precomputed routes."
+    )
+    routes_convert_parser.add_argument(
+        'output',
+        help="The '.npz' file to write."
+    )
+    routes_convert_parser.add_argument(
+        '-p', '--ports',
+        type=lambda x: ArgumentParserExtensions.is_valid_file(x, routes_convert_parser),
+        default="ports.csv",
+        help="The ports file. Default is 'ports.csv'."
+    )
+    routes_build_parser = routes_task_parsers.add_parser(
+        'build',
+        parents=[],
+        help='Compute the routes between all ports from the routing graph.'
+    )
+    routes_build_parser.add_argument(
+        'graph',
+        type=lambda x: ArgumentParserExtensions.is_valid_file(x, routes_build_parser),
+        help="The routing graph file ('.txt' or '.pkl')."
+    )
+    routes_build_parser.add_argument(
+        '-o', '--output',
+        default="precomputed_routes.npz",
+        help="The '.npz' file to write. Default is 'precomputed_routes.npz'."
+    )
+    routes_build_parser.add_argument(
+        '-d', '--distances',
+        default="port_distances.npy",
+        help="The '.npy' file of the distance matrix to write. Default is 'port_distances.npy'."
+    )
+    routes_build_parser.add_argument(
+        '-p', '--ports',
+        type=lambda x: ArgumentParserExtensions.is_valid_file(x, routes_build_parser),
+        default="ports.csv",
+        help="The ports file. Default is 'ports.csv'."
+    )
+    routes_build_parser.add_argument(
+        '-j', '--processes',
+        type=lambda x: ArgumentParserExtensions.is_positive_integer(x, routes_build_parser),
+        default=None,
+        help="The number of processes. Default is the number of CPUs."
+    )
+    routes_landmarks_parser = routes_task_parsers.add_parser(
+        'landmarks',
+        parents=[],
+        help='Compute the landmarks of the routing graph for goal directed route searches.'
+    )
+    routes_landmarks_parser.add_argument(
+        'graph',
+        type=lambda x: ArgumentParserExtensions.is_valid_file(x, routes_landmarks_parser),
+        help="The routing graph file ('.txt' or '.pkl'). The landmarks are saved next to it."
+    )
+    routes_landmarks_parser.add_argument(
+        '-n', '--landmarks',
+        type=lambda x: ArgumentParserExtensions.is_positive_integer(x, routes_landmarks_parser),
+        default=16,
+        help="The number of landmarks. Default is 16."
+    )
     argcomplete.autocomplete(parser)
     args = parser.parse_args()
     args = vars(args)
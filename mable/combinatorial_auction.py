@@ -0,0 +1,328 @@
+"""
+Combinatorial (bundle) cargo auctions and the associated winner determination.
+"""
+import asyncio
+import time as time_module
+from typing import TYPE_CHECKING, List, Dict
+
+import attrs
+import loguru
+
+from mable.shipping_market import AuctionMarket, AuctionLedger, Contract
+from mable.transport_operation import BundleBid
+
+if TYPE_CHECKING:
+    from mable.cargo_bidding import TradingCompany
+    from mable.shipping_market import Trade
+    from mable.transport_operation import Bid
+
+
+logger = loguru.logger
+
+
+class TradeIndices:
+    """
+    The indices of the trades of one auction.
+
+    Trades are looked up by identity, i.e. in constant time for the auctioned trade objects, and otherwise by
+    equality like :py:func:`AuctionMarket._get_trade_index`, e.g. for copies of the trades.
+    """
+
+    def __init__(self, trades):
+        """
+        :param trades: The list of trades.
+        :type trades: List[Trade]
+        """
+        self._trades = trades
+        self._indices = {}
+        for i, one_trade in enumerate(trades):
+            self._indices.setdefault(id(one_trade), i)
+
+    def get_index(self, trade):
+        """
+        :param trade: The trade.
+        :type trade: Trade
+        :return: The index of the trade or None if the trade is not in the list of trades.
+        :rtype: int | None
+        """
+        index = self._indices.get(id(trade))
+        if index is None:
+            try:
+                index = AuctionMarket._get_trade_index(trade, self._trades)
+            except ValueError:
+                pass
+        return index
+
+
+@attrs.define(kw_only=True)
+class WinnerDeterminationResult:
+    """
+    The outcome of a winner determination.
+
+    :param winning_bundles: The indices of the winning bundles.
+    :type winning_bundles: List[int]
+    :param number_allocated_trades: The number of trades that are allocated.
+    :type number_allocated_trades: int
+    :param cost: The sum of the amounts of all winning bundles.
+    :type cost: float
+    """
+    winning_bundles: List[int]
+    number_allocated_trades: int
+    cost: float
+
+    @property
+    def key(self):
+        """
+        The comparison key of the result. A higher key is a better result, i.e. more allocated trades
+        and for the same number of allocated trades lower cost.
+
+        :return: The key.
+        :rtype: tuple[int, float]
+        """
+        return self.number_allocated_trades, -self.cost
+
+
+class BundleWinnerDetermination:
+    """
+    Winner determination for bundle bids.
+
+    The allocation maximises the number of allocated trades and for the same number of allocated trades minimises the
+    sum of the winning amounts. No trade can be allocated twice. The solver starts with greedy allocations and improves
+    the best of them by local search until no improvement is found or the time budget is exhausted.
+    """
+
+    def __init__(self, bundle_bids, trades):
+        """
+        :param bundle_bids: The bids. All trades of the bids have to be in the list of trades.
+        :type bundle_bids: List[BundleBid]
+        :param trades: The list of trades or the indices of the trades.
+        :type trades: List[Trade] | TradeIndices
+        """
+        if not isinstance(trades, TradeIndices):
+            trades = TradeIndices(trades)
+        self._bundle_bids = bundle_bids
+        self._masks = []
+        self._sizes = []
+        for one_bundle_bid in bundle_bids:
+            mask = 0
+            for one_trade in one_bundle_bid.trades:
+                mask |= 1 << trades.get_index(one_trade)
+            self._masks.append(mask)
+            self._sizes.append(mask.bit_count())
+
+    @property
+    def bundle_bids(self):
+        """
+        The bids the winner determination is run on. Winning bundles are indices into this list.
+
+        :return: The bids.
+        :rtype: List[BundleBid]
+        """
+        return self._bundle_bids
+
+    def _result(self, selected):
+        return WinnerDeterminationResult(
+            winning_bundles=sorted(selected),
+            number_allocated_trades=sum(self._sizes[i] for i in selected),
+            cost=sum(self._bundle_bids[i].amount for i in selected))
+
+    def _greedy_fill(self, selected, allocated_mask, order):
+        """
+        Add all bundles in the order that do not conflict with the already allocated trades.
+        """
+        for i in order:
+            if self._masks[i] & allocated_mask == 0:
+                selected.append(i)
+                allocated_mask |= self._masks[i]
+        return selected, allocated_mask
+
+    def _local_search(self, result, order, deadline):
+        """
+        Improve the result by forcing single bundles into the allocation, removing all conflicting winning
+        bundles and refilling greedily.
+        """
+        is_improved = True
+        while is_improved and time_module.perf_counter() < deadline:
+            is_improved = False
+            current_selected = set(result.winning_bundles)
+            for i in order:
+                if i in current_selected:
+                    continue
+                if time_module.perf_counter() >= deadline:
+                    break
+                candidate = [j for j in current_selected if self._masks[j] & self._masks[i] == 0] + [i]
+                candidate_mask = 0
+                for j in candidate:
+                    candidate_mask |= self._masks[j]
+                candidate, _ = self._greedy_fill(candidate, candidate_mask, order)
+                candidate_result = self._result(candidate)
+                if candidate_result.key > result.key:
+                    result = candidate_result
+                    is_improved = True
+                    break
+        return result
+
+    def solve(self, time_budget=1, excluded_companies=None):
+        """
+        Determine the winning bundles.
+
+        :param time_budget: The time in seconds for the local search. The greedy start is always completed.
+        :type time_budget: float
+        :param excluded_companies: Companies whose bids are not considered.
+        :type excluded_companies: List[TradingCompany] | None
+        :return: The winner determination result.
+        :rtype: WinnerDeterminationResult
+        """
+        deadline = time_module.perf_counter() + time_budget
+        if excluded_companies is None:
+            excluded_companies = []
+        candidates = [i for i in range(len(self._bundle_bids))
+                      if self._bundle_bids[i].company not in excluded_companies]
+        orders = [
+            sorted(candidates, key=lambda i: self._bundle_bids[i].amount / self._sizes[i]),
+            sorted(candidates, key=lambda i: (-self._sizes[i], self._bundle_bids[i].amount)),
+        ]
+        greedy_results = [self._result(self._greedy_fill([], 0, one_order)[0]) for one_order in orders]
+        best_index = max(range(len(greedy_results)), key=lambda k: greedy_results[k].key)
+        result = self._local_search(greedy_results[best_index], orders[0], deadline)
+        return result
+
+    def determine_payments(self, time_budget=1):
+        """
+        Determine the winning bundles and the payments.
+
+        The payments follow the Vickrey-Clarke-Groves principle for procurement: a winning company is paid its winning
+        amounts plus the amount by which the cost of the allocation would increase if the company did not take part.
+        If the company's trades cannot be allocated to other companies, the company is paid its winning amounts.
+        For single trade bids this is the second price of the :py:class:`AuctionMarket`.
+
+        :param time_budget: The time in seconds for all winner determinations.
+        :type time_budget: float
+        :return: The winner determination result and the payments indexed by the winning bundles.
+        :rtype: tuple[WinnerDeterminationResult, Dict[int, float]]
+        """
+        result = self.solve(time_budget=time_budget / 2)
+        winning_bundles_per_company = {}
+        for i in result.winning_bundles:
+            winning_bundles_per_company.setdefault(self._bundle_bids[i].company, []).append(i)
+        payments = {}
+        counterfactual_time_budget = time_budget / (2 * max(1, len(winning_bundles_per_company)))
+        for one_company, one_company_bundles in winning_bundles_per_company.items():
+            counterfactual_result = self.solve(
+                time_budget=counterfactual_time_budget, excluded_companies=[one_company])
+            company_cost = sum(self._bundle_bids[i].amount for i in one_company_bundles)
+            premium = 0
+            if counterfactual_result.number_allocated_trades >= result.number_allocated_trades:
+                premium = max(0, counterfactual_result.cost - result.cost)
+            for i in one_company_bundles:
+                if company_cost > 0:
+                    share = self._bundle_bids[i].amount / company_cost
+                else:
+                    share = 1 / len(one_company_bundles)
+                payments[i] = self._bundle_bids[i].amount + premium * share
+        return result, payments
+
+
+class CombinatorialAuctionMarket(AuctionMarket):
+    """
+    A market which auctions of trades in bundles. Companies can bid with :py:class:`BundleBid` as well as with
+    single trade :py:class:`Bid`.
+    """
+
+    def __init__(self, *args, time_budget=1, **kwargs):
+        """
+        :param time_budget: The time in seconds for the winner determination and payment computation per auction.
+        :type time_budget: float
+        """
+        super().__init__(*args, **kwargs)
+        self._time_budget = time_budget
+
+    @property
+    def time_budget(self):
+        return self._time_budget
+
+    @staticmethod
+    def _to_bundle_bid(bid, trade_indices):
+        """
+        Turns a bid into a bundle bid with unique trades.
+
+        :param bid: The bid.
+        :type bid: Bid | BundleBid
+        :param trade_indices: The indices of the trades that are auctioned.
+        :type trade_indices: TradeIndices
+        :return: The bundle bid or None if the bid is for no or unknown trades.
+        :rtype: BundleBid | None
+        """
+        if isinstance(bid, BundleBid):
+            bid_trades = bid.trades
+        else:
+            bid_trades = [bid.trade]
+        unique_trades = []
+        unique_trade_indices = set()
+        for one_trade in bid_trades:
+            trade_index = trade_indices.get_index(one_trade)
+            if trade_index is None:
+                return None
+            if trade_index not in unique_trade_indices:
+                unique_trade_indices.add(trade_index)
+                unique_trades.append(one_trade)
+        bundle_bid = None
+        if len(unique_trades) > 0:
+            bundle_bid = BundleBid(amount=bid.amount, trades=unique_trades, company=bid.company)
+        return bundle_bid
+
+    @staticmethod
+    async def _companies_inform_timeout(shipping_companies, trades, timeout=60):
+        """
+        Informs all companies of the trades in one event loop.
+
+        :param shipping_companies: The list of shipping companies.
+        :type shipping_companies: list[TradingCompany]
+        :param trades: The list of trades.
+        :type trades: list[Trade]
+        :param timeout: The time to give every company to process the trade information.
+        :type timeout: int
+        :return: The bids of every company in the order of the companies.
+        :rtype: list[list[Bid | BundleBid]]
+        """
+        return await asyncio.gather(*[
+            AuctionMarket._company_inform_timeout(one_company, trades, timeout=timeout)
+            for one_company in shipping_companies])
+
+    def distribute_trades(self, time, trades, shipping_companies, timeout=60):
+        """
+        Distribute trades on a combinatorial auction basis.
+        See :py:func:`BundleWinnerDetermination.determine_payments` for the allocation and the payments.
+        The payment for a bundle is split equally among the contracts of its trades.
+
+        :param time: The time of occurrence.
+        :type time: float
+        :param trades: The list of trades.
+        :type trades: list[Trade]
+        :param shipping_companies: The list of shipping companies.
+        :type shipping_companies: list[TradingCompany]
+        :param timeout: The time to give every company to process the trade information. Default is 60 seconds.
+        :type timeout: int
+        :return: All allocated traded per company.
+        :rtype: AuctionLedger
+        """
+        all_bundle_bids = []
+        trade_indices = TradeIndices(trades)
+        ledger = AuctionLedger(shipping_companies)
+        bids_per_company = asyncio.run(self._companies_inform_timeout(shipping_companies, trades, timeout=timeout))
+        for current_company, company_bids in zip(shipping_companies, bids_per_company):
+            for one_bid in company_bids:
+                one_bid.company = current_company
+                one_bundle_bid = self._to_bundle_bid(one_bid, trade_indices)
+                if one_bundle_bid is not None:
+                    all_bundle_bids.append(one_bundle_bid)
+                else:
+                    logger.warning(f"Company {current_company.name} placed a bid for no or unknown trades.")
+        winner_determination = BundleWinnerDetermination(all_bundle_bids, trade_indices)
+        result, payments = winner_determination.determine_payments(time_budget=self._time_budget)
+        for i in result.winning_bundles:
+            one_bundle_bid = all_bundle_bids[i]
+            payment_per_trade = payments[i] / len(one_bundle_bid.trades)
+            for one_trade in one_bundle_bid.trades:
+                ledger[one_bundle_bid.company].append(Contract(payment=payment_per_trade, trade=one_trade))
+        return ledger
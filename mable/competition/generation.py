@@ -8,6 +8,7 @@ import sys
 import loguru
 
 from mable.cargo_bidding import TradingCompany
+from mable.combinatorial_auction import CombinatorialAuctionMarket
 from mable.engine import SimulationEngine
 from mable.event_management import CargoAnnouncementEvent, CargoEvent, FirstCargoAnnouncementEvent
 from mable.extensions.cargo_distributions import DistributionShipping
@@ -81,7 +82,7 @@ class AuctionCargoEvent(CargoEvent):
         :return: The distribution ledger.
         :rtype: AuctionLedger
         """
-        engine.headquarters.get_companies()  # Update vessel locations before informing companies
+        engine.headquarters.get_company_records()  # Update vessel locations before informing companies
         all_trades = engine.shipping.get_trades(self.time)
         distribution_ledger = engine.market.distribute_trades(
             self.time, all_trades, engine.shipping_companies, timeout=engine.global_agent_timeout)
@@ -105,8 +106,8 @@ class AuctionCargoEvent(CargoEvent):
             await asyncio.wait_for(
                 asyncio.to_thread(
                     company.receive,
-                    distribution_ledger.get_trades_for_company_copy(company),
-                    distribution_ledger.sanitised_ledger),
+                    distribution_ledger.get_contracts_for_company_view(company),
+                    distribution_ledger.read_only_ledger),
                 timeout=timeout
             )
         except asyncio.TimeoutError:
@@ -155,6 +156,23 @@ class AuctionClassFactory(FuelClassFactory):
             return FuelClassFactory.generate_shipping(*args, **kwargs)
 
 
+class CombinatorialAuctionClassFactory(AuctionClassFactory):
+
+    @staticmethod
+    def generate_market(*args, **kwargs):
+        """
+        Generates a market that allows bidding on bundles of trades.
+        Default: py:class:`mable.combinatorial_auction.CombinatorialAuctionMarket`.
+        :param args:
+            Positional args.
+        :param kwargs:
+            Keyword args.
+        :return:
+            The market.
+        """
+        return CombinatorialAuctionMarket(*args, **kwargs)
+
+
 class CompetitionBuilder(FuelSimulationFactory):
 
     def generate_shipping_companies(self, *args, **kwargs):
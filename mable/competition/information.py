@@ -2,15 +2,189 @@
 Safe distribution of information to companies.
 """
 import copy
-from typing import TYPE_CHECKING, Dict, List
+import warnings
+from typing import TYPE_CHECKING, Dict, List, Tuple, Hashable, Any
 
+import attrs
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from mable.extensions import world_ports
 from mable.shipping_market import Contract
+from mable.simulation_space.universe import OnJourney
+from mable.transport_operation import CargoHold, CargoCapacity
+from mable.transportation_scheduling import Schedule
 
 if TYPE_CHECKING:
     from mable.engine import SimulationEngine
-    from mable.simulation_space.universe import OnJourney, Location, Port
+    from mable.simulation_space.universe import Location, Port
     from mable.transport_operation import Vessel, ShippingCompany
     from mable.shipping_market import AuctionAllocationResult, Trade
+    from mable.extensions.fuel_emissions import VesselEngine, VesselWithEngine
+
+
+@attrs.frozen(kw_only=True)
+class VesselRecord:
+    """
+    An immutable lightweight record of a vessel at one point in time.
+
+    :param name: The name of the vessel.
+    :type name: str
+    :param location: The location of the vessel at the time of the record.
+    :type location: Location | OnJourney
+    :param speed: The speed of the vessel.
+    :type speed: float
+    :param capacities_and_loading_rates: The cargo types with capacity and loading rate in the form
+        (cargo type, capacity, loading rate).
+    :type capacities_and_loading_rates: Tuple[Tuple[Hashable, float, float], ...]
+    :param propelling_engine: A copy of the vessel's engine.
+    :type propelling_engine: VesselEngine
+    :param simulation_engine: The simulation engine for the schedules of the record.
+    :type simulation_engine: SimulationEngine
+    """
+    name: str
+    location: Any
+    speed: float
+    capacities_and_loading_rates: Tuple[Tuple[Hashable, float, float], ...]
+    propelling_engine: Any
+    _simulation_engine: Any = attrs.field(default=None, eq=False, repr=False)
+    _schedule: Schedule = attrs.field(init=False, eq=False, repr=False)
+
+    @_schedule.default
+    def _init_schedule(self):
+        return Schedule.init_with_engine(self, 0, self._simulation_engine)
+
+    @classmethod
+    def from_vessel(cls, vessel, simulation_engine=None):
+        """
+        :param vessel: The vessel.
+        :type vessel: VesselWithEngine
+        :param simulation_engine: The simulation engine for the schedules of the record.
+        :type simulation_engine: SimulationEngine
+        :return: The record of the vessel's current state.
+        :rtype: VesselRecord
+        """
+        return cls(
+            name=vessel.name,
+            location=vessel.location,
+            speed=vessel.speed,
+            capacities_and_loading_rates=cls._get_capacities_and_loading_rates(vessel),
+            propelling_engine=copy.deepcopy(vessel.propelling_engine),
+            simulation_engine=simulation_engine)
+
+    @staticmethod
+    def _get_capacities_and_loading_rates(vessel):
+        return tuple(
+            (one_capacity.cargo_type, one_capacity.capacity, one_capacity.loading_rate)
+            for one_capacity in vessel.capacities_and_loading_rates)
+
+    def has_same_specifications(self, vessel):
+        """
+        :param vessel: The vessel.
+        :type vessel: VesselWithEngine
+        :return: True if the name, speed, capacities and engine parameters of the record are those of the vessel.
+        :rtype: bool
+        """
+        engine = vessel.propelling_engine
+        return (self.name == vessel.name
+                and self.speed == vessel.speed
+                and self.capacities_and_loading_rates == self._get_capacities_and_loading_rates(vessel)
+                and self.propelling_engine.fuel == engine.fuel
+                and self.propelling_engine.idle_consumption == engine.idle_consumption
+                and self.propelling_engine.laden_consumption_rate == engine.laden_consumption_rate
+                and self.propelling_engine.ballast_consumption_rate == engine.ballast_consumption_rate
+                and self.propelling_engine.loading_consumption == engine.loading_consumption
+                and self.propelling_engine.unloading_consumption == engine.unloading_consumption)
+
+    @property
+    def schedule(self):
+        """
+        An empty schedule for the vessel of the record, e.g. to estimate a competitor's cost of a trade.
+        The competitor's actual schedule is not disclosed.
+
+        The schedule is created once per record and shared by all companies, i.e. use a copy
+        (see :py:func:`Schedule.copy`) to add tasks.
+
+        :return: The schedule.
+        :rtype: Schedule
+        """
+        return self._schedule
+
+    def copy_hold(self):
+        """
+        :return: An empty cargo hold with the capacities of the vessel.
+        :rtype: CargoHold
+        """
+        return CargoHold([CargoCapacity(cargo_type=t, capacity=c, loading_rate=r)
+                          for t, c, r in self.capacities_and_loading_rates])
+
+    def capacity(self, cargo_type):
+        """
+        :param cargo_type: The cargo type.
+        :type cargo_type: Hashable
+        :return: The capacity for the cargo type.
+        :rtype: float
+        """
+        return next(c for t, c, _ in self.capacities_and_loading_rates if t == cargo_type)
+
+    def loading_rate(self, cargo_type):
+        """
+        :param cargo_type: The cargo type.
+        :type cargo_type: Hashable
+        :return: The loading rate for the cargo type.
+        :rtype: float
+        """
+        return next(r for t, _, r in self.capacities_and_loading_rates if t == cargo_type)
+
+    def get_travel_time(self, distance):
+        """
+        See :py:func:`mable.transport_operation.SimpleVessel.get_travel_time`.
+        """
+        travel_time = float('inf')
+        if distance is not None:
+            travel_time = distance / self.speed
+        return travel_time
+
+    def get_loading_time(self, cargo_type, amount):
+        """
+        See :py:func:`mable.transport_operation.SimpleVessel.get_loading_time`.
+        """
+        return amount / self.loading_rate(cargo_type)
+
+    def get_co2_emissions(self, amount):
+        return self.propelling_engine.fuel.get_co2_emissions(amount)
+
+    def get_cost(self, amount):
+        return self.propelling_engine.fuel.get_cost(amount)
+
+    def get_idle_consumption(self, time):
+        return self.propelling_engine.get_idle_consumption(time)
+
+    def get_laden_consumption(self, time, speed):
+        return self.propelling_engine.get_laden_consumption(time, speed)
+
+    def get_ballast_consumption(self, time, speed):
+        return self.propelling_engine.get_ballast_consumption(time, speed)
+
+    def get_loading_consumption(self, time):
+        return self.propelling_engine.get_loading_consumption(time)
+
+    def get_unloading_consumption(self, time):
+        return self.propelling_engine.get_unloading_consumption(time)
+
+
+@attrs.frozen(kw_only=True)
+class CompanyRecord:
+    """
+    An immutable lightweight record of a company and its fleet at one point in time.
+
+    :param name: The name of the company.
+    :type name: str
+    :param fleet: The records of the company's vessels.
+    :type fleet: Tuple[VesselRecord, ...]
+    """
+    name: str
+    fleet: Tuple[VesselRecord, ...]
 
 
 class CompanyHeadquarters:
@@ -27,6 +201,12 @@ class CompanyHeadquarters:
         self._engine = simulation_engine
         self._sanitised_shipping_companies = None
         self._shipping_companies_update_time = None
+        self._company_records = None
+        self._company_records_update_time = None
+        self._company_records_version = 0
+        self._vessel_records = {}
+        self._vessel_position_index = None
+        self._vessel_position_index_time = None
 
     @property
     def current_time(self):
@@ -78,6 +258,104 @@ class CompanyHeadquarters:
         """
         return self._engine.world.network.get_distance(location_one, location_two)
 
+    def get_network_distances(self, origins, destinations):
+        """
+        Get the distances between all origins and all destinations in one call.
+
+        The locations can be locations (:py:class:`Location`), ports (:py:class:`Port`) or the names thereof.
+        Distances between ports are looked up in a table. For other locations the same warning as for
+        :py:func:`get_network_distance` applies.
+
+        :param origins: The origins.
+        :type origins: List[Port | Location | str]
+        :param destinations: The destinations.
+        :type destinations: List[Port | Location | str]
+        :return: The matrix of distances with one row per origin and one column per destination.
+            Entries are math.inf if no route between the locations exists.
+        :rtype: np.ndarray
+        """
+        return self._engine.world.network.get_distances(origins, destinations)
+
+    def _get_vessel_position_index(self):
+        """
+        The ball trees over the positions of the vessels of each company. The trees are rebuilt if the simulated time
+        has advanced since they were built, i.e. once per auction. In a
+        :py:class:`mable.extensions.world_ports.LatLongShippingNetwork` the trees are over the positions in radians
+        with the haversine metric and otherwise over the positions with the euclidean metric.
+
+        :return: Per company name the tree over the positions and the vessel records in the order of the tree's data.
+        :rtype: Dict[str, Tuple[BallTree | None, Tuple[VesselRecord, ...]]]
+        """
+        if self._vessel_position_index is None or self._vessel_position_index_time != self.current_time:
+            vessel_position_index = {}
+            is_lat_long = self._is_lat_long_network()
+            for one_company in self.get_company_records():
+                tree = None
+                if len(one_company.fleet) > 0:
+                    positions = self.get_vessel_locations(one_company.fleet)
+                    if is_lat_long:
+                        tree = BallTree(np.radians(positions), metric="haversine")
+                    else:
+                        tree = BallTree(positions, metric="euclidean")
+                vessel_position_index[one_company.name] = (tree, one_company.fleet)
+            self._vessel_position_index = vessel_position_index
+            self._vessel_position_index_time = self.current_time
+        return self._vessel_position_index
+
+    def _is_lat_long_network(self):
+        return isinstance(self._engine.world.network, world_ports.LatLongShippingNetwork)
+
+    def get_nearest_vessels(self, port, k=1, companies=None, rerank_by_network_distance=False):
+        """
+        Get the k vessels of each company that are closest to a port.
+
+        In a :py:class:`mable.extensions.world_ports.LatLongShippingNetwork` the closeness is the great-circle
+        distance between the vessel's current location and the port with the location's x being the latitude and y
+        being the longitude in decimal degrees. In other networks the closeness is the euclidean distance. The index
+        over the vessel positions is updated once per point in time, i.e. once per auction.
+
+        :param port: The port or the name of the port.
+        :type port: Port | str
+        :param k: The number of vessels per company.
+        :type k: int
+        :param companies: The names of the companies to consider. Default, i.e. None, is all companies.
+        :type companies: List[str] | None
+        :param rerank_by_network_distance: If True, the k closest vessels are ordered by the network distance
+            (see :py:func:`get_network_distances`) and the network distances are returned.
+        :type rerank_by_network_distance: bool
+        :return: Per company name the up to k closest vessels with their distance, in nautical miles in a
+            :py:class:`mable.extensions.world_ports.LatLongShippingNetwork`, in ascending order of distance.
+        :rtype: Dict[str, List[Tuple[VesselRecord, float]]]
+        """
+        if isinstance(port, str):
+            port = self._engine.world.network.get_port(port)
+        port_position = np.array([[port.x, port.y]])
+        is_lat_long = self._is_lat_long_network()
+        if is_lat_long:
+            port_position = np.radians(port_position)
+        nearest_vessels = {}
+        for company_name, (tree, fleet) in self._get_vessel_position_index().items():
+            if companies is not None and company_name not in companies:
+                continue
+            company_nearest_vessels = []
+            if tree is not None:
+                distances, indices = tree.query(port_position, k=min(k, len(fleet)))
+                distances = distances[0]
+                if is_lat_long:
+                    distances = distances * world_ports.EARTH_RADIUS_METRES * world_ports.NAUTICAL_MILES_PER_METRE
+                vessels = [fleet[i] for i in indices[0]]
+                if rerank_by_network_distance:
+                    vessel_locations = [
+                        self.get_journey_location(v.location, v) if isinstance(v.location, OnJourney) else v.location
+                        for v in vessels]
+                    distances = self.get_network_distances(vessel_locations, [port])[:, 0]
+                    order = np.argsort(distances, kind="stable")
+                    vessels = [vessels[i] for i in order]
+                    distances = distances[order]
+                company_nearest_vessels = list(zip(vessels, distances.tolist()))
+            nearest_vessels[company_name] = company_nearest_vessels
+        return nearest_vessels
+
     def get_journey_location(self, journey, vessel, time=None):
         """
         Get the current location of a vessel on a journey.
@@ -102,11 +380,98 @@ class CompanyHeadquarters:
         current_location = self._engine.world.network.get_journey_location(journey, vessel, time)
         return current_location
 
+    def get_vessel_locations(self, vessels, time=None):
+        """
+        Get the coordinates of the locations of several vessels in one call.
+        See :py:func:`mable.simulation_space.structure.ShippingNetwork.get_vessel_locations`.
+
+        :param vessels: The vessels or vessel records.
+        :type vessels: List[Vessel | VesselRecord]
+        :param time: The time at which the locations will be calculated. Default, i.e. None, is the current time.
+        :type time: float
+        :return: The coordinates (x, y) of each vessel's location with one row per vessel.
+        :rtype: np.ndarray
+        """
+        if time is None:
+            time = self.current_time
+        return self._engine.world.network.get_vessel_locations(vessels, time)
+
+    @property
+    def companies_version(self):
+        """
+        The version of the snapshot returned by :py:func:`get_company_records`. The version increases whenever
+        any vessel's record has changed between two snapshots.
+
+        :return: The version.
+        :rtype: int
+        """
+        return self._company_records_version
+
+    def _update_company_record(self, company, company_record):
+        """
+        Update the records of all vessels whose location or specifications have changed since the last record.
+
+        :param company: The company.
+        :type company: ShippingCompany
+        :param company_record: The company's last record or None if there is no record yet.
+        :type company_record: CompanyRecord | None
+        :return: The record (the passed record if nothing has changed).
+        :rtype: CompanyRecord
+        """
+        has_changed = company_record is None
+        for one_vessel in company.fleet:
+            vessel_record = self._vessel_records.get(one_vessel)
+            if vessel_record is None or not vessel_record.has_same_specifications(one_vessel):
+                vessel_record = VesselRecord.from_vessel(one_vessel, self._engine)
+                has_changed = True
+            elif vessel_record.location is not one_vessel.location:
+                vessel_record = attrs.evolve(vessel_record, location=one_vessel.location)
+                has_changed = True
+            self._vessel_records[one_vessel] = vessel_record
+        if has_changed:
+            company_record = CompanyRecord(
+                name=company.name,
+                fleet=tuple(self._vessel_records[one_vessel] for one_vessel in company.fleet))
+        return company_record
+
+    def get_company_records(self):
+        """
+        Get a snapshot of all companies with their fleets.
+
+        The snapshot is updated if the simulated time has advanced. Only the records of vessels whose location
+        or specifications have changed are renewed. All other records are shared with the previous snapshot.
+
+        :return: The records of all companies.
+        :rtype: Tuple[CompanyRecord, ...]
+        """
+        if (self._company_records is None
+                or (self._company_records_update_time is not None
+                    and self._company_records_update_time < self.current_time)):
+            previous_records = self._company_records
+            if previous_records is None:
+                previous_records = [None] * len(self._engine.shipping_companies)
+            company_records = tuple(
+                self._update_company_record(one_company, one_company_record)
+                for one_company, one_company_record in zip(self._engine.shipping_companies, previous_records))
+            if self._company_records is None or any(
+                    a is not b for a, b in zip(company_records, self._company_records)):
+                self._company_records = company_records
+                self._company_records_version += 1
+            self._company_records_update_time = self.current_time
+        return self._company_records
+
     def get_companies(self):
         """
-        Get all companies.
-        :return:
+        Get all companies as copies of the companies with copies of their vessels.
+
+        **Deprecated**: Use :py:func:`get_company_records`, which only renews the records of vessels that have
+        changed.
+
+        :return: The companies.
+        :rtype: List[ShippingCompany]
         """
+        warnings.warn("get_companies is deprecated, use get_company_records instead.", DeprecationWarning,
+                      stacklevel=2)
         if (self._sanitised_shipping_companies is None
                 or (self._shipping_companies_update_time is not None
                     and self._shipping_companies_update_time < self.current_time)):
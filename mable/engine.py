@@ -223,6 +223,27 @@ class SimulationEngine:
                                f" the schedules were rejected due to scheduling the same trade more than once.")
             del self._new_schedules[one_company]
 
+    def revalidate_schedules(self, location_pairs):
+        """
+        Recompute the travel times between the location pairs in the current schedules of all vessels and verify the
+        timing of the updated schedules. Schedules are kept even if their timing is no longer valid.
+
+        :param location_pairs: The pairs of locations in either direction whose distances changed.
+        :type location_pairs: Set[Tuple[Location, Location]]
+        :return: The vessels with updated schedules and whether the updated schedule's timing is valid.
+        :rtype: Dict[Vessel, bool]
+        """
+        validity_per_vessel = {}
+        for one_company in self.shipping_companies:
+            for one_vessel in one_company.fleet:
+                if one_vessel.update_schedule_travel_times(location_pairs):
+                    is_valid = one_vessel.schedule.verify_schedule_time()
+                    validity_per_vessel[one_vessel] = is_valid
+                    if not is_valid:
+                        logger.warning(f"For company {one_company.name} and vessel {one_vessel.name}"
+                                       f" the schedule's time constraints are no longer satisfied.")
+        return validity_per_vessel
+
     @property
     def world(self):
         """
@@ -149,11 +149,67 @@ class CargoEvent(Event):
         """
         all_trades = engine.shipping.get_trades(self.time)
         self.info = f"#Trades: {len(all_trades)}"
-        engine.headquarters.get_companies()
+        engine.headquarters.get_company_records()
         distribution_info = engine.market.distribute_trades(self.time, all_trades, engine.shipping_companies)
         return distribution_info
 
 
+class CanalStatusEvent(Event):
+    """
+    An event that closes or reopens a canal of a network that supports canal closures, e.g.
+    :py:class:`mable.extensions.world_ports.LatLongShippingNetwork`.
+
+    The simulation does not schedule canal events itself, i.e. the event has to be added to the event queue, e.g.
+    ``engine.world.event_queue.put(CanalStatusEvent(time, "Suez", is_open=False))``. Only the canals of the network
+    can be closed and not arbitrary edges of the routing graph.
+    """
+
+    def __init__(self, time, canal_name, is_open):
+        """
+        :param time: The time of the event.
+        :type time: float
+        :param canal_name: The name of the canal.
+        :type canal_name: str
+        :param is_open: True to reopen the canal and False to close it.
+        :type is_open: bool
+        """
+        super().__init__(time)
+        self._canal_name = canal_name
+        self._is_open = is_open
+
+    @property
+    def canal_name(self):
+        return self._canal_name
+
+    @property
+    def is_open(self):
+        return self._is_open
+
+    def event_action(self, engine):
+        """
+        Changes the canal status, which updates the distances of the affected port pairs, and revalidates the
+        schedules of all vessels which travel between these ports.
+        See :py:func:`SimulationEngine.revalidate_schedules`.
+
+        :param engine: The simulation engine.
+        :type engine: SimulationEngine
+        :return: The vessels with updated schedules and whether the updated schedule's timing is valid.
+        :rtype: Dict[Vessel, bool]
+        """
+        network = engine.world.network
+        if self._is_open:
+            affected_pairs = network.open_canal(self._canal_name)
+        else:
+            affected_pairs = network.close_canal(self._canal_name)
+        ports = network.ports
+        location_pairs = {(ports[index_one], ports[index_two]) for index_one, index_two in affected_pairs}
+        validity_per_vessel = engine.revalidate_schedules(location_pairs)
+        self.info = (f"{self._canal_name} {'opened' if self._is_open else 'closed'}."
+                     f" #Port pairs: {len(affected_pairs)}. #Schedules updated: {len(validity_per_vessel)}"
+                     f" of which invalid: {sum(not v for v in validity_per_vessel.values())}")
+        return validity_per_vessel
+
+
 class DurationEvent(Event):
     """
     An event that has a duration.
@@ -340,6 +396,7 @@ class TravelEvent(VesselEvent):
         super().__init__(time, vessel)
         self._origin = origin
         self._destination = destination
+        self._journey = None
         self._is_laden = False
         self.info = (f"{destination} travel (Vessel [name: {vessel.name}]: "
                      f"{origin}->{destination})")
@@ -347,11 +404,14 @@ class TravelEvent(VesselEvent):
     @property
     def location(self):
         """
-        The destination of the journey.
-        :return: Location
-            The destination
+        The journey, i.e. the journey the vessel started once the event has started.
+        :return: OnJourney
+            The journey.
         """
-        return OnJourney(origin=self._origin, destination=self._destination, start_time=self._time_started)
+        journey = self._journey
+        if journey is None:
+            journey = OnJourney(origin=self._origin, destination=self._destination, start_time=self._time_started)
+        return journey
 
     @property
     def is_laden(self):
@@ -365,22 +425,29 @@ class TravelEvent(VesselEvent):
 
     def distance(self, engine):
         """
-        The distance between origin and destination.
+        The distance between origin and destination. If the journey recorded its route the distance is the route's
+        length, i.e. the distance at departure.
         :param engine: Engine
             Simulation engine.
         :return: float
             The distance.
         """
-        return engine.world.network.get_distance(self._origin, self._destination)
+        if self._journey is not None and self._journey.route is not None:
+            distance = self._journey.route.length
+        else:
+            distance = engine.world.network.get_distance(self._origin, self._destination)
+        return distance
 
     def added_to_queue(self, engine):
         """
         Beside setting the start time the vessel's location is set to be on journey.
+        See :py:func:`mable.simulation_space.structure.ShippingNetwork.get_journey`.
         :param engine: Engine
             The simulation engine.
         """
         super().added_to_queue(engine)
-        self._vessel.location = OnJourney(self._origin, self._destination, self._time_started)
+        self._journey = engine.world.network.get_journey(self._origin, self._destination, self._time_started)
+        self._vessel.location = self._journey
 
     def event_action(self, engine):
         """
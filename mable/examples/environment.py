@@ -30,7 +30,8 @@ def get_specification_builder(
         trades_per_occurrence=1,
         num_auctions=2,
         fixed_trades=None,
-        use_only_precomputed_routes=True
+        use_only_precomputed_routes=True,
+        distance_matrix_file=None
     ):
     """
     Generate a specifications builder to specify a simulation settings.
@@ -51,6 +52,9 @@ def get_specification_builder(
     :param use_only_precomputed_routes: Only generate cargoes between ports that have a precomputed route.
         Default is True.
     :type use_only_precomputed_routes: bool
+    :param distance_matrix_file: The '.npy' file of the distances between all ports or None to not use a distance
+        matrix. See :py:class:`mable.extensions.world_ports.LatLongShippingNetwork`. Default is None.
+    :type distance_matrix_file: str | None
     :return: The specification builder.
     :rtype: FuelSpecsBuilder
     :raises FileNotFoundError: If the resource file does not exist.
@@ -64,7 +68,8 @@ def get_specification_builder(
         trades_per_occurrence=trades_per_occurrence,
         simulation_length=simulation_length,
         fixed_trades=fixed_trades,
-        use_only_precomputed_routes=use_only_precomputed_routes)
+        use_only_precomputed_routes=use_only_precomputed_routes,
+        distance_matrix_file=distance_matrix_file)
     return specifications_builder
 
 
@@ -76,7 +81,7 @@ def _get_specification_builder():
 
 def _generate_environment(specifications_builder, trade_occurrence_frequency,
                           trades_per_occurrence, simulation_length, environment_files_path=".",
-                          fixed_trades=None, use_only_precomputed_routes=False):
+                          fixed_trades=None, use_only_precomputed_routes=False, distance_matrix_file=None):
     """
     Initialises the environment of the simulation.
 
@@ -86,6 +91,9 @@ def _generate_environment(specifications_builder, trade_occurrence_frequency,
     :type environment_files_path: str
     :param use_only_precomputed_routes: Only generate cargoes between ports that have a precomputed route.
     :type use_only_precomputed_routes: bool
+    :param distance_matrix_file: The '.npy' file of the distances between all ports or None to not use a distance
+        matrix.
+    :type distance_matrix_file: str | None
     :raises FileNotFoundError: If the resource file does not exist.
     """
     try:
@@ -106,7 +114,8 @@ def _generate_environment(specifications_builder, trade_occurrence_frequency,
         specifications_builder.add_shipping_network(
             ports=real_ports,
             precomputed_routes_file=resource_files["precomputed_routes"],
-            graph_file=resource_files["routing_graph_world_mask"])
+            graph_file=resource_files["routing_graph_world_mask"],
+            distance_matrix_file=distance_matrix_file)
         transition_duration_path = resource_files["time_transition_distribution"]
         cargo_weight_path = resource_files["port_cargo_weight_distribution"]
         trade_frequency_path = resource_files["port_trade_frequency_distribution"]
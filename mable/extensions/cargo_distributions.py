@@ -2,7 +2,8 @@
 Extension to generate and transport cargoes based on cargo frequency and amount distributions
 and associated changes to shipping.
 """
-import pickle
+import os
+import threading
 from typing import Tuple
 
 import numpy as np
@@ -10,10 +11,11 @@ import pandas as pd
 import loguru
 
 from mable.shipping_market import TimeWindowTrade
-from mable.extensions.world_ports import LatLongFactory
+from mable.extensions.world_ports import LatLongFactory, load_route_store
 from mable.event_management import ArrivalEvent
 from mable.simulation_generation import SimulationBuilder
 from mable.shipping_market import Shipping
+from mable.simulation_environment import World
 from mable import instructions
 from mable.util import format_time
 
@@ -21,6 +23,10 @@ from mable.util import format_time
 logger = loguru.logger
 
 
+_LOADED_DISTRIBUTIONS = {}
+_LOADED_DISTRIBUTIONS_LOCK = threading.Lock()
+
+
 class DistributionSimulationBuilder(SimulationBuilder):
     """
     Adjustments to simulation generation.
@@ -72,22 +78,59 @@ class DistributionShipping(Shipping):
     Generate cargoes based on cargo distributions.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, batch_sampling=False, lazy_trades=False, **kwargs):
+        """
+        :param batch_sampling: If True the trades are sampled with
+            :py:func:`batch_sample_cargoes_from_port_distributions` and otherwise with
+            :py:func:`sample_cargoes_from_port_distributions`. Both sample from the same distribution but result
+            in different trades for the same seed. Default is False.
+        :type batch_sampling: bool
+        :param lazy_trades: If True the trades of a trading time are only generated on the first call of
+            :py:func:`get_trades` for the time. Every trading time has its own random stream for the generation and
+            the realisation (see :py:func:`get_trading_time_random`), so the trades and which of them occur do not
+            depend on the order of the calls. Otherwise,
+            all trades are generated on construction. Default is False.
+        :type lazy_trades: bool
+        """
+        self._batch_sampling = batch_sampling
+        self._lazy_trades = lazy_trades
         self._time_transition_dist = None
         self._cargo_weight_dist = None
         self._frequency_dist = None
+        self._distribution_model = None
         self._trade_occurrence_frequency = kwargs['trade_occurrence_frequency'] * 24
         self._trades_per_occurrence = kwargs['trades_per_occurrence']
         self._simulation_length = kwargs['simulation_length']
+        self._world = None
+        self._class_factory = None
+        self._precomputed_routes = None
+        self._trading_times = []
+        self._pending_trading_times = set()
+        self._evicted_trading_times = set()
+        self._trading_time_entropy = None
+        self._trading_time_randoms = {}
         super().__init__(*args, **kwargs)
 
     @property
     def trade_occurrence_frequency(self):
         return self._trade_occurrence_frequency
 
+    @property
+    def distribution_model(self):
+        """
+        :return: The model of the loaded distributions or None if no distributions are loaded yet.
+        :rtype: CargoDistributionModel | None
+        """
+        return self._distribution_model
+
+    @property
+    def lazy_trades(self):
+        return self._lazy_trades
+
     def initialise_trades(self, *args, **kwargs):
         """
-        Generate all trades that occur over the run of the simulation.
+        Generate all trades that occur over the run of the simulation. If the trades are lazy only the trading times
+        are determined.
         :param args:
             Ignored.
         :param kwargs:
@@ -118,27 +161,147 @@ class DistributionShipping(Shipping):
                      f" cargo events.")
         precomputed_routes = None
         if not precomputed_routes_file is None:
-            with open(precomputed_routes_file, "rb") as f:
-                precomputed_routes = pickle.load(f)
-        for i in range(0, simulation_length + 1, trade_occurrence_frequency):
-            pickup_period_days = (i/24, (i + trade_occurrence_frequency - 1)/24)
+            precomputed_routes = load_route_store(precomputed_routes_file, world.network.ports)
+        self._world = world
+        self._class_factory = class_factory
+        self._precomputed_routes = precomputed_routes
+        if trades_per_occurrence > 0:
+            self._trading_times = list(range(0, simulation_length + 1, trade_occurrence_frequency))
+        if self._lazy_trades:
+            self._pending_trading_times = set(self._trading_times)
+            self._trading_time_entropy = world.random.randint(2**32, size=4, dtype=np.uint64).tolist()
+        else:
+            for i in self._trading_times:
+                self.add_to_all_trades(self._generate_trades(world, i))
+
+    def _generate_trades(self, world, time):
+        """
+        Sample the trades of one trading time.
+
+        :param world: The world. The world's random is used for the sampling.
+        :type world: World
+        :param time: The trading time.
+        :type time: int
+        :return: The trades.
+        :rtype: list[TimeWindowTrade]
+        """
+        pickup_period_days = (time/24, (time + self._trade_occurrence_frequency - 1)/24)
+        if self._batch_sampling:
+            cargoes_generated = self.batch_sample_cargoes_from_port_distributions(
+                world,
+                self._class_factory,
+                self._trades_per_occurrence,
+                pickup_period_days,
+                time=time,
+                precomputed_routes=self._precomputed_routes)
+        else:
             cargoes_generated = self.sample_cargoes_from_port_distributions(
                 world,
-                class_factory,
-                trades_per_occurrence,
+                self._class_factory,
+                self._trades_per_occurrence,
                 self._cargo_weight_dist,
                 self._frequency_dist,
                 self._time_transition_dist,
                 pickup_period_days,
-                time=i,
-                precomputed_routes=precomputed_routes)
-            logger.debug(f"Generated {len(cargoes_generated)} cargoes for time {i} [At {format_time(i)}].")
-            self.add_to_all_trades(cargoes_generated)
+                time=time,
+                precomputed_routes=self._precomputed_routes,
+                distribution_model=self._distribution_model)
+        logger.debug(f"Generated {len(cargoes_generated)} cargoes for time {time} [At {format_time(time)}].")
+        return cargoes_generated
+
+    def get_trading_time_random(self, time):
+        """
+        Returns a new random for the generation and realisation of the trades of a trading time if the trades are
+        lazy.
+
+        The random is seeded from entropy drawn once from the world's random on construction and the index of the
+        trading time, i.e. the random is the same for every call with the same time.
+
+        :param time: The trading time.
+        :type time: int
+        :return: The random.
+        :rtype: np.random.RandomState
+        """
+        seed_sequence = np.random.SeedSequence(
+            self._trading_time_entropy, spawn_key=(int(time) // self._trade_occurrence_frequency,))
+        return np.random.RandomState(np.random.MT19937(seed_sequence))
+
+    def get_trading_times(self):
+        """
+        All times at which new cargoes will become available including the times of lazy trades that are not
+        generated yet.
+
+        :return: list
+            The list of times.
+        """
+        if self._lazy_trades:
+            times = list(self._trading_times)
+        else:
+            times = super().get_trading_times()
+        return times
+
+    def get_trades(self, time):
+        """
+        Get trades for a specific time. If the trades are lazy and the trades of the time are not generated yet,
+        they are generated first.
+
+        :param time: The time.
+        :type time: float
+        :return: The list of trades.
+        :rtype: List[Trade]
+        """
+        if time in self._pending_trading_times:
+            self._pending_trading_times.remove(time)
+            trading_time_random = self.get_trading_time_random(time)
+            trading_time_world = World(self._world.network, self._world.event_queue, trading_time_random)
+            self.add_to_all_trades(self._generate_trades(trading_time_world, time))
+            self._trading_time_randoms[time] = trading_time_random
+        elif time in self._evicted_trading_times:
+            logger.warning(f"Trades of time {time} were requested after they were evicted.")
+        return super().get_trades(time)
+
+    def get_realisation_random(self, time):
+        """
+        Returns the random to realise the trades of a time with. If the trades are lazy this is the random stream of
+        the trading time that continues after the generation of the trades, so the realisation does not depend on the
+        order in which the trading times are requested either.
+
+        :param time: The time.
+        :type time: float
+        :return: The random.
+        :rtype: np.random.RandomState
+        """
+        random = self._trading_time_randoms.pop(time, None)
+        if random is None:
+            random = super().get_realisation_random(time)
+        return random
+
+    def evict_trades(self, time):
+        """
+        Drop the trades of all trading times before the time, e.g. of already realised auctions, to free memory.
+        Trades of evicted times that are lazy and not generated yet are never generated.
+
+        :param time: The time before which all trades are dropped.
+        :type time: float
+        :return: The evicted trading times.
+        :rtype: list[int]
+        """
+        evicted_times = sorted(t for t in set(self._all_trades) | self._pending_trading_times if t < time)
+        for one_time in evicted_times:
+            self._all_trades.pop(one_time, None)
+            self._occurred_trades.pop(one_time, None)
+            self._pending_trading_times.discard(one_time)
+        self._evicted_trading_times.update(evicted_times)
+        return evicted_times
 
     def load_distributions(self, port_transition_duration_distributions_path, port_cargo_weight_distribution_path,
                            port_trade_frequency_distribution_path):
         """
-        Load the distributions for the cargo generation.
+        Load the distributions for the cargo generation and build the :py:class:`CargoDistributionModel` that is used
+        for all samplings.
+
+        Distributions from files are loaded once per process and shared by all shippings with the same files
+        including the model and its sampling tables. Files that changed since loading are loaded again.
 
         :param port_transition_duration_distributions_path:
             The path to the csv with information on the transit durations.
@@ -148,9 +311,28 @@ class DistributionShipping(Shipping):
             The path to the csv with information on the average visit frequency at the ports.
         """
 
-        self._time_transition_dist = pd.read_csv(port_transition_duration_distributions_path)
-        self._cargo_weight_dist = pd.read_csv(port_cargo_weight_distribution_path)
-        self._frequency_dist = pd.read_csv(port_trade_frequency_distribution_path)
+        paths = (port_transition_duration_distributions_path, port_cargo_weight_distribution_path,
+                 port_trade_frequency_distribution_path)
+        key = None
+        if all(isinstance(one_path, (str, os.PathLike)) for one_path in paths):
+            key = tuple((os.path.abspath(one_path), os.path.getmtime(one_path)) for one_path in paths)
+        with _LOADED_DISTRIBUTIONS_LOCK:
+            loaded_distributions = _LOADED_DISTRIBUTIONS.get(key)
+            if loaded_distributions is None:
+                distributions = tuple(pd.read_csv(one_path) for one_path in paths)
+                loaded_distributions = (*distributions, CargoDistributionModel(*distributions))
+                if key is not None:
+                    _LOADED_DISTRIBUTIONS[key] = loaded_distributions
+        (self._time_transition_dist, self._cargo_weight_dist, self._frequency_dist,
+         self._distribution_model) = loaded_distributions
+
+    @staticmethod
+    def clear_loaded_distributions():
+        """
+        Drop all distributions that are shared by the shippings (see :py:func:`load_distributions`).
+        """
+        with _LOADED_DISTRIBUTIONS_LOCK:
+            _LOADED_DISTRIBUTIONS.clear()
 
     @staticmethod
     def sample_cargo_weight(world, cargo_weight_dict, cargo_weight_distribution,
@@ -206,7 +388,14 @@ class DistributionShipping(Shipping):
         if cargo_weight_std == float('inf'):
             cargo_weight_std = mean_cargo_weight_std
 
-        # Sample from Gamma distribution fitted to the data
+        quantity = DistributionShipping._sample_gamma_cargo_weight(world, cargo_weight_mean, cargo_weight_std)
+        return quantity
+
+    @staticmethod
+    def _sample_gamma_cargo_weight(world, cargo_weight_mean, cargo_weight_std):
+        """
+        Sample from the Gamma distribution fitted to the mean and the standard deviation of the cargo weight.
+        """
         scale = cargo_weight_std ** 2 / cargo_weight_mean
         shape = cargo_weight_mean/scale
 
@@ -261,9 +450,6 @@ class DistributionShipping(Shipping):
         delivery_time_window : tuple
             Pickup time window consisting representing the time interval the delivery should be started and finished
         """
-        pickup_period_start_t = pickup_period[0]
-        pickup_period_end_t = pickup_period[1]
-
         transition_record = time_transition_dict.get((start_port, end_port))
         if transition_record is None:
             transition_record = time_transit_distribution[((time_transit_distribution.From == start_port) &
@@ -281,6 +467,19 @@ class DistributionShipping(Shipping):
         if transition_std == float('inf'):
             transition_std = mean_transition_std
 
+        return DistributionShipping._sample_time_windows_from_transition(
+            world, transition_mean, transition_std, cargo_weight, pickup_period, time_windows_allowance)
+
+    @staticmethod
+    def _sample_time_windows_from_transition(world, transition_mean, transition_std, cargo_weight, pickup_period,
+                                             time_windows_allowance=5):
+        """
+        Sample the time windows from the mean and the standard deviation of the sailing time.
+        See :py:func:`sample_time_windows`.
+        """
+        pickup_period_start_t = pickup_period[0]
+        pickup_period_end_t = pickup_period[1]
+
         time_window_in_hours = world.random.normal(transition_mean, transition_std)
 
         # Convert from minutes to days
@@ -352,7 +551,8 @@ class DistributionShipping(Shipping):
             pickup_period,
             time,
             regional_changes=None,
-            precomputed_routes=None):
+            precomputed_routes=None,
+            distribution_model=None):
         """Samples a given number of trades based on distributions.
 
         Parameters
@@ -399,6 +599,11 @@ class DistributionShipping(Shipping):
         regional_changes : dict, optional
             TODO: implement regional changes
             A dictionary encoding the regional changes as passed from the web app (default is None)
+        precomputed_routes : RouteStore, optional
+            If provided, only trades between ports with stored routes are sampled (default is None)
+        distribution_model : CargoDistributionModel, optional
+            The model of the three distributions. If not provided, the model is built from the distributions for this
+            sampling only (default is None)
 
         :return: list
             List of Cargo objects of length specified
@@ -407,37 +612,20 @@ class DistributionShipping(Shipping):
         new_cargoes = []
         cargo_weight_threshold = 1
 
-        # Filter out outliers
-        time_transit_distribution = self.filter_out_outliers(time_transit_distribution)
-        cargo_weight_distribution = self.filter_out_outliers(cargo_weight_distribution)
-
-        # Get average standard deviations to use when missing
-        mean_transition_std = time_transit_distribution[time_transit_distribution['Std. Dev'] != float('inf')][
-            'Std. Dev'].mean(axis=0)
-        mean_cargo_weight_std = cargo_weight_distribution[cargo_weight_distribution['Std. Dev'] != float('inf')][
-            'Std. Dev'].mean(axis=0)
-
-        # Dictionaries to improve speed
-        all_transition_ports = set(list(time_transit_distribution.From.values)
-                                   + list(time_transit_distribution.To.values))
-        cargo_weight_dict = {}
-        time_transition_dict = {}
-        demand_transition_dict = {}
+        if distribution_model is None:
+            distribution_model = CargoDistributionModel(
+                time_transit_distribution, cargo_weight_distribution, frequency_distribution)
+        port_names = distribution_model.port_names
         port_objects_dict = {}
 
-        # To sample start ports, we only consider ports previously supplying cargo
-        supply_data = frequency_distribution[frequency_distribution['SupplyDemand'] == 'Supply']
-
-        total_supply_trades = np.sum(supply_data['Num Samples'].values)
-        supply_probs = (supply_data['Num Samples'] / total_supply_trades).values
-
         # TODO: May result in an infinite loop if bad data is given
         while len(new_cargoes) < number_of_cargoes:
             # Sample a starting port based on historical frequency of trades starting from ports
-            sampled_start_port_name = world.random.choice(supply_data['Port'].values, 1, replace=True, p=supply_probs)[0]
+            sampled_start_port_index = distribution_model.sample_supply_port(world.random)
+            sampled_start_port_name = port_names[sampled_start_port_index]
 
             # skip if no transition links exist
-            if sampled_start_port_name not in all_transition_ports:
+            if not distribution_model.has_transitions(sampled_start_port_index):
                 continue
 
             sampled_start_port = port_objects_dict.get(sampled_start_port_name)
@@ -451,50 +639,30 @@ class DistributionShipping(Shipping):
                     #                                                         start_port_long,
                     #                                                         start_port_lat)
 
-                    port_objects_dict[sampled_start_port] = sampled_start_port
+                    port_objects_dict[sampled_start_port_name] = sampled_start_port
                 except KeyError:
                     logger.warning(f"Sampled port {sampled_start_port_name} not in network.")
                     continue
 
             # Sample supply cargo quantity
-            supply_quantity = self.sample_cargo_weight(world, cargo_weight_dict, cargo_weight_distribution,
-                                                       mean_cargo_weight_std, sampled_start_port_name,
-                                                       supply_demand='Supply')
+            supply_quantity = self._sample_gamma_cargo_weight(
+                world, *distribution_model.get_cargo_weight_distribution(sampled_start_port_index, 'Supply'))
 
             # Sample end port from historical trades including the sampled start port
-            demand_data_from_port = demand_transition_dict.get(sampled_start_port_name)
-            if demand_data_from_port is None:
-                time_transit_distribution_from = time_transit_distribution[time_transit_distribution.From
-                                                                           == sampled_start_port_name]['To'].unique()
-                time_transit_distribution_to = time_transit_distribution[time_transit_distribution.To
-                                                                         == sampled_start_port_name]['From'].unique()
-                existent_to_transitions = list(time_transit_distribution_from) + list(time_transit_distribution_to)
-
-                demand_data_from_port = frequency_distribution[(frequency_distribution['SupplyDemand'] == 'Demand') &
-                                                               (frequency_distribution['Port']
-                                                                .isin(existent_to_transitions))]
-
-                demand_transition_dict[sampled_start_port_name] = demand_data_from_port
-
-            if len(demand_data_from_port['Num Samples'].values) == 0:
+            sampled_end_port_index = distribution_model.sample_demand_port(world.random, sampled_start_port_index)
+            if sampled_end_port_index is None:
                 # skip if no historical links from start port
                 continue
-            else:
-                total_demand_trades = np.sum(demand_data_from_port['Num Samples'].values)
-                demand_probs_from_port = (demand_data_from_port['Num Samples'] / total_demand_trades).values
-
-            sampled_end_port_name = world.random.choice(demand_data_from_port['Port'].values, 1,
-                                                        replace=True, p=demand_probs_from_port)[0]
+            sampled_end_port_name = port_names[sampled_end_port_index]
 
             # skip if the ports selected coincide
-            if sampled_start_port_name == sampled_end_port_name:
+            if sampled_start_port_index == sampled_end_port_index:
                 continue
 
             # Do not proceed if precomputed routes are provided and route is  not in precomputed
             if not precomputed_routes is None:
-                key_forward = f"{sampled_start_port_name}{sampled_end_port_name}"
-                key_backwards = f"{sampled_end_port_name}{sampled_start_port_name}"
-                if not (key_forward in precomputed_routes or key_backwards in precomputed_routes):
+                if not precomputed_routes.has_routes(world.network.get_port_index(sampled_start_port_name),
+                                                     world.network.get_port_index(sampled_end_port_name)):
                     logger.warning(f"No precomputed route between sampled ports "
                                    f"{sampled_start_port_name} and {sampled_end_port_name}.")
                     continue
@@ -515,9 +683,8 @@ class DistributionShipping(Shipping):
                     continue
 
             # Sample demand cargo quantity
-            demand_quantity = self.sample_cargo_weight(world, cargo_weight_dict, cargo_weight_distribution,
-                                                       mean_cargo_weight_std, sampled_end_port_name,
-                                                       supply_demand='Demand')
+            demand_quantity = self._sample_gamma_cargo_weight(
+                world, *distribution_model.get_cargo_weight_distribution(sampled_end_port_index, 'Demand'))
 
             # Finally, we take the smaller number out of the sampled demand
             # and supply quantity as a final cargo weight for the trade
@@ -527,12 +694,10 @@ class DistributionShipping(Shipping):
                 continue
 
             # Get time windows
-            pickup_time_window, delivery_time_window = self.sample_time_windows(world, time_transition_dict,
-                                                                                time_transit_distribution,
-                                                                                mean_transition_std,
-                                                                                sampled_start_port_name,
-                                                                                sampled_end_port_name,
-                                                                                quantity, pickup_period)
+            pickup_time_window, delivery_time_window = self._sample_time_windows_from_transition(
+                world,
+                *distribution_model.get_transition_distribution(sampled_start_port_index, sampled_end_port_index),
+                quantity, pickup_period)
 
             # create the sampled trade
             # TODO set an appropriate time
@@ -550,3 +715,595 @@ class DistributionShipping(Shipping):
                 )
             new_cargoes.append(sampled_trade)
         return new_cargoes
+
+    def batch_sample_cargoes_from_port_distributions(
+            self,
+            world,
+            class_factory,
+            number_of_cargoes,
+            pickup_period,
+            time,
+            distribution_model=None,
+            precomputed_routes=None,
+            max_batch_size=2**20):
+        """
+        Samples a given number of trades based on distributions in batches.
+
+        Every round draws arrays of candidate trades and rejects candidates by the same rules as
+        :py:func:`sample_cargoes_from_port_distributions`: start ports without transitions, ports that are not in
+        the network, start ports without destinations, coinciding ports, ports without precomputed routes and cargo
+        weights not above the threshold. Rounds are drawn until enough candidates are accepted. The trades follow the
+        same distribution as the trades of :py:func:`sample_cargoes_from_port_distributions` and are reproducible
+        for the same state of the random, but the random numbers are drawn in a different order.
+
+        :param world: The world.
+        :type world: World
+        :param class_factory: The class factory to generate the trades.
+        :type class_factory: ClassFactory
+        :param number_of_cargoes: The number of trades to be sampled.
+        :type number_of_cargoes: int
+        :param pickup_period: The timestep interval in which trades needs to be picked up in days.
+        :type pickup_period: Tuple[float, float]
+        :param time: The time of the trades.
+        :type time: int
+        :param distribution_model: The model of the distributions. Default is :py:func:`distribution_model`.
+        :type distribution_model: CargoDistributionModel | None
+        :param precomputed_routes: If provided, only trades between ports with stored routes are sampled.
+        :type precomputed_routes: RouteStore | None
+        :param max_batch_size: The maximal number of candidates per round.
+        :type max_batch_size: int
+        :return: The trades.
+        :rtype: list[TimeWindowTrade]
+        """
+        if distribution_model is None:
+            distribution_model = self._distribution_model
+        cargo_weight_threshold = 1
+        port_names = distribution_model.port_names
+        network_ports = [world.network.get_port_or_default(name) for name in port_names]
+        is_in_network = np.array([p is not None for p in network_ports], dtype=bool)
+        network_port_indices = None
+        if precomputed_routes is not None:
+            network_port_indices = world.network.get_port_indices(list(port_names))
+        all_accepted = []
+        number_accepted = 0
+        acceptance_rate = 0.5
+        while number_accepted < number_of_cargoes:
+            batch_size = min(int(np.ceil((number_of_cargoes - number_accepted) / acceptance_rate * 1.1)),
+                             max_batch_size)
+            start_port_indices = distribution_model.sample_supply_ports(world.random, batch_size)
+            start_port_indices = start_port_indices[distribution_model.has_transitions(start_port_indices)]
+            self._warn_ports_not_in_network(port_names, start_port_indices, is_in_network)
+            start_port_indices = start_port_indices[is_in_network[start_port_indices]]
+            supply_quantities = self._sample_gamma_cargo_weight(
+                world, *distribution_model.get_cargo_weight_distributions(start_port_indices, 'Supply'))
+            end_port_indices = distribution_model.sample_demand_ports(world.random, start_port_indices)
+            is_accepted = (end_port_indices >= 0) & (start_port_indices != end_port_indices)
+            self._warn_ports_not_in_network(port_names, end_port_indices[is_accepted], is_in_network)
+            is_accepted[is_accepted] = is_in_network[end_port_indices[is_accepted]]
+            if precomputed_routes is not None:
+                has_routes = np.array([
+                    precomputed_routes.has_routes(network_port_indices[i], network_port_indices[j])
+                    for i, j in zip(start_port_indices[is_accepted], end_port_indices[is_accepted])], dtype=bool)
+                for i, j in set(zip(start_port_indices[is_accepted][~has_routes],
+                                    end_port_indices[is_accepted][~has_routes])):
+                    logger.warning(f"No precomputed route between sampled ports {port_names[i]} and {port_names[j]}.")
+                is_accepted[is_accepted] = has_routes
+            start_port_indices = start_port_indices[is_accepted]
+            end_port_indices = end_port_indices[is_accepted]
+            demand_quantities = self._sample_gamma_cargo_weight(
+                world, *distribution_model.get_cargo_weight_distributions(end_port_indices, 'Demand'))
+            quantities = np.minimum(supply_quantities[is_accepted], demand_quantities)
+            is_accepted = quantities > cargo_weight_threshold
+            start_port_indices = start_port_indices[is_accepted]
+            end_port_indices = end_port_indices[is_accepted]
+            quantities = quantities[is_accepted]
+            time_windows = self._batch_sample_time_windows_from_transitions(
+                world,
+                *distribution_model.get_transition_distributions(start_port_indices, end_port_indices),
+                quantities, pickup_period)
+            all_accepted.append((start_port_indices, end_port_indices, quantities, time_windows))
+            number_accepted += len(quantities)
+            acceptance_rate = max(len(quantities), 1) / batch_size
+        start_port_indices, end_port_indices, quantities, time_windows = (
+            np.concatenate(arrays)[:number_of_cargoes] for arrays in zip(*all_accepted))
+        new_cargoes = [
+            class_factory.generate_trade(
+                origin_port=network_ports[i],
+                destination_port=network_ports[j],
+                amount=quantity,
+                cargo_type="Oil",
+                time=time,
+                time_window=one_time_window)
+            for i, j, quantity, one_time_window in zip(
+                start_port_indices.tolist(), end_port_indices.tolist(), quantities.tolist(), time_windows.tolist())]
+        return new_cargoes
+
+    @staticmethod
+    def _warn_ports_not_in_network(port_names, port_indices, is_in_network):
+        for one_port_name in port_names[np.unique(port_indices[~is_in_network[port_indices]])]:
+            logger.warning(f"Sampled port {one_port_name} not in network.")
+
+    @staticmethod
+    def _batch_sample_time_windows_from_transitions(world, transition_means, transition_stds, cargo_weights,
+                                                    pickup_period, time_windows_allowance=5):
+        """
+        Vectorised :py:func:`_sample_time_windows_from_transition`.
+
+        :return: The pickup and delivery time windows with one row of four values per trade.
+        :rtype: np.ndarray
+        """
+        pickup_period_start_t = pickup_period[0]
+        pickup_period_end_t = pickup_period[1]
+        time_windows = np.empty((len(cargo_weights), 4))
+        if len(cargo_weights) == 0:
+            return time_windows
+        time_window_in_hours = world.random.normal(transition_means, transition_stds)
+        time_window = time_window_in_hours/(24 * 60)
+        port_loading_rate = 50000
+        port_unloading_rate = 70000
+        loading_time = np.trunc(cargo_weights/port_loading_rate)
+        pickup_period_absolute_end_t = pickup_period_end_t - time_windows_allowance - loading_time
+        pickup_time = world.random.randint(pickup_period_start_t, pickup_period_absolute_end_t)
+        window_origin_earliest = np.maximum(0, pickup_time - time_windows_allowance)
+        window_origin_latest = np.minimum(window_origin_earliest + 2 * time_windows_allowance, pickup_period_end_t)
+        unloading_time = np.trunc(cargo_weights / port_unloading_rate)
+        window_destination_earliest = window_origin_earliest + np.trunc(time_window) + unloading_time
+        window_destination_latest = window_destination_earliest + 2 * time_windows_allowance
+        time_windows[:, 0] = window_origin_earliest * 24
+        time_windows[:, 1] = window_origin_latest * 24
+        time_windows[:, 2] = window_destination_earliest * 24
+        time_windows[:, 3] = window_destination_latest * 24
+        return time_windows
+
+
+class CargoDistributionModel:
+    """
+    The distributions for the cargo generation compiled into integer indexed arrays.
+
+    The model is built once per set of distributions. It filters out the outliers (see
+    :py:func:`DistributionShipping.filter_out_outliers`) and replaces missing standard deviations by the average
+    standard deviations. Every port of the distributions has an index into :py:func:`port_names` and all per sample
+    lookups are array accesses:
+
+    - the means and standard deviations of the supply and demand cargo weights are arrays indexed by port,
+    - the sailing times are a sparse matrix of (from, to) port pairs in row major order,
+    - the demand ports of every origin are compressed sparse rows with the cumulative probabilities.
+
+    Single ports are sampled by a binary search of a uniform sample in the cumulative probabilities which is
+    equivalent to :py:func:`np.random.RandomState.choice` with the probabilities. Arrays of ports are sampled in
+    constant time per port with alias tables (Walker's alias method in Vose's variant). The alias tables of the supply
+    and of every origin's demand are built on first use and kept for the life of the model.
+    """
+
+    _SUPPLY_DEMAND_ROWS = {'Supply': 0, 'Demand': 1}
+
+    def __init__(self, time_transit_distribution, cargo_weight_distribution, frequency_distribution):
+        """
+        :param time_transit_distribution: The distributions of the sailing times between ports.
+        :type time_transit_distribution: pd.DataFrame
+        :param cargo_weight_distribution: The distributions of the cargo weights at the ports.
+        :type cargo_weight_distribution: pd.DataFrame
+        :param frequency_distribution: The number of trades at the ports.
+        :type frequency_distribution: pd.DataFrame
+        """
+        super().__init__()
+        self._time_transit_distribution = DistributionShipping.filter_out_outliers(time_transit_distribution)
+        self._cargo_weight_distribution = DistributionShipping.filter_out_outliers(cargo_weight_distribution)
+        self._frequency_distribution = frequency_distribution
+        self._mean_transition_std = self._get_mean_std(self._time_transit_distribution)
+        self._mean_cargo_weight_std = self._get_mean_std(self._cargo_weight_distribution)
+        self._port_names = pd.unique(np.concatenate([
+            frequency_distribution['Port'].values,
+            self._cargo_weight_distribution['Port'].values,
+            self._time_transit_distribution['From'].values,
+            self._time_transit_distribution['To'].values]))
+        self._port_indices = {name: i for i, name in enumerate(self._port_names)}
+        self._compile_cargo_weights()
+        self._compile_transitions()
+        self._compile_supply()
+        self._compile_demand()
+        self._supply_alias_table = None
+        self._demand_alias_probabilities = np.empty(len(self._demand_port_indices))
+        self._demand_aliases = np.empty(len(self._demand_port_indices), dtype=int)
+        self._has_demand_alias_table = np.zeros(len(self._port_names), dtype=bool)
+
+    @staticmethod
+    def _get_mean_std(distribution):
+        return distribution[distribution['Std. Dev'] != float('inf')]['Std. Dev'].mean(axis=0)
+
+    def _get_indices(self, port_names):
+        return np.array([self._port_indices[name] for name in port_names], dtype=int)
+
+    @staticmethod
+    def _get_cumulative_probabilities(num_samples):
+        """
+        The cumulative probabilities as determined by :py:func:`np.random.RandomState.choice`.
+        """
+        cumulative_probabilities = (num_samples / np.sum(num_samples)).cumsum()
+        cumulative_probabilities /= cumulative_probabilities[-1]
+        return cumulative_probabilities
+
+    def _compile_cargo_weights(self):
+        """
+        The first record per port and supply or demand. Ports without a record have NaN entries.
+        """
+        cargo_weight_distribution = self._cargo_weight_distribution.drop_duplicates(
+            ['Port', 'SupplyDemand'], keep='first')
+        cargo_weight_distribution = cargo_weight_distribution[
+            cargo_weight_distribution['SupplyDemand'].isin(list(self._SUPPLY_DEMAND_ROWS))]
+        rows = cargo_weight_distribution['SupplyDemand'].map(self._SUPPLY_DEMAND_ROWS).values
+        columns = self._get_indices(cargo_weight_distribution['Port'].values)
+        stds = cargo_weight_distribution['Std. Dev'].values.copy()
+        stds[stds == float('inf')] = self._mean_cargo_weight_std
+        self._cargo_weight_means = np.full((len(self._SUPPLY_DEMAND_ROWS), len(self._port_names)), np.nan)
+        self._cargo_weight_stds = np.full((len(self._SUPPLY_DEMAND_ROWS), len(self._port_names)), np.nan)
+        self._cargo_weight_means[rows, columns] = cargo_weight_distribution['Mean'].values
+        self._cargo_weight_stds[rows, columns] = stds
+
+    def _compile_transitions(self):
+        """
+        The first record of every unordered port pair in both directions.
+        """
+        number_of_ports = len(self._port_names)
+        from_indices = self._get_indices(self._time_transit_distribution['From'].values)
+        to_indices = self._get_indices(self._time_transit_distribution['To'].values)
+        unordered_keys = (np.minimum(from_indices, to_indices) * number_of_ports
+                          + np.maximum(from_indices, to_indices))
+        _, first_records = np.unique(unordered_keys, return_index=True)
+        from_indices = from_indices[first_records]
+        to_indices = to_indices[first_records]
+        means = self._time_transit_distribution['Mean'].values[first_records]
+        stds = self._time_transit_distribution['Std. Dev'].values[first_records].copy()
+        stds[stds == float('inf')] = self._mean_transition_std
+        is_not_loop = from_indices != to_indices
+        keys = np.concatenate([from_indices * number_of_ports + to_indices,
+                               (to_indices * number_of_ports + from_indices)[is_not_loop]])
+        order = np.argsort(keys)
+        self._transition_keys = keys[order]
+        self._transition_means = np.concatenate([means, means[is_not_loop]])[order]
+        self._transition_stds = np.concatenate([stds, stds[is_not_loop]])[order]
+        self._has_transitions = np.zeros(number_of_ports, dtype=bool)
+        self._has_transitions[from_indices] = True
+        self._has_transitions[to_indices] = True
+
+    def _compile_supply(self):
+        supply_data = self._frequency_distribution[self._frequency_distribution['SupplyDemand'] == 'Supply']
+        self._supply_port_indices = self._get_indices(supply_data['Port'].values)
+        self._supply_cumulative_probabilities = self._get_cumulative_probabilities(
+            supply_data['Num Samples'].values)
+
+    def _compile_demand(self):
+        """
+        The demand ports of every origin in the order of the frequency distribution, i.e. all demand records of ports
+        with a sailing time distribution with the origin.
+        """
+        number_of_ports = len(self._port_names)
+        demand_data = self._frequency_distribution[self._frequency_distribution['SupplyDemand'] == 'Demand']
+        demand_port_indices = self._get_indices(demand_data['Port'].values)
+        demand_num_samples = demand_data['Num Samples'].values
+        origins = self._transition_keys // number_of_ports
+        destinations = self._transition_keys % number_of_ports
+        is_demand_port = np.zeros(number_of_ports, dtype=bool)
+        is_demand_port[demand_port_indices] = True
+        records_per_port = [[] for _ in range(number_of_ports)]
+        for i, port_index in enumerate(demand_port_indices):
+            records_per_port[port_index].append(i)
+        origin_records = [[] for _ in range(number_of_ports)]
+        has_demand = is_demand_port[destinations]
+        for origin, destination in zip(origins[has_demand], destinations[has_demand]):
+            origin_records[origin].extend(records_per_port[destination])
+        self._demand_indptr = np.zeros(number_of_ports + 1, dtype=int)
+        self._demand_indptr[1:] = np.cumsum([len(records) for records in origin_records])
+        self._demand_port_indices = np.empty(self._demand_indptr[-1], dtype=int)
+        self._demand_cumulative_probabilities = np.empty(self._demand_indptr[-1])
+        for origin, records in enumerate(origin_records):
+            if len(records) > 0:
+                records = np.sort(records)
+                start, end = self._demand_indptr[origin], self._demand_indptr[origin + 1]
+                self._demand_port_indices[start:end] = demand_port_indices[records]
+                self._demand_cumulative_probabilities[start:end] = self._get_cumulative_probabilities(
+                    demand_num_samples[records])
+
+    @staticmethod
+    def build_alias_table(probabilities):
+        """
+        Build the alias table of a discrete distribution with Vose's variant of Walker's alias method.
+
+        A sample of the distribution is drawn with one uniform sample u in [0, 1): with n outcomes and
+        k = floor(u * n) the outcome is k if u * n - k < alias_probabilities[k] and aliases[k] otherwise.
+
+        :param probabilities: The probabilities of the outcomes.
+        :type probabilities: np.ndarray
+        :return: The alias probabilities and the aliases.
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        number_of_outcomes = len(probabilities)
+        scaled_probabilities = np.asarray(probabilities, dtype=float) * number_of_outcomes / np.sum(probabilities)
+        alias_probabilities = np.ones(number_of_outcomes)
+        aliases = np.arange(number_of_outcomes)
+        small = [i for i in range(number_of_outcomes) if scaled_probabilities[i] < 1]
+        large = [i for i in range(number_of_outcomes) if scaled_probabilities[i] >= 1]
+        while len(small) > 0 and len(large) > 0:
+            one_small = small.pop()
+            one_large = large.pop()
+            alias_probabilities[one_small] = scaled_probabilities[one_small]
+            aliases[one_small] = one_large
+            scaled_probabilities[one_large] += scaled_probabilities[one_small] - 1
+            if scaled_probabilities[one_large] < 1:
+                small.append(one_large)
+            else:
+                large.append(one_large)
+        # The remaining outcomes have a scaled probability of one up to rounding.
+        return alias_probabilities, aliases
+
+    @staticmethod
+    def _sample_alias_tables(uniform_samples, offsets, sizes, alias_probabilities, aliases):
+        """
+        Sample from alias tables that are stored one after the other.
+
+        :return: The sampled positions in the tables.
+        :rtype: np.ndarray
+        """
+        scaled_samples = uniform_samples * sizes
+        columns = np.minimum(scaled_samples.astype(int), sizes - 1)
+        positions = offsets + columns
+        is_alias = scaled_samples - columns >= alias_probabilities[positions]
+        positions[is_alias] = offsets[is_alias] + aliases[positions[is_alias]]
+        return positions
+
+    def _get_supply_alias_table(self):
+        if self._supply_alias_table is None:
+            self._supply_alias_table = self.build_alias_table(np.diff(self._supply_cumulative_probabilities,
+                                                                      prepend=0))
+        return self._supply_alias_table
+
+    def _build_demand_alias_tables(self, start_port_indices):
+        """
+        Build the missing alias tables of the demand of the start ports.
+        """
+        for one_start_port_index in np.unique(start_port_indices[~self._has_demand_alias_table[start_port_indices]]):
+            start, end = self._demand_indptr[one_start_port_index], self._demand_indptr[one_start_port_index + 1]
+            if end > start:
+                alias_probabilities, aliases = self.build_alias_table(
+                    np.diff(self._demand_cumulative_probabilities[start:end], prepend=0))
+                self._demand_alias_probabilities[start:end] = alias_probabilities
+                self._demand_aliases[start:end] = aliases
+            self._has_demand_alias_table[one_start_port_index] = True
+
+    @property
+    def time_transit_distribution(self):
+        """
+        :return: The distributions of the sailing times without outliers.
+        :rtype: pd.DataFrame
+        """
+        return self._time_transit_distribution
+
+    @property
+    def cargo_weight_distribution(self):
+        """
+        :return: The distributions of the cargo weights without outliers.
+        :rtype: pd.DataFrame
+        """
+        return self._cargo_weight_distribution
+
+    @property
+    def frequency_distribution(self):
+        return self._frequency_distribution
+
+    @property
+    def mean_transition_std(self):
+        """
+        :return: The average standard deviation of the sailing times. Used when a standard deviation is missing.
+        :rtype: float
+        """
+        return self._mean_transition_std
+
+    @property
+    def mean_cargo_weight_std(self):
+        """
+        :return: The average standard deviation of the cargo weights. Used when a standard deviation is missing.
+        :rtype: float
+        """
+        return self._mean_cargo_weight_std
+
+    @property
+    def port_names(self):
+        """
+        :return: The names of all ports of the distributions by port index.
+        :rtype: np.ndarray
+        """
+        return self._port_names
+
+    def get_port_index(self, name):
+        """
+        :param name: The name of a port.
+        :type name: str
+        :return: The index of the port or None if the port is not part of the distributions.
+        :rtype: int | None
+        """
+        return self._port_indices.get(name)
+
+    @property
+    def transition_ports(self):
+        """
+        :return: The names of all ports with at least one sailing time distribution.
+        :rtype: set[str]
+        """
+        return set(self._port_names[self._has_transitions])
+
+    def has_transitions(self, port_index):
+        """
+        :param port_index: The index of a port.
+        :type port_index: int
+        :return: True if the port has at least one sailing time distribution.
+        :rtype: bool
+        """
+        return self._has_transitions[port_index]
+
+    def get_cargo_weight_distribution(self, port_index, supply_demand):
+        """
+        :param port_index: The index of a port.
+        :type port_index: int
+        :param supply_demand: 'Supply' or 'Demand'.
+        :type supply_demand: str
+        :return: The mean and the standard deviation of the cargo weight.
+        :rtype: tuple[float, float]
+        :raises ValueError: If supply_demand is neither 'Supply' nor 'Demand'.
+        :raises KeyError: If the port has no cargo weight distribution.
+        """
+        row = self._SUPPLY_DEMAND_ROWS.get(supply_demand)
+        if row is None:
+            raise ValueError("Incorrect trade mode given!")
+        mean = self._cargo_weight_means[row, port_index]
+        if np.isnan(mean):
+            raise KeyError(f"No {supply_demand} cargo weight distribution for port {self._port_names[port_index]}.")
+        return mean, self._cargo_weight_stds[row, port_index]
+
+    def get_transition_distribution(self, start_port_index, end_port_index):
+        """
+        :param start_port_index: The index of the start port.
+        :type start_port_index: int
+        :param end_port_index: The index of the end port.
+        :type end_port_index: int
+        :return: The mean and the standard deviation of the sailing time in minutes.
+        :rtype: tuple[float, float]
+        :raises KeyError: If the ports have no sailing time distribution.
+        """
+        key = start_port_index * len(self._port_names) + end_port_index
+        k = np.searchsorted(self._transition_keys, key)
+        if k == len(self._transition_keys) or self._transition_keys[k] != key:
+            raise KeyError(f"No sailing time distribution between ports {self._port_names[start_port_index]}"
+                           f" and {self._port_names[end_port_index]}.")
+        return self._transition_means[k], self._transition_stds[k]
+
+    def get_demand_distribution(self, start_port_index):
+        """
+        Returns the distribution of the destinations for cargo from a port, i.e. all ports that demand cargo and have
+        a sailing time distribution with the port.
+
+        :param start_port_index: The index of the port.
+        :type start_port_index: int
+        :return: The indices of the destination ports and their cumulative probabilities.
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        start, end = self._demand_indptr[start_port_index], self._demand_indptr[start_port_index + 1]
+        return self._demand_port_indices[start:end], self._demand_cumulative_probabilities[start:end]
+
+    def sample_supply_port(self, random):
+        """
+        Sample a port based on the historical frequency of trades starting from the ports.
+
+        :param random: The random state.
+        :type random: np.random.RandomState
+        :return: The index of the port.
+        :rtype: int
+        """
+        k = self._supply_cumulative_probabilities.searchsorted(random.random_sample(), side='right')
+        return self._supply_port_indices[k]
+
+    def sample_demand_port(self, random, start_port_index):
+        """
+        Sample a destination port for cargo from a port based on the historical frequency of trades ending at the
+        ports with a sailing time distribution with the start port.
+
+        :param random: The random state.
+        :type random: np.random.RandomState
+        :param start_port_index: The index of the start port.
+        :type start_port_index: int
+        :return: The index of the port or None if the start port has no destinations.
+        :rtype: int | None
+        """
+        demand_port_indices, cumulative_probabilities = self.get_demand_distribution(start_port_index)
+        port_index = None
+        if len(demand_port_indices) > 0:
+            k = cumulative_probabilities.searchsorted(random.random_sample(), side='right')
+            port_index = demand_port_indices[k]
+        return port_index
+
+    def get_cargo_weight_distributions(self, port_indices, supply_demand):
+        """
+        Vectorised :py:func:`get_cargo_weight_distribution`.
+
+        :param port_indices: The indices of the ports.
+        :type port_indices: np.ndarray
+        :param supply_demand: 'Supply' or 'Demand'.
+        :type supply_demand: str
+        :return: The means and the standard deviations of the cargo weights.
+        :rtype: tuple[np.ndarray, np.ndarray]
+        :raises ValueError: If supply_demand is neither 'Supply' nor 'Demand'.
+        :raises KeyError: If any port has no cargo weight distribution.
+        """
+        row = self._SUPPLY_DEMAND_ROWS.get(supply_demand)
+        if row is None:
+            raise ValueError("Incorrect trade mode given!")
+        means = self._cargo_weight_means[row, port_indices]
+        is_missing = np.isnan(means)
+        if is_missing.any():
+            raise KeyError(f"No {supply_demand} cargo weight distribution for port"
+                           f" {self._port_names[port_indices[is_missing][0]]}.")
+        return means, self._cargo_weight_stds[row, port_indices]
+
+    def get_transition_distributions(self, start_port_indices, end_port_indices):
+        """
+        Vectorised :py:func:`get_transition_distribution`.
+
+        :param start_port_indices: The indices of the start ports.
+        :type start_port_indices: np.ndarray
+        :param end_port_indices: The indices of the end ports.
+        :type end_port_indices: np.ndarray
+        :return: The means and the standard deviations of the sailing times in minutes.
+        :rtype: tuple[np.ndarray, np.ndarray]
+        :raises KeyError: If any pair of ports has no sailing time distribution.
+        """
+        keys = start_port_indices * len(self._port_names) + end_port_indices
+        k = np.minimum(np.searchsorted(self._transition_keys, keys), len(self._transition_keys) - 1)
+        is_missing = self._transition_keys[k] != keys
+        if is_missing.any():
+            raise KeyError(f"No sailing time distribution between ports"
+                           f" {self._port_names[start_port_indices[is_missing][0]]}"
+                           f" and {self._port_names[end_port_indices[is_missing][0]]}.")
+        return self._transition_means[k], self._transition_stds[k]
+
+    def sample_supply_ports(self, random, size):
+        """
+        Sample ports based on the historical frequency of trades starting from the ports with the alias table of the
+        supply. The ports follow the same distribution as the ports of :py:func:`sample_supply_port`.
+
+        :param random: The random state.
+        :type random: np.random.RandomState
+        :param size: The number of ports to sample.
+        :type size: int
+        :return: The indices of the ports.
+        :rtype: np.ndarray
+        """
+        alias_probabilities, aliases = self._get_supply_alias_table()
+        number_of_supply_ports = len(self._supply_port_indices)
+        positions = self._sample_alias_tables(
+            random.random_sample(size), np.zeros(size, dtype=int), np.full(size, number_of_supply_ports),
+            alias_probabilities, aliases)
+        return self._supply_port_indices[positions]
+
+    def sample_demand_ports(self, random, start_port_indices):
+        """
+        Sample a destination port for each start port with the alias tables of the demand of the start ports. The
+        ports follow the same distribution as the ports of :py:func:`sample_demand_port`. One uniform sample is drawn
+        per start port.
+
+        :param random: The random state.
+        :type random: np.random.RandomState
+        :param start_port_indices: The indices of the start ports.
+        :type start_port_indices: np.ndarray
+        :return: The indices of the ports with -1 for every start port without destinations.
+        :rtype: np.ndarray
+        """
+        self._build_demand_alias_tables(start_port_indices)
+        uniform_samples = random.random_sample(len(start_port_indices))
+        offsets = self._demand_indptr[start_port_indices]
+        sizes = self._demand_indptr[start_port_indices + 1] - offsets
+        has_demand = sizes > 0
+        port_indices = np.full(len(start_port_indices), -1, dtype=int)
+        positions = self._sample_alias_tables(
+            uniform_samples[has_demand], offsets[has_demand], sizes[has_demand],
+            self._demand_alias_probabilities, self._demand_aliases)
+        port_indices[has_demand] = self._demand_port_indices[positions]
+        return port_indices
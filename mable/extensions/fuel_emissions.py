@@ -252,6 +252,26 @@ class VesselEngine:
     def fuel(self):
         return self._fuel
 
+    @property
+    def idle_consumption(self):
+        return self._idle_consumption
+
+    @property
+    def laden_consumption_rate(self):
+        return self._laden_consumption_rate
+
+    @property
+    def ballast_consumption_rate(self):
+        return self._ballast_consumption_rate
+
+    @property
+    def loading_consumption(self):
+        return self._loading_consumption
+
+    @property
+    def unloading_consumption(self):
+        return self._unloading_consumption
+
     def get_idle_consumption(self, time):
         return self._idle_consumption * time
 
@@ -0,0 +1,109 @@
+"""
+Offline computation of the routes between all ports.
+"""
+import multiprocessing
+import time
+
+import loguru
+
+from mable.extensions.world_ports import (
+    LatLongShippingNetwork, Route, RouteGeometry, RouteStore, save_distance_matrix)
+
+
+logger = loguru.logger
+
+
+_worker_state = {}
+
+
+def _initialise_worker(ports, graph_file):
+    """
+    Set up the network and the scenario graphs of a worker process.
+    """
+    network = LatLongShippingNetwork(ports, graph_file=graph_file)
+    _worker_state["network"] = network
+    _worker_state["scenarios"] = network.scenarios
+    _worker_state["scenario_graphs"] = [network.get_scenario_routing_graph(s) for s in network.scenarios]
+    _worker_state["port_node_ids"] = [
+        network.routing_graph.find_closest_node_id(p.longitude, p.latitude) for p in network.ports]
+
+
+def _compute_routes_from_port(task):
+    """
+    Compute the routes from one port to all ports with a higher index in one scenario with one single source
+    Dijkstra.
+
+    :param task: The index of the scenario and the index of the origin port.
+    :type task: Tuple[int, int]
+    :return: The task and per destination port index the route points and the route length.
+    :rtype: Tuple[Tuple[int, int], List[Tuple[int, List[Tuple[float, float]], float]]]
+    """
+    scenario_index, origin_index = task
+    network = _worker_state["network"]
+    graph = _worker_state["scenario_graphs"][scenario_index]
+    port_node_ids = _worker_state["port_node_ids"]
+    all_ports = network.ports
+    origin_port = all_ports[origin_index]
+    _, predecessors = graph.get_shortest_path_tree(port_node_ids[origin_index])
+    routes = []
+    for destination_index in range(origin_index + 1, len(all_ports)):
+        path_node_ids = graph.get_path_from_tree(predecessors, port_node_ids[origin_index],
+                                                 port_node_ids[destination_index])
+        if path_node_ids is None:
+            continue
+        path = [graph.get_node(node_id) for node_id in path_node_ids]
+        destination_port = all_ports[destination_index]
+        route = ([(origin_port.longitude, origin_port.latitude)]
+                 + path
+                 + [(destination_port.longitude, destination_port.latitude)])
+        route = [tuple(pt) for pt in network.smooth_route(route)]
+        routes.append((destination_index, route, network.compute_route_length(route)))
+    return task, routes
+
+
+def build_routes(ports, graph_file, route_geometry_file, distance_matrix_file=None, processes=None):
+    """
+    Compute the routes between all ports in all canal scenarios and save them in the columnar format
+    (see :py:class:`RouteGeometry`) and optionally as a distance matrix
+    (see :py:func:`LatLongShippingNetwork.build_distance_matrix`).
+
+    Each scenario graph is built once per process and every task is one single source Dijkstra from one port in one
+    scenario. The routes of one port pair are the distinct routes of all scenarios sorted by length as in
+    :py:func:`LatLongShippingNetwork.compute_all_routes_between_points`.
+
+    :param ports: The ports.
+    :type ports: List[LatLongPort]
+    :param graph_file: The file of the routing graph.
+    :type graph_file: str
+    :param route_geometry_file: The '.npz' file for the routes.
+    :type route_geometry_file: str
+    :param distance_matrix_file: The '.npy' file for the distance matrix or None to skip the matrix.
+    :type distance_matrix_file: str | None
+    :param processes: The number of processes. Default, i.e. None, is the number of CPUs.
+    :type processes: int | None
+    :return: The routes.
+    :rtype: RouteGeometry
+    """
+    start = time.perf_counter()
+    scenarios = LatLongShippingNetwork(ports, graph_file=graph_file).scenarios
+    tasks = [(scenario_index, origin_index)
+             for origin_index in range(len(ports) - 1)
+             for scenario_index in range(len(scenarios))]
+    routes_per_pair = {}
+    with multiprocessing.Pool(processes, initializer=_initialise_worker, initargs=(ports, graph_file)) as pool:
+        for (scenario_index, origin_index), routes in pool.imap_unordered(_compute_routes_from_port, tasks):
+            for destination_index, route, length in routes:
+                pair_routes = routes_per_pair.setdefault((origin_index, destination_index), set())
+                pair_routes.add(Route("", route, length, scenarios[scenario_index]))
+    precomputed_routes = {
+        f"{ports[origin_index].name}{ports[destination_index].name}": sorted(routes, key=lambda r: r.length)
+        for (origin_index, destination_index), routes in routes_per_pair.items()}
+    route_geometry = RouteGeometry.from_precomputed_routes(precomputed_routes, ports)
+    route_geometry.save(route_geometry_file)
+    logger.info(f"Computed {len(route_geometry.lengths)} routes between {len(precomputed_routes)} port pairs"
+                f" in {time.perf_counter() - start:.1f} seconds.")
+    if distance_matrix_file is not None:
+        route_store = RouteStore.from_route_geometry(route_geometry, ports)
+        save_distance_matrix(
+            distance_matrix_file, route_store.get_distance_matrix(len(ports)), route_geometry_file, ports)
+    return route_geometry
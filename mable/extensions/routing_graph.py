@@ -0,0 +1,543 @@
+"""
+A compact routing graph in compressed sparse row (CSR) format with compiled shortest path searches.
+"""
+import array
+import heapq
+import math
+import os
+import pickle
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from sklearn.neighbors import BallTree
+
+
+class CsrRoutingGraph:
+    """
+    An undirected weighted graph with integer node ids, an array of the nodes' (longitude, latitude) and a symmetric
+    CSR adjacency matrix of the edge weights.
+    """
+
+    def __init__(self, coordinates, adjacency):
+        """
+        :param coordinates: The (longitude, latitude) of each node.
+        :type coordinates: np.ndarray
+        :param adjacency: The symmetric matrix of the edge weights.
+        :type adjacency: csr_matrix
+        """
+        super().__init__()
+        self._coordinates = coordinates
+        self._adjacency = adjacency
+        self._node_ids = None
+        self._node_tree = None
+        self._adjacency_lists = None
+        self._heuristic_lists = None
+        self._heuristic_scale = None
+        self._landmark_ids = None
+        self._landmark_distances = None
+        self._reduced_adjacencies = {}
+
+    @classmethod
+    def from_edges(cls, edges):
+        """
+        Create a graph from a list of edges. If an edge is listed several times the last weight is used.
+
+        :param edges: The edges as rows of (long one, lat one, long two, lat two, weight).
+        :type edges: np.ndarray
+        :return: The graph.
+        :rtype: CsrRoutingGraph
+        """
+        edges = np.asarray(edges, dtype=float).reshape(-1, 5)
+        end_points = np.concatenate((edges[:, 0:2], edges[:, 2:4]))
+        coordinates, node_ids = np.unique(end_points, axis=0, return_inverse=True)
+        node_ids = node_ids.reshape(-1)
+        number_of_edges = len(edges)
+        return cls(coordinates, cls._create_adjacency(
+            len(coordinates), node_ids[:number_of_edges], node_ids[number_of_edges:], edges[:, 4]))
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """
+        Create a graph from a networkx graph whose nodes are (longitude, latitude).
+
+        :param graph: The networkx graph.
+        :type graph: networkx.Graph
+        :return: The graph.
+        :rtype: CsrRoutingGraph
+        """
+        edges = [(u[0], u[1], v[0], v[1], w) for u, v, w in graph.edges(data="weight")]
+        return cls.from_edges(edges)
+
+    @classmethod
+    def from_file(cls, graph_file):
+        """
+        Load a graph from a '.txt' file of edge rows (see :py:func:`from_edges`) or a '.pkl' file of a pickled
+        networkx graph.
+
+        :param graph_file: The path of the file.
+        :type graph_file: str
+        :return: The graph.
+        :rtype: CsrRoutingGraph
+        """
+        _, file_extension = os.path.splitext(graph_file)
+        graph = None
+        if file_extension == ".txt":
+            graph = cls.from_edges(np.loadtxt(graph_file))
+        elif file_extension == ".pkl":
+            with open(graph_file, "rb") as f:
+                graph = cls.from_networkx(pickle.load(f))
+        if graph is None:
+            raise Exception("Graph format invalid, no graph could be generated")
+        return graph
+
+    @staticmethod
+    def _create_adjacency(number_of_nodes, node_ids_one, node_ids_two, weights):
+        """
+        The symmetric adjacency matrix of edges where the last of duplicate edges counts and self loops are dropped.
+        """
+        lower = np.minimum(node_ids_one, node_ids_two)
+        upper = np.maximum(node_ids_one, node_ids_two)
+        is_edge = lower != upper
+        lower, upper, weights = lower[is_edge], upper[is_edge], weights[is_edge]
+        keys = lower.astype(np.int64) * number_of_nodes + upper
+        # unique of the reversed keys gives the last occurrence of each edge
+        _, last_indices = np.unique(keys[::-1], return_index=True)
+        last_indices = len(keys) - 1 - last_indices
+        lower, upper, weights = lower[last_indices], upper[last_indices], weights[last_indices]
+        adjacency = csr_matrix(
+            (np.concatenate((weights, weights)), (np.concatenate((lower, upper)), np.concatenate((upper, lower)))),
+            shape=(number_of_nodes, number_of_nodes))
+        return adjacency
+
+    @property
+    def coordinates(self):
+        return self._coordinates
+
+    @property
+    def adjacency(self):
+        return self._adjacency
+
+    @property
+    def number_of_nodes(self):
+        return len(self._coordinates)
+
+    def get_node(self, node_id):
+        """
+        :param node_id: The node id.
+        :type node_id: int
+        :return: The node as (longitude, latitude).
+        :rtype: Tuple[float, float]
+        """
+        long_, lat_ = self._coordinates[node_id].tolist()
+        return long_, lat_
+
+    def get_node_id(self, node):
+        """
+        :param node: The node as (longitude, latitude).
+        :type node: Tuple[float, float]
+        :return: The node id or None if no node has exactly the coordinates.
+        :rtype: int | None
+        """
+        if self._node_ids is None:
+            self._node_ids = {(long_, lat_): i for i, (long_, lat_) in enumerate(self._coordinates.tolist())}
+        return self._node_ids.get((node[0], node[1]))
+
+    def find_closest_node_id(self, long_, lat_):
+        """
+        The node with exactly the coordinates or otherwise the node with the smallest haversine distance.
+
+        :param long_: The longitude.
+        :type long_: float
+        :param lat_: The latitude.
+        :type lat_: float
+        :return: The node id.
+        :rtype: int
+        """
+        node_id = self.get_node_id((long_, lat_))
+        if node_id is None:
+            if self._node_tree is None:
+                self._node_tree = BallTree(np.radians(self._coordinates[:, ::-1]), metric="haversine")
+            _, indices = self._node_tree.query(np.radians([[lat_, long_]]), k=1)
+            node_id = int(indices[0, 0])
+        return node_id
+
+    def get_edge_weight(self, node_id_one, node_id_two):
+        """
+        :return: The weight of the edge or None if the nodes are not connected.
+        :rtype: float | None
+        """
+        row_start, row_end = self._adjacency.indptr[node_id_one], self._adjacency.indptr[node_id_one + 1]
+        matches = np.flatnonzero(self._adjacency.indices[row_start:row_end] == node_id_two)
+        weight = None
+        if len(matches) > 0:
+            weight = float(self._adjacency.data[row_start + matches[0]])
+        return weight
+
+    def with_edges(self, added_edges=None, removed_edges=None):
+        """
+        A copy of the graph with edges removed and added. The nodes and their ids are shared.
+
+        :param added_edges: The edges to add or update as (node id one, node id two, weight).
+        :type added_edges: List[Tuple[int, int, float]] | None
+        :param removed_edges: The edges to remove as (node id one, node id two).
+        :type removed_edges: List[Tuple[int, int]] | None
+        :return: The graph.
+        :rtype: CsrRoutingGraph
+        """
+        adjacency = self._adjacency.tocoo()
+        rows, columns, weights = adjacency.row, adjacency.col, adjacency.data
+        is_kept = rows < columns
+        if removed_edges:
+            removed_keys = [min(a, b) * self.number_of_nodes + max(a, b) for a, b in removed_edges]
+            is_kept &= ~np.isin(rows.astype(np.int64) * self.number_of_nodes + columns, removed_keys)
+        rows, columns, weights = rows[is_kept], columns[is_kept], weights[is_kept]
+        if added_edges:
+            added_edges = np.array(added_edges, dtype=float).reshape(-1, 3)
+            rows = np.concatenate((rows, added_edges[:, 0].astype(rows.dtype)))
+            columns = np.concatenate((columns, added_edges[:, 1].astype(columns.dtype)))
+            weights = np.concatenate((weights, added_edges[:, 2]))
+        graph = CsrRoutingGraph(
+            self._coordinates, self._create_adjacency(self.number_of_nodes, rows, columns, weights))
+        graph._node_ids = self._node_ids
+        graph._node_tree = self._node_tree
+        return graph
+
+    def get_shortest_path_tree(self, source_id):
+        """
+        The shortest paths from one node to all nodes.
+
+        :param source_id: The id of the source node.
+        :type source_id: int
+        :return: The distances and the predecessors of each node (-9999 for the source and unreachable nodes).
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        distances, predecessors = dijkstra(
+            self._adjacency, directed=False, indices=source_id, return_predecessors=True)
+        return distances, predecessors
+
+    @staticmethod
+    def _get_central_angles(coordinates, long_, lat_):
+        """
+        The great-circle angles in radians between the coordinates and the points.
+        """
+        coordinates = np.radians(coordinates)
+        long_, lat_ = np.radians(long_), np.radians(lat_)
+        a = (np.sin((coordinates[..., 1] - lat_) / 2) ** 2
+             + np.cos(lat_) * np.cos(coordinates[..., 1]) * np.sin((coordinates[..., 0] - long_) / 2) ** 2)
+        return 2 * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+    @property
+    def heuristic_scale(self):
+        """
+        The largest factor by which the great-circle angle between the ends of every edge is at most the edge's
+        weight. The scaled angle is therefore a lower bound of the distance between any two nodes, e.g. the
+        earth's radius if the weights are great-circle distances.
+
+        :return: The scale.
+        :rtype: float
+        """
+        if self._heuristic_scale is None:
+            adjacency = self._adjacency.tocoo()
+            angles = self._get_central_angles(
+                self._coordinates[adjacency.row], self._coordinates[adjacency.col, 0],
+                self._coordinates[adjacency.col, 1])
+            is_bounded = angles > 0
+            scale = 0.0
+            if np.any(is_bounded):
+                scale = float(np.min(adjacency.data[is_bounded] / angles[is_bounded]))
+            self._heuristic_scale = scale
+        return self._heuristic_scale
+
+    @property
+    def landmark_ids(self):
+        return self._landmark_ids
+
+    @property
+    def landmark_distances(self):
+        """
+        :return: The distances from every landmark (rows) to every node (columns) or None if no landmarks are set.
+        :rtype: np.ndarray | None
+        """
+        return self._landmark_distances
+
+    def set_landmarks(self, landmark_ids, landmark_distances):
+        """
+        Set the landmarks for the A* heuristic (ALT). The landmark distances have to be distances in this graph or
+        in a graph with the same nodes whose distances are never longer, e.g. a graph with additional edges.
+        Otherwise, the heuristic may overestimate and the found paths are not the shortest.
+
+        :param landmark_ids: The node ids of the landmarks.
+        :type landmark_ids: np.ndarray
+        :param landmark_distances: The distances from every landmark (rows) to every node (columns).
+        :type landmark_distances: np.ndarray
+        """
+        landmark_distances = np.asarray(landmark_distances, dtype=float)
+        if landmark_distances.shape != (len(landmark_ids), self.number_of_nodes):
+            raise ValueError(f"Landmark distances of shape {landmark_distances.shape} do not match"
+                             f" {len(landmark_ids)} landmarks and {self.number_of_nodes} nodes.")
+        self._landmark_ids = np.asarray(landmark_ids)
+        self._landmark_distances = landmark_distances
+        self._reduced_adjacencies = {}
+
+    def compute_landmarks(self, number_of_landmarks):
+        """
+        Select landmarks by farthest point selection and compute the distances from them to all nodes. The first
+        landmark is the node farthest from node 0 and every further landmark is the node farthest from all
+        landmarks so far.
+
+        :param number_of_landmarks: The number of landmarks.
+        :type number_of_landmarks: int
+        :return: The node ids of the landmarks and the distances from every landmark (rows) to every node (columns).
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        landmark_ids = []
+        landmark_distances = []
+        closest_landmark_distances = dijkstra(self._adjacency, directed=False, indices=0)
+        for _ in range(min(number_of_landmarks, self.number_of_nodes)):
+            candidate_distances = np.where(np.isfinite(closest_landmark_distances), closest_landmark_distances, -1)
+            candidate_distances[landmark_ids] = -1
+            landmark_id = int(np.argmax(candidate_distances))
+            distances = dijkstra(self._adjacency, directed=False, indices=landmark_id)
+            landmark_ids.append(landmark_id)
+            landmark_distances.append(distances)
+            closest_landmark_distances = np.minimum(
+                closest_landmark_distances if len(landmark_ids) > 1 else distances, distances)
+        return np.array(landmark_ids, dtype=int), np.array(landmark_distances).reshape(-1, self.number_of_nodes)
+
+    def save_landmarks(self, landmarks_file):
+        """
+        Save the landmarks as a '.npz' file.
+
+        :param landmarks_file: The path of the file.
+        :type landmarks_file: str
+        """
+        with open(landmarks_file, "wb") as f:
+            np.savez(f, landmark_ids=self._landmark_ids, landmark_distances=self._landmark_distances)
+
+    def load_landmarks(self, landmarks_file):
+        """
+        Load the landmarks from a '.npz' file. See :py:func:`set_landmarks`.
+
+        :param landmarks_file: The path of the file.
+        :type landmarks_file: str
+        """
+        with np.load(landmarks_file) as landmarks:
+            self.set_landmarks(landmarks["landmark_ids"], landmarks["landmark_distances"])
+
+    @staticmethod
+    def get_landmarks_file(graph_file):
+        """
+        The file of the landmarks that belong to a graph file, i.e. '<graph file name>_landmarks.npz'.
+
+        :param graph_file: The path of the graph file.
+        :type graph_file: str
+        :return: The path of the landmarks file.
+        :rtype: str
+        """
+        return f"{os.path.splitext(graph_file)[0]}_landmarks.npz"
+
+    def _get_heuristic(self, source_id, target_id, number_of_active_landmarks=4):
+        """
+        A function of the lower bound of the distance from a node to the target from the great-circle distance and
+        the landmarks. Only the landmarks with the highest bounds at the source are used. The bound is reduced by a
+        small relative tolerance to stay a lower bound under rounding. A node that cannot reach the target according
+        to the landmarks has an infinite bound.
+        """
+        longitudes, latitudes, landmark_distances = self._get_heuristic_lists()
+        target_long, target_lat = longitudes[target_id], latitudes[target_id]
+        cos_target_lat = math.cos(target_lat)
+        scale = self.heuristic_scale * (1 - 1e-9)
+        target_landmark_distances = sorted(
+            ((distances[target_id] * (1 - 1e-9), distances)
+             for distances in landmark_distances if math.isfinite(distances[target_id])),
+            key=lambda x: abs(x[0] - x[1][source_id]), reverse=True)[:number_of_active_landmarks]
+        sin, cos, asin, sqrt = math.sin, math.cos, math.asin, math.sqrt
+
+        def heuristic(node_id):
+            node_lat = latitudes[node_id]
+            a = (sin((node_lat - target_lat) / 2) ** 2
+                 + cos_target_lat * cos(node_lat) * sin((longitudes[node_id] - target_long) / 2) ** 2)
+            bound = scale * 2 * asin(sqrt(min(a, 1)))
+            for target_distance, distances in target_landmark_distances:
+                landmark_bound = abs(target_distance - distances[node_id])
+                if landmark_bound > bound:
+                    bound = landmark_bound
+            return bound
+
+        return heuristic
+
+    def _get_heuristic_lists(self):
+        """
+        The longitudes and latitudes in radians and the landmark distances as compact arrays for fast scalar
+        access.
+        """
+        if self._heuristic_lists is None or self._heuristic_lists[3] is not self._landmark_distances:
+            coordinates = np.radians(self._coordinates)
+            landmark_distances = []
+            if self._landmark_distances is not None:
+                landmark_distances = [array.array("d", distances) for distances in self._landmark_distances]
+            self._heuristic_lists = (
+                array.array("d", coordinates[:, 0]), array.array("d", coordinates[:, 1]), landmark_distances,
+                self._landmark_distances)
+        return self._heuristic_lists[:3]
+
+    def _get_adjacency_lists(self):
+        if self._adjacency_lists is None:
+            self._adjacency_lists = (
+                self._adjacency.indptr.tolist(), self._adjacency.indices.tolist(), self._adjacency.data.tolist())
+        return self._adjacency_lists
+
+    @staticmethod
+    def get_path_from_tree(predecessors, source_id, target_id):
+        """
+        :param predecessors: The predecessors of a shortest path tree. See :py:func:`get_shortest_path_tree`.
+        :type predecessors: np.ndarray
+        :param source_id: The id of the source node.
+        :type source_id: int
+        :param target_id: The id of the target node.
+        :type target_id: int
+        :return: The node ids of the path from source to target or None if the target is not reachable.
+        :rtype: List[int] | None
+        """
+        path = [target_id]
+        while path[-1] != source_id:
+            predecessor = predecessors[path[-1]]
+            if predecessor < 0:
+                return None
+            path.append(int(predecessor))
+        path.reverse()
+        return path
+
+    def _get_reduced_adjacency(self, landmark_index):
+        """
+        The directed adjacency matrix with the edge weights reduced by the landmark's potential, i.e. the weight of
+        the edge from u to v is w(u, v) - d(L, u) + d(L, v). The weights are non-negative by the triangle
+        inequality, are independent of the target and a Dijkstra search on them is an A* search with the landmark's
+        lower bound. Edges outside the landmark's component keep their weights.
+        """
+        reduced_adjacency = self._reduced_adjacencies.get(landmark_index)
+        if reduced_adjacency is None:
+            distances = self._landmark_distances[landmark_index]
+            rows = np.repeat(np.arange(self.number_of_nodes), np.diff(self._adjacency.indptr))
+            with np.errstate(invalid="ignore"):
+                weights = self._adjacency.data - distances[rows] + distances[self._adjacency.indices]
+            weights = np.where(np.isfinite(weights), np.maximum(weights, 0), self._adjacency.data)
+            reduced_adjacency = csr_matrix(
+                (weights, self._adjacency.indices, self._adjacency.indptr), shape=self._adjacency.shape)
+            self._reduced_adjacencies[landmark_index] = reduced_adjacency
+        return reduced_adjacency
+
+    def get_shortest_path(self, source_id, target_id):
+        """
+        The shortest path between two nodes.
+
+        If landmarks are set (see :py:func:`set_landmarks`) the search is scipy's compiled Dijkstra on the weights
+        reduced by the landmark with the highest lower bound between the nodes, which equals an A* search with that
+        landmark's bound (see :py:func:`get_shortest_path_by_astar`). The search is limited to the distance bounded
+        from below by the landmark and the great-circle bounds and the limit is only increased up to the
+        landmarks' upper bound if the target is not reached.
+
+        If no landmarks are set, or none is in the nodes' component, the search falls back to
+        :py:func:`get_shortest_path_by_astar`.
+
+        :param source_id: The id of the source node.
+        :type source_id: int
+        :param target_id: The id of the target node.
+        :type target_id: int
+        :return: The node ids of the path from source to target or None if the target is not reachable.
+        :rtype: List[int] | None
+        """
+        if source_id == target_id:
+            return [source_id]
+        if self._landmark_distances is None:
+            return self.get_shortest_path_by_astar(source_id, target_id)
+        source_distances = self._landmark_distances[:, source_id]
+        target_distances = self._landmark_distances[:, target_id]
+        is_finite_source = np.isfinite(source_distances)
+        if np.any(is_finite_source != np.isfinite(target_distances)):
+            return None
+        if not np.any(is_finite_source):
+            return self.get_shortest_path_by_astar(source_id, target_id)
+        source_distances = source_distances[is_finite_source]
+        target_distances = target_distances[is_finite_source]
+        bounds = source_distances - target_distances
+        best_index = int(np.argmax(np.abs(bounds)))
+        landmark_index = int(np.flatnonzero(is_finite_source)[best_index])
+        landmark_bound = float(abs(bounds[best_index]))
+        is_reversed = bounds[best_index] < 0
+        if is_reversed:
+            # The reduced weights of the reversed potential are the transposed weights, i.e. search from the target.
+            source_id, target_id = target_id, source_id
+        great_circle_bound = self.heuristic_scale * float(self._get_central_angles(
+            self._coordinates[source_id], *self._coordinates[target_id]))
+        lower_bound = max(landmark_bound, great_circle_bound)
+        upper_bound = float(np.min(source_distances + target_distances))
+        # The reduced distance to the target is the distance minus the landmark bound.
+        limit = lower_bound * 1.1 - landmark_bound
+        max_limit = upper_bound * (1 + 1e-9) - landmark_bound
+        reduced_adjacency = self._get_reduced_adjacency(landmark_index)
+        path = None
+        while path is None:
+            limit = min(limit, max_limit)
+            distances, predecessors = dijkstra(
+                reduced_adjacency, directed=True, indices=source_id, limit=limit, return_predecessors=True)
+            if math.isfinite(distances[target_id]):
+                path = self.get_path_from_tree(predecessors, source_id, target_id)
+            elif limit >= max_limit:
+                break
+            limit = (limit + landmark_bound) * 2 - landmark_bound
+        if path is not None and is_reversed:
+            path.reverse()
+        return path
+
+    def get_shortest_path_by_astar(self, source_id, target_id):
+        """
+        The shortest path between two nodes by an A* search in Python. The heuristic is the maximum of the
+        great-circle lower bound (see :py:func:`heuristic_scale`) and the landmark lower bounds if landmarks are set
+        (see :py:func:`set_landmarks`).
+
+        This is the fallback of :py:func:`get_shortest_path` for graphs without landmarks. For short hops it only
+        visits a few nodes and is fast, but the visits of long searches are slower than the compiled search.
+
+        :param source_id: The id of the source node.
+        :type source_id: int
+        :param target_id: The id of the target node.
+        :type target_id: int
+        :return: The node ids of the path from source to target or None if the target is not reachable.
+        :rtype: List[int] | None
+        """
+        heuristic = self._get_heuristic(source_id, target_id)
+        indptr, indices, weights = self._get_adjacency_lists()
+        distances = {source_id: 0.0}
+        predecessors = {source_id: -1}
+        source_bound = heuristic(source_id)
+        if math.isinf(source_bound):
+            return None
+        neighbour_bounds = {}
+        is_closed = set()
+        queue = [(source_bound, source_id)]
+        while queue:
+            _, node_id = heapq.heappop(queue)
+            if node_id == target_id:
+                path = [target_id]
+                while path[-1] != source_id:
+                    path.append(predecessors[path[-1]])
+                path.reverse()
+                return path
+            if node_id in is_closed:
+                continue
+            is_closed.add(node_id)
+            node_distance = distances[node_id]
+            for k in range(indptr[node_id], indptr[node_id + 1]):
+                neighbour_id = indices[k]
+                neighbour_distance = node_distance + weights[k]
+                if neighbour_distance < distances.get(neighbour_id, math.inf):
+                    if neighbour_id not in distances:
+                        neighbour_bounds[neighbour_id] = heuristic(neighbour_id)
+                        if math.isinf(neighbour_bounds[neighbour_id]):
+                            continue
+                    distances[neighbour_id] = neighbour_distance
+                    predecessors[neighbour_id] = node_id
+                    heapq.heappush(queue, (neighbour_distance + neighbour_bounds[neighbour_id], neighbour_id))
+        return None
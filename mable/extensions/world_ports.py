@@ -2,12 +2,17 @@
 Ports and routing based on a world graph and real world port location.
 """
 
+import collections
 import csv
+import hashlib
 import itertools
+import json
 import math
 import os
 import pickle
-from typing import List, TYPE_CHECKING
+import threading
+from collections.abc import Sequence
+from typing import List, Dict, Tuple, TYPE_CHECKING
 
 import numpy as np
 import loguru
@@ -15,6 +20,7 @@ import networkx
 from simplification.cutil import simplify_coords
 
 from mable.simulation_space.universe import Port, Location, OnJourney
+from mable.extensions.routing_graph import CsrRoutingGraph
 from mable.simulation_space.structure import NetworkWithPortDict
 from mable import simulation_generation
 from mable.transport_operation import SimpleVessel
@@ -27,6 +33,10 @@ if TYPE_CHECKING:
 logger = loguru.logger
 
 
+NAUTICAL_MILES_PER_METRE = 0.000539957
+EARTH_RADIUS_METRES = 6371000
+
+
 class LatLongFactory(simulation_generation.ClassFactory):
     """
     Factory to generate the network, ports and vessels in a real-world graph.
@@ -197,14 +207,41 @@ class LatLongShippingNetwork(NetworkWithPortDict):
     A shipping network with latitude on longitude locations.
     """
 
-    def __init__(self, ports=None, precomputed_routes_file=None, graph_file=None):
+    def __init__(self, ports=None, precomputed_routes_file=None, graph_file=None, distance_matrix_file=None,
+                 route_cache_size=1024):
+        """
+        :param ports: The ports.
+        :type ports: List[LatLongPort]
+        :param precomputed_routes_file: The file of the precomputed routes. Either a pickle file or a '.npz' file
+            of the columnar format (see :py:class:`RouteGeometry`).
+        :type precomputed_routes_file: str
+        :param graph_file: The file of the routing graph.
+        :type graph_file: str
+        :param distance_matrix_file: The '.npy' file of the distances between all ports or None to not use a
+            distance matrix. See :py:func:`build_distance_matrix`. The matrix requires precomputed routes and is
+            (re)built if the file does not exist or was built for other precomputed routes or ports.
+        :type distance_matrix_file: str | None
+        :param route_cache_size: The number of routes computed from the routing graph that are kept in the least
+            recently used cache of :py:func:`get_shortest_route_between_points`.
+        :type route_cache_size: int
+        """
         super().__init__(ports)
         self._precomputed_routes_file = precomputed_routes_file
-        self._precomputed_routes = None
+        self._route_store = RouteStore()
         if self._precomputed_routes_file is not None:
-            with open(self._precomputed_routes_file, 'rb') as file:
-                self._precomputed_routes = pickle.load(file)
+            self._route_store = load_route_store(self._precomputed_routes_file, self.ports)
+        # routes computed from the routing graph, the (shared) route store is never changed
+        self._computed_routes = RouteStore()
         self._graph_file = graph_file
+        self._distance_matrix = None
+        if distance_matrix_file is not None:
+            if self._precomputed_routes_file is None:
+                logger.warning(f"Distance matrix file '{distance_matrix_file}' not used without precomputed routes.")
+            else:
+                if not self.is_distance_matrix_current(distance_matrix_file):
+                    self.build_distance_matrix(distance_matrix_file)
+                self._distance_matrix = self.load_distance_matrix(distance_matrix_file)
+                self._port_distances = self._distance_matrix
         # canals
         self.canals = {
             "Suez": (LatLongLocation(32.5, 31.245, 'Suez canal start'),
@@ -214,15 +251,72 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         }
         # lazy load the world graph, no need to do this unless a route is not in the DB (which shouldn't happen)
         self._world_graph = None
+        self._routing_graph = None
+        self._scenario_routing_graphs = {}
+        # the canals open for routing without a scenario, None is the state of the graph file
+        self._open_canals = None
+        # least recently used routes, the lock guards the order of the cache against concurrent queries
+        self._route_cache = collections.OrderedDict()
+        self._route_cache_size = route_cache_size
+        self._route_cache_lock = threading.Lock()
+        # canals closed at runtime (see close_canal)
+        self._closed_canals = frozenset()
         self._canals_nodes = None
         self._scenarios = None
 
+    @property
+    def precomputed_routes_file(self):
+        return self._precomputed_routes_file
+
+    @property
+    def route_store(self):
+        """
+        The store of the precomputed routes. The store is shared by all networks with the same precomputed routes
+        file and ports (see :py:func:`load_route_store`) and is never changed.
+
+        :return: The route store.
+        :rtype: RouteStore
+        """
+        return self._route_store
+
+    @property
+    def computed_routes(self):
+        """
+        The store of the routes this network computed from the routing graph because they were not precomputed.
+
+        :return: The route store.
+        :rtype: RouteStore
+        """
+        return self._computed_routes
+
     @property
     def world_graph(self):
+        """
+        The world graph as a networkx graph. Routing uses :py:func:`routing_graph`.
+
+        :return: The graph.
+        :rtype: networkx.Graph
+        """
         if self._world_graph is None and self._graph_file is not None:
             self._world_graph = self.generate_route_graph_from_file()
         return self._world_graph
 
+    @property
+    def routing_graph(self):
+        """
+        The world graph as loaded from the graph file in CSR format. If the landmarks file of the graph file
+        exists (see :py:func:`build_routing_landmarks`) the landmarks are loaded as well.
+
+        :return: The graph.
+        :rtype: CsrRoutingGraph
+        """
+        if self._routing_graph is None and self._graph_file is not None:
+            self._routing_graph = CsrRoutingGraph.from_file(self._graph_file)
+            landmarks_file = CsrRoutingGraph.get_landmarks_file(self._graph_file)
+            if os.path.exists(landmarks_file):
+                self._routing_graph.load_landmarks(landmarks_file)
+        return self._routing_graph
+
     @property
     def canals_nodes(self):
         """
@@ -245,6 +339,74 @@ class LatLongShippingNetwork(NetworkWithPortDict):
             self._scenarios = self.create_world_canal_scenarios()
         return self._scenarios
 
+    @property
+    def closed_canals(self):
+        """
+        :return: The canals closed via :py:func:`close_canal`.
+        :rtype: frozenset[str]
+        """
+        return self._closed_canals
+
+    def close_canal(self, canal_name):
+        """
+        Close a canal at runtime. Routes through the canal are no longer used for distances or new journeys.
+        Journeys that already started keep their route (see :py:func:`get_journey`).
+
+        Only the distances of the port pairs with a stored route through the canal are updated
+        (see :py:func:`RouteStore.get_canal_pairs`). Their new distances are the lengths of the shortest stored routes
+        that avoid all closed canals. Pairs whose stored routes all pass closed canals are routed around them on the
+        routing graph when their distance is next needed (see :py:func:`get_all_routes_between_points`).
+
+        :param canal_name: The name of the canal.
+        :type canal_name: str
+        :return: The (origin index, destination index) pairs whose distances were updated.
+        :rtype: List[Tuple[int, int]]
+        """
+        self._closed_canals = self._closed_canals | {canal_name}
+        return self._update_canal_distances(canal_name)
+
+    def open_canal(self, canal_name):
+        """
+        Reopen a canal that was closed with :py:func:`close_canal`.
+
+        :param canal_name: The name of the canal.
+        :type canal_name: str
+        :return: The (origin index, destination index) pairs whose distances were updated.
+        :rtype: List[Tuple[int, int]]
+        """
+        self._closed_canals = self._closed_canals - {canal_name}
+        return self._update_canal_distances(canal_name)
+
+    def _update_canal_distances(self, canal_name):
+        """
+        Update the known port distances of the port pairs with a stored route through the canal. The distances of
+        pairs without a stored route that avoids the closed canals are unknown (NaN) until they are next needed.
+        """
+        affected_pairs = (self._route_store.get_canal_pairs(canal_name)
+                          + self._computed_routes.get_canal_pairs(canal_name))
+        self.clear_distance_cache()
+        if self._distance_matrix is not None:
+            for index_one, index_two in affected_pairs:
+                lengths = self._route_store.get_route_lengths(
+                    index_one, index_two, excluded_canals=self._closed_canals)
+                if lengths is None:
+                    lengths = self._computed_routes.get_route_lengths(
+                        index_one, index_two, excluded_canals=self._closed_canals)
+                distance = min(lengths, default=math.nan)
+                self._distance_matrix[index_one, index_two] = distance
+                self._distance_matrix[index_two, index_one] = distance
+        logger.info(f"Canal {canal_name} {'closed' if canal_name in self._closed_canals else 'opened'}:"
+                    f" updated the distances of {len(affected_pairs)} port pairs.")
+        return affected_pairs
+
+    def clear_distance_cache(self):
+        """
+        Remove all cached distances. The table of the port distances (see :py:func:`get_distances`) is reset to the
+        distance matrix if the network has one.
+        """
+        super().clear_distance_cache()
+        self._port_distances = self._distance_matrix
+
     def get_distance(self, location_one, location_two):
         """
         Get the distance between two locations.
@@ -267,26 +429,78 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         if location_one == location_two:
             distance = 0
         else:
-            route = self.get_shortest_path_between_points(location_one, location_two)
-            distance = math.inf
-            if route is not None:
-                distance = route.length
+            distance = math.nan
+            if self._distance_matrix is not None:
+                index_one = self.get_port_index(location_one)
+                index_two = self.get_port_index(location_two)
+                if index_one is not None and index_two is not None:
+                    distance = float(self._distance_matrix[index_one, index_two])
+            if math.isnan(distance):
+                route = self.get_shortest_path_between_points(location_one, location_two)
+                distance = math.inf
+                if route is not None:
+                    distance = route.length
         return distance
 
+    def build_distance_matrix(self, distance_matrix_file):
+        """
+        Builds the matrix of the distances between all ports from the precomputed routes and saves it as a '.npy'
+        file together with its key file (see :py:func:`save_distance_matrix`).
+
+        The matrix has the route lengths as float64 entries and is indexed by the port indices
+        (see :py:func:`get_port_index`), i.e. the file is only valid for the same ports in the same order. Entries of
+        port pairs without a precomputed route are NaN.
+
+        :param distance_matrix_file: The path of the file.
+        :type distance_matrix_file: str
+        :return: The matrix.
+        :rtype: np.ndarray
+        """
+        distance_matrix = self._route_store.get_distance_matrix(len(self._ports))
+        save_distance_matrix(
+            distance_matrix_file, distance_matrix, self._precomputed_routes_file, self.ports)
+        return distance_matrix
+
+    def is_distance_matrix_current(self, distance_matrix_file):
+        """
+        :param distance_matrix_file: The path of the file.
+        :type distance_matrix_file: str
+        :return: True if the matrix exists and was built from the precomputed routes file in its current state for the
+            ports of the network.
+        :rtype: bool
+        """
+        key_file = get_distance_matrix_key_file(distance_matrix_file)
+        is_current = False
+        if os.path.isfile(distance_matrix_file) and os.path.isfile(key_file):
+            with open(key_file) as file:
+                is_current = json.load(file) == get_distance_matrix_key(self._precomputed_routes_file, self.ports)
+        return is_current
+
+    def load_distance_matrix(self, distance_matrix_file):
+        """
+        Loads a distance matrix built by :py:func:`build_distance_matrix` as a copy-on-write memory map.
+
+        :param distance_matrix_file: The path of the file.
+        :type distance_matrix_file: str
+        :return: The matrix.
+        :rtype: np.ndarray
+        :raises ValueError: If the matrix was not built for the precomputed routes and ports of the network.
+        """
+        if not self.is_distance_matrix_current(distance_matrix_file):
+            raise ValueError(f"Distance matrix '{distance_matrix_file}' was not built for the precomputed routes"
+                             f" '{self._precomputed_routes_file}' and the {len(self._ports)} ports.")
+        distance_matrix = np.load(distance_matrix_file, mmap_mode="c")
+        return distance_matrix
+
     def _get_precomputed_routes(self, location_one, location_two):
         routes = None
-        index_one = f"{location_one.name}{location_two.name}"
-        index_two = f"{location_two.name}{location_one.name}"
-        if self._precomputed_routes is not None:
-            if index_one in self._precomputed_routes or index_two in self._precomputed_routes:
-                if index_one in self._precomputed_routes:
-                    routes = self._precomputed_routes[index_one]
-                else:
-                    routes = self._precomputed_routes[index_two]
-                    for route in routes:
-                        route.route = list(reversed(route.route))
-                        route.canals = list(reversed(route.canals))
-            else:
+        index_one = self.get_port_index(location_one)
+        index_two = self.get_port_index(location_two)
+        if index_one is not None and index_two is not None:
+            routes = self._route_store.get_routes(index_one, index_two)
+            if routes is None:
+                routes = self._computed_routes.get_routes(index_one, index_two)
+            if routes is None and self._precomputed_routes_file is not None:
                 logger.warning(f"Routes entry for routes between '{location_one.name}'"
                                f" and '{location_two.name}' not found.")
         return routes
@@ -304,11 +518,31 @@ class LatLongShippingNetwork(NetworkWithPortDict):
              + math.cos(math.radians(lat_a)) * math.cos(math.radians(lat_b)) * math.sin(d_lon / 2) ** 2)
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
-        earth_radius = 6371000  # earth radius in m
-        distance = earth_radius * c
+        distance = EARTH_RADIUS_METRES * c
 
         return distance
 
+    @staticmethod
+    def get_long_lat_dists(lat_a, lng_a, lat_b, lng_b):
+        """
+        Calculate the distances between arrays of points on earth using the haversine distance,
+        assuming the earth is a perfect sphere. See :py:func:`get_long_lat_dist`.
+
+        :return: The distances in metres.
+        :rtype: np.ndarray
+        """
+        lat_a = np.asarray(lat_a, dtype=float)
+        lat_b = np.asarray(lat_b, dtype=float)
+        d_lon = np.radians(np.asarray(lng_b, dtype=float) - np.asarray(lng_a, dtype=float))
+        d_lat = np.radians(lat_b - lat_a)
+
+        a = np.sin(d_lat / 2) ** 2 + np.cos(np.radians(lat_a)) * np.cos(np.radians(lat_b)) * np.sin(d_lon / 2) ** 2
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        distances = EARTH_RADIUS_METRES * c
+
+        return distances
+
     def get_journey_location(self, journey, vessel, current_time):
         """
         Returns the current position of the vessel based on the journey information and the current time.
@@ -322,9 +556,7 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         :return: The current location the vessel is in.
         :rtype: Location
         """
-        origin = journey.origin
-        destination = journey.destination
-        route = self.get_shortest_path_between_points(origin, destination)
+        route = self._get_journey_route(journey)
         travel_time = vessel.get_travel_time(route.length)
         time_travelled = current_time - journey.start_time
         if time_travelled == 0:
@@ -332,32 +564,60 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         elif time_travelled >= travel_time:
             location = journey.destination
         else:
-            route_origin_to_destination = list(reversed(route.route))
             percentage_travel = time_travelled/travel_time
-            distance_travelled = percentage_travel * route.length
-            segment_distances_dist = [
-                self.compute_route_length([route_origin_to_destination[i], route_origin_to_destination[i + 1]])
-                for i in range(len(route_origin_to_destination) - 1)]
-            route_distance: list[float] = [sum(segment_distances_dist[:i]) for i in range(len(segment_distances_dist))]
-            route_distance.append(route.length)
-            idx_in_route = next(i for i in range(len(route_distance)) if route_distance[i] > distance_travelled) - 1
-            # TODO the calculation of an intermediate point on a segment does not seem to work
-            # distance_on_segment = distance_travelled - route_distance[idx_in_route]
-            # percentage_on_segment = distance_on_segment/segment_distances_dist[idx_in_route]
-            # route_segment = route.route[idx_in_route:idx_in_route + 2]
-            # location = LatLongLocation(
-            #     route_segment[0][1] + percentage_on_segment * (route_segment[1][1] - route_segment[0][1]),
-            #     route_segment[0][0] + percentage_on_segment * (route_segment[1][0] - route_segment[0][0]),
-            #     ""
-            # )
-            last_segment_start = route_origin_to_destination[idx_in_route]
+            route_length = route.cumulative_length[-1]
+            long_, lat_ = route.get_point_at_distance(percentage_travel * route_length)
             location = LatLongLocation(
-                last_segment_start[1],
-                last_segment_start[0],
-                f"<{last_segment_start[1]}, {last_segment_start[0]}>"
+                lat_,
+                long_,
+                f"<{lat_}, {long_}>"
             )
         return location
 
+    def get_vessel_locations(self, vessels, current_time):
+        """
+        Returns the coordinates of the locations of all vessels at the current time.
+        See :py:func:`get_journey_location` for the location of vessels on a journey.
+
+        The positions of all vessels on a journey are interpolated in one pass over their routes.
+
+        :param vessels: The vessels.
+        :type vessels: List[Vessel]
+        :param current_time: The current time.
+        :type current_time: float
+        :return: The coordinates (latitude, longitude) of each vessel's location with one row per vessel.
+        :rtype: np.ndarray
+        """
+        coordinates = np.empty((len(vessels), 2))
+        journey_indices = []
+        journey_routes = []
+        journey_percentages = []
+        for i, one_vessel in enumerate(vessels):
+            location = one_vessel.location
+            if isinstance(location, OnJourney):
+                route = self._get_journey_route(location)
+                travel_time = one_vessel.get_travel_time(route.length)
+                time_travelled = current_time - location.start_time
+                if time_travelled == 0:
+                    location = location.origin
+                elif time_travelled >= travel_time:
+                    location = location.destination
+                else:
+                    journey_indices.append(i)
+                    journey_routes.append(route)
+                    journey_percentages.append(time_travelled / travel_time)
+                    continue
+            else:
+                location = self.get_port_or_default(location, location)
+            coordinates[i] = (location.x, location.y)
+        if len(journey_indices) > 0:
+            points = [r.points for r in journey_routes]
+            cumulative_lengths = [r.cumulative_length for r in journey_routes]
+            distances = np.array(journey_percentages) * np.array([c[-1] for c in cumulative_lengths])
+            long_lat = _interpolate_route_points(points, cumulative_lengths, distances)
+            coordinates[journey_indices] = long_lat[:, ::-1]
+        return coordinates
+
     def generate_route_graph_from_file(self):
         """
         Generates the router graph file depending on the type of file the router has been initialised with
@@ -402,20 +662,8 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         min_node: GraphX Node
             the node closest to those coordinates in the router's world_graph
         """
-        #
-        if (long_, lat_) in list(self.world_graph.nodes):
-            return long_, lat_
-
-        min_dist = float('inf')
-        min_node = -1
-
-        for node in list(self.world_graph.nodes):
-            gg = LatLongShippingNetwork.get_long_lat_dist(lat_, long_, node[1], node[0])
-            if gg <= min_dist:
-                min_dist = gg
-                min_node = node
-
-        return min_node
+        node_id = self.routing_graph.find_closest_node_id(long_, lat_)
+        return self.routing_graph.get_node(node_id)
 
     def create_canal_nodes(self):
         """
@@ -442,7 +690,7 @@ class LatLongShippingNetwork(NetworkWithPortDict):
 
         return nodes
 
-    def get_shortest_grid_route_between_points(self, start_long, start_lat, end_long, end_lat):
+    def get_shortest_grid_route_between_points(self, start_long, start_lat, end_long, end_lat, scenario=None):
         """
         Calculates the shortest route between start longitude/latitude and end longitude/latitude using the grid graph
 
@@ -456,28 +704,30 @@ class LatLongShippingNetwork(NetworkWithPortDict):
             The longitude of the end location.
         end_lat : float
             The latitude of the end location.
+        scenario: (str) or None
+            The names of the open canals. Default, i.e. None, are the canals opened via
+            :py:func:`add_canal_to_graph` or the canals of the graph file if no canals have been opened or removed.
 
         Returns
         -------
         [Tuple]
             List of (longitude, latitude) tuples that store the shortest route
         """
+        if scenario is None:
+            scenario = self._open_canals
+        graph = self.routing_graph
+        if scenario is not None:
+            graph = self.get_scenario_routing_graph(scenario)
         # find the closest nodes in the world graph to the locations provided
-        start_node = self.find_closest_node(start_long, start_lat)
-        end_node = self.find_closest_node(end_long, end_lat)
-        try:
-            ship_path = networkx.shortest_path(self.world_graph, start_node, end_node, weight='weight')
-        except networkx.exception.NetworkXNoPath:
+        start_node_id = graph.find_closest_node_id(start_long, start_lat)
+        end_node_id = graph.find_closest_node_id(end_long, end_lat)
+        path_node_ids = graph.get_shortest_path(start_node_id, end_node_id)
+        if path_node_ids is None:
             logger.error(
                 "No path between " + str((start_long, start_lat)) + " and " + str((end_long, end_lat)) + " found.")
             raise NoPathsException(
                 f"No paths between {repr(Location(start_long, start_lat))} and {repr(Location(end_long, end_lat))}")
-        except Exception as ex:
-            logger.error("Unknown error finding routes between " + str((start_long, start_lat)) + " and " + str(
-                (end_long, end_lat)) + ". " + str(ex))
-            raise NoPathsException(
-                f"No paths between {repr(Location(start_long, start_lat))} and {repr(Location(end_long, end_lat))}")
-
+        ship_path = [graph.get_node(node_id) for node_id in path_node_ids]
         return ship_path
 
     def smooth_route(self, route, epsilon=1):
@@ -548,16 +798,59 @@ class LatLongShippingNetwork(NetworkWithPortDict):
             The length of the route in nautical miles
         """
         length = 0
-        for pt_index in range(1, len(route)):
-            lon_pt_start, lat_pt_start = route[pt_index - 1]
-            lon_pt_end, lat_pt_end = route[pt_index]
-            length += LatLongShippingNetwork.get_long_lat_dist(lat_pt_start, lon_pt_start, lat_pt_end, lon_pt_end)
-        length_nautical_miles = round(length * 0.000539957, 2)
+        if len(route) > 1:
+            length = float(np.cumsum(LatLongShippingNetwork.compute_route_segment_lengths(route))[-1])
+        length_nautical_miles = round(length * NAUTICAL_MILES_PER_METRE, 2)
         return length_nautical_miles
 
-    def get_shortest_route_between_points(self, start_long, start_lat, end_long, end_lat, smooth_path=True):
+    @staticmethod
+    def compute_route_segment_lengths(route):
+        """
+        Compute the haversine distances between all consecutive points of a route.
+
+        Parameters
+        ----------
+        route: [Tuple] or numpy.ndarray
+            List or array of (longitude, latitude) points
+
+        Returns
+        -------
+
+        numpy.ndarray
+            The length of each segment in metres
+        """
+        points = np.asarray(route, dtype=float).reshape(-1, 2)
+        segment_lengths = LatLongShippingNetwork.get_long_lat_dists(
+            points[:-1, 1], points[:-1, 0], points[1:, 1], points[1:, 0])
+        return segment_lengths
+
+    @staticmethod
+    def compute_cumulative_route_length(route):
+        """
+        Compute the distance along a route from its first point to each of its points.
+
+        Parameters
+        ----------
+        route: [Tuple] or numpy.ndarray
+            List or array of (longitude, latitude) points
+
+        Returns
+        -------
+
+        numpy.ndarray
+            The distance of each point from the first point along the route in nautical miles
+        """
+        segment_lengths = LatLongShippingNetwork.compute_route_segment_lengths(route)
+        cumulative_length = np.zeros(len(segment_lengths) + 1)
+        np.cumsum(segment_lengths, out=cumulative_length[1:])
+        cumulative_length *= NAUTICAL_MILES_PER_METRE
+        return cumulative_length
+
+    def get_shortest_route_between_points(self, start_long, start_lat, end_long, end_lat, smooth_path=True,
+                                          scenario=None, epsilon=1):
         """
         Calculates the shortest route between start longitude/latitude and end longitude/latitude.
+        The most recently computed routes are cached per points, scenario and epsilon.
 
         Parameters
         ----------
@@ -571,6 +864,10 @@ class LatLongShippingNetwork(NetworkWithPortDict):
             The latitude of the end location.
         smooth_path: boolean
             Flag to indicate whether or not to use smoothing algorithm on the path
+        scenario: (str) or None
+            The names of the open canals. See :py:func:`get_shortest_grid_route_between_points`.
+        epsilon: float
+            The epsilon value for the smoothing. See :py:func:`smooth_route`.
 
         Returns
         -------
@@ -579,15 +876,33 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         float
             The length of the route in nautical miles
         """
-        ship_path = self.get_shortest_grid_route_between_points(start_long, start_lat, end_long, end_lat)
+        if scenario is None:
+            scenario = self._open_canals
+        if scenario is not None:
+            scenario = tuple(scenario)
+        cache_key = (start_long, start_lat, end_long, end_lat, scenario, epsilon if smooth_path else None)
+        with self._route_cache_lock:
+            cached_route = self._route_cache.get(cache_key)
+            if cached_route is not None:
+                self._route_cache.move_to_end(cache_key)
+        if cached_route is not None:
+            route, length = cached_route
+            return list(route), length
+        ship_path = self.get_shortest_grid_route_between_points(
+            start_long, start_lat, end_long, end_lat, scenario=scenario)
         # add in start and end points to generate total route
         route = [(start_long, start_lat)]
         route += ship_path
         route += [(end_long, end_lat)]
         if smooth_path:
             # since the smoothing algorithm transforms them into lists of lists, recast to tuples afterwards
-            route = [tuple(pt) for pt in self.smooth_route(route)]
+            route = [tuple(pt) for pt in self.smooth_route(route, epsilon=epsilon)]
         length = self.compute_route_length(route)
+        if self._route_cache_size > 0:
+            with self._route_cache_lock:
+                self._route_cache[cache_key] = (tuple(route), length)
+                if len(self._route_cache) > self._route_cache_size:
+                    self._route_cache.popitem(last=False)
         return route, length
 
     def create_world_canal_scenarios(self):
@@ -618,6 +933,9 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         Removes all canal edges from the world graph.
         """
 
+        self._open_canals = ()
+        if self._world_graph is None:
+            return
         # remove all canals initially
         for canal_key in self.canals_nodes.keys():
             start_node, end_node = self.canals_nodes[canal_key]
@@ -637,6 +955,11 @@ class LatLongShippingNetwork(NetworkWithPortDict):
 
         start_node, end_node = self.canals_nodes[canal_name]
 
+        if self._open_canals is not None and canal_name not in self._open_canals:
+            self._open_canals = tuple(c for c in self.canals if c in self._open_canals or c == canal_name)
+        if self._world_graph is None:
+            return
+
         # compute the distance
         weight = float(LatLongShippingNetwork.get_long_lat_dist(start_node[1], start_node[0], end_node[1], end_node[0]))
 
@@ -647,6 +970,71 @@ class LatLongShippingNetwork(NetworkWithPortDict):
             # TODO: discuss appropriate exception to be raised
             pass
 
+    def _get_canal_edges(self):
+        """
+        The canal edges of the routing graph as (node id one, node id two, weight) by canal name.
+        """
+        graph = self.routing_graph
+        canal_edges = {}
+        for canal_name, (start_node, end_node) in self.canals_nodes.items():
+            weight = float(LatLongShippingNetwork.get_long_lat_dist(
+                start_node[1], start_node[0], end_node[1], end_node[0]))
+            canal_edges[canal_name] = (graph.get_node_id(start_node), graph.get_node_id(end_node), weight)
+        return canal_edges
+
+    def get_scenario_routing_graph(self, scenario):
+        """
+        The copy of the routing graph in which exactly the canals of the scenario are open.
+        The copy uses the landmarks of the routing graph and is created once per scenario.
+
+        :param scenario: The names of the open canals. See :py:func:`create_world_canal_scenarios`.
+        :type scenario: Tuple[str, ...]
+        :return: The graph.
+        :rtype: CsrRoutingGraph
+        """
+        scenario = tuple(scenario)
+        scenario_graph = self._scenario_routing_graphs.get(scenario)
+        if scenario_graph is None:
+            graph = self.routing_graph
+            canal_edges = self._get_canal_edges()
+            scenario_graph = graph.with_edges(
+                added_edges=[canal_edges[canal_name] for canal_name in scenario],
+                removed_edges=[(node_id_one, node_id_two) for node_id_one, node_id_two, _ in canal_edges.values()])
+            if graph.landmark_distances is not None:
+                scenario_graph.set_landmarks(graph.landmark_ids, graph.landmark_distances)
+            self._scenario_routing_graphs[scenario] = scenario_graph
+        return scenario_graph
+
+    def build_routing_landmarks(self, number_of_landmarks=16):
+        """
+        Computes the landmarks of the routing graph for the A* heuristic (see :py:func:`CsrRoutingGraph.set_landmarks`)
+        and saves them next to the graph file (see :py:func:`CsrRoutingGraph.get_landmarks_file`).
+
+        The landmark distances are computed with all canals open. Since closing canals never shortens a distance,
+        the landmarks are valid for all canal scenarios.
+
+        :param number_of_landmarks: The number of landmarks.
+        :type number_of_landmarks: int
+        :return: The path of the landmarks file.
+        :rtype: str
+        """
+        graph = self.routing_graph
+        added_edges = []
+        for node_id_one, node_id_two, weight in self._get_canal_edges().values():
+            current_weight = graph.get_edge_weight(node_id_one, node_id_two)
+            if current_weight is not None:
+                weight = min(weight, current_weight)
+            added_edges.append((node_id_one, node_id_two, weight))
+        landmark_ids, landmark_distances = graph.with_edges(added_edges=added_edges).compute_landmarks(
+            number_of_landmarks)
+        graph.set_landmarks(landmark_ids, landmark_distances)
+        for scenario_graph in self._scenario_routing_graphs.values():
+            scenario_graph.set_landmarks(landmark_ids, landmark_distances)
+        landmarks_file = CsrRoutingGraph.get_landmarks_file(self._graph_file)
+        graph.save_landmarks(landmarks_file)
+        logger.info(f"Saved {len(landmark_ids)} landmarks to {landmarks_file}.")
+        return landmarks_file
+
     def compute_all_routes_between_points(self, start_location, end_location, vessel_type=None):
         """
         Computes a list of all routes between the locations.
@@ -679,15 +1067,9 @@ class LatLongShippingNetwork(NetworkWithPortDict):
 
         # iterate through each scenario
         for scenario in self.scenarios:
-            self.remove_canals_from_graph()
-
-            # add canals to the world graph
-            for canal in scenario:
-                self.add_canal_to_graph(canal)
-
             # compute route and length in this scenario
-            shortest_route, length_shortest_route = self.get_shortest_route_between_points(start_long, start_lat,
-                                                                                           end_long, end_lat)
+            shortest_route, length_shortest_route = self.get_shortest_route_between_points(
+                start_long, start_lat, end_long, end_lat, scenario=scenario)
 
             new_route = Route("", shortest_route, length_shortest_route, scenario)
             if new_route not in shortest_routes:
@@ -711,7 +1093,9 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         For the given start location and end location the direct route as well as the routes
         pass specified passage points (Suez (canal), South Africa (Cape of Good Hope, Cape Agulhas),
         Panama (canal), Cape (North of Cape Horn), Singapore (Riau Islands south of Singapore Strait))
-        are considered.
+        are considered. Routes through closed canals (see :py:func:`close_canal`) are left out. If all routes pass
+        closed canals the route around them is computed on the routing graph (see
+        :py:func:`get_shortest_route_between_points`) if the network has a graph file.
 
         Parameters
         ----------
@@ -727,6 +1111,33 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         [Route]
             List of all found routes.
         """
+        shortest_routes = self._get_all_routes_between_points(start_location, end_location, vessel_type)
+        if self._closed_canals:
+            shortest_routes = [r for r in shortest_routes if self._closed_canals.isdisjoint(r.canals or ())]
+            if len(shortest_routes) == 0 and self._graph_file is not None:
+                shortest_routes = self._compute_open_canal_routes(start_location, end_location)
+        return shortest_routes
+
+    def _compute_open_canal_routes(self, start_location, end_location):
+        """
+        The shortest route between the locations with only the canals open that are not closed, or no route if the
+        routing graph has none. The route's canals are the open canals.
+        """
+        scenario = tuple(c for c in self.canals if c not in self._closed_canals)
+        try:
+            route, length = self.get_shortest_route_between_points(
+                start_location.longitude, start_location.latitude, end_location.longitude, end_location.latitude,
+                scenario=scenario)
+            routes = [Route("", route, length, scenario)]
+        except NoPathsException:
+            routes = []
+        return routes
+
+    def _get_all_routes_between_points(self, start_location, end_location, vessel_type=None):
+        """
+        All routes between the locations including routes through closed canals.
+        See :py:func:`get_all_routes_between_points`.
+        """
         if start_location == end_location:
             return [Route("", [], 0)]
 
@@ -742,10 +1153,49 @@ class LatLongShippingNetwork(NetworkWithPortDict):
                 (start_long, start_lat)) + " to " + str((end_long, end_lat)))
             shortest_routes = self.compute_all_routes_between_points(start_location, end_location,
                                                                      vessel_type=vessel_type)
-            index = f"{start_location.name}{end_location.name}"
-            self._precomputed_routes[index] = shortest_routes
+            index_one = self.get_port_index(start_location)
+            index_two = self.get_port_index(end_location)
+            if index_one is not None and index_two is not None:
+                self._computed_routes.add_routes(index_one, index_two, shortest_routes)
+                shortest_routes = self._computed_routes.get_routes(index_one, index_two)
         return shortest_routes
 
+    def get_journey(self, origin, destination, start_time):
+        """
+        The journey of a vessel that leaves the origin for the destination. The journey records the shortest route at
+        departure, i.e. the vessel keeps the route if canals are closed or opened during the journey.
+
+        :param origin: The start location of the journey.
+        :type origin: Location
+        :param destination: The end location of the journey.
+        :type destination: Location
+        :param start_time: The time at which the vessel leaves the origin.
+        :type start_time: float
+        :return: The journey.
+        :rtype: OnJourney
+        """
+        return OnJourney(origin=origin, destination=destination, start_time=start_time,
+                         route=self._get_shortest_journey_route(origin, destination))
+
+    def _get_journey_route(self, journey):
+        """
+        The route of a journey, i.e. the route recorded at departure or otherwise the current shortest route.
+        """
+        route = journey.route
+        if route is None:
+            route = self._get_shortest_journey_route(journey.origin, journey.destination)
+        return route
+
+    def _get_shortest_journey_route(self, origin, destination):
+        """
+        The shortest route between the locations. If all routes pass closed canals the shortest route is used
+        regardless, e.g. for a journey that started before the closure without a recorded route.
+        """
+        route = self.get_shortest_path_between_points(origin, destination)
+        if route is None:
+            route = self._get_all_routes_between_points(origin, destination)[0]
+        return route
+
     def get_all_stored_routes_between_points(self, start_location, end_location):
         """
         Returns the shortest routes stored.
@@ -759,12 +1209,10 @@ class LatLongShippingNetwork(NetworkWithPortDict):
 
         Returns
         -------
-        [Route] or None
+        [RouteView] or None
             List of all found routes or None if no routes between locations has been stored before.
         """
-        shortest_routes = None
-        if self._precomputed_routes is not None:
-            shortest_routes = self._get_precomputed_routes(start_location, end_location)
+        shortest_routes = self._get_precomputed_routes(start_location, end_location)
         return shortest_routes
 
     def get_shortest_path_between_points(self, start_location, end_location, vessel_type=None):
@@ -783,11 +1231,13 @@ class LatLongShippingNetwork(NetworkWithPortDict):
         Returns
         -------
         Route
-            The shortest route found.
+            The shortest route found or None if all routes pass closed canals.
         """
         paths = self.get_all_routes_between_points(start_location, end_location, vessel_type)
         # the paths are already sorted, just return the first one
-        shortest_path = paths[0]
+        shortest_path = None
+        if len(paths) > 0:
+            shortest_path = paths[0]
         return shortest_path
 
 
@@ -815,6 +1265,46 @@ class Route:
         self.route = route
         self.length = length
         self.canals = canal_nodes
+        self._points = None
+        self._cumulative_length = None
+
+    @property
+    def points(self):
+        """
+        :return: The points of the route as an array of (longitude, latitude).
+        :rtype: np.ndarray
+        """
+        if getattr(self, "_points", None) is None:
+            self._points = np.asarray(self.route, dtype=float).reshape(-1, 2)
+        return self._points
+
+    @property
+    def cumulative_length(self):
+        """
+        :return: The distance along the route from the first point to each point in nautical miles.
+            See :py:func:`LatLongShippingNetwork.compute_cumulative_route_length`.
+        :rtype: np.ndarray
+        """
+        if getattr(self, "_cumulative_length", None) is None:
+            self._cumulative_length = LatLongShippingNetwork.compute_cumulative_route_length(self.points)
+        return self._cumulative_length
+
+    def get_point_at_distance(self, distance):
+        """
+        The point at a distance along the route from the first point.
+
+        :param distance: The distance in nautical miles.
+        :type distance: float
+        :return: The point as (longitude, latitude).
+        :rtype: Tuple[float, float]
+        """
+        return _interpolate_route_point(self.points, self.cumulative_length, distance)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_points", None)
+        state.pop("_cumulative_length", None)
+        return state
 
     def __getitem__(self, item):
         """
@@ -843,7 +1333,7 @@ class Route:
         are_equal = False
         if isinstance(other, Route):
             if (self.name == other.name
-                    and self.route == other.route
+                    and np.array_equal(self.points, other.points)
                     and self.length == other.length
                     and self.canals == other.canals):
                 are_equal = True
@@ -856,5 +1346,675 @@ class Route:
         return tuple([(pos[0], pos[1]) for pos in self.route])
 
 
+def _interpolate_route_point(points, cumulative_length, distance):
+    """
+    The point at a distance along a route by binary search over the cumulative length and linear interpolation on
+    the segment. The distance is clipped to the route.
+
+    :param points: The route's points as (longitude, latitude).
+    :type points: np.ndarray
+    :param cumulative_length: The distance from the first point to each point.
+    :type cumulative_length: np.ndarray
+    :param distance: The distance from the first point.
+    :type distance: float
+    :return: The point as (longitude, latitude).
+    :rtype: Tuple[float, float]
+    """
+    number_of_points = len(cumulative_length)
+    idx = int(np.searchsorted(cumulative_length, distance, side="right")) - 1
+    idx = min(max(idx, 0), max(number_of_points - 2, 0))
+    long_start, lat_start = float(points[idx, 0]), float(points[idx, 1])
+    if number_of_points < 2:
+        return long_start, lat_start
+    long_end, lat_end = float(points[idx + 1, 0]), float(points[idx + 1, 1])
+    segment_length = float(cumulative_length[idx + 1] - cumulative_length[idx])
+    percentage_on_segment = 0
+    if segment_length > 0:
+        percentage_on_segment = min(max((distance - float(cumulative_length[idx])) / segment_length, 0), 1)
+    d_long = long_end - long_start
+    # take the short way across the antimeridian
+    if d_long > 180:
+        d_long -= 360
+    elif d_long < -180:
+        d_long += 360
+    long_ = long_start + percentage_on_segment * d_long
+    if long_ >= 180:
+        long_ -= 360
+    elif long_ < -180:
+        long_ += 360
+    lat_ = lat_start + percentage_on_segment * (lat_end - lat_start)
+    return long_, lat_
+
+
+def _interpolate_route_points(points, cumulative_lengths, distances):
+    """
+    The points at distances along several routes in one pass. See :py:func:`_interpolate_route_point`.
+
+    :param points: Per route the points as (longitude, latitude).
+    :type points: List[np.ndarray]
+    :param cumulative_lengths: Per route the distance from the first point to each point.
+    :type cumulative_lengths: List[np.ndarray]
+    :param distances: Per route the distance from the first point.
+    :type distances: np.ndarray
+    :return: The points as (longitude, latitude) with one row per route.
+    :rtype: np.ndarray
+    """
+    number_of_points = np.array([len(c) for c in cumulative_lengths])
+    route_starts = np.concatenate(([0], np.cumsum(number_of_points)[:-1]))
+    all_points = np.concatenate(points).reshape(-1, 2)
+    all_cumulative_lengths = np.concatenate(cumulative_lengths)
+    # shift the routes' cumulative lengths apart to search all routes at once
+    route_lengths = np.array([c[-1] for c in cumulative_lengths])
+    shifts = np.concatenate(([0], np.cumsum(route_lengths + 1)[:-1]))
+    shifted_cumulative_lengths = all_cumulative_lengths + np.repeat(shifts, number_of_points)
+    distances = np.clip(distances, 0, route_lengths)
+    idx = np.searchsorted(shifted_cumulative_lengths, distances + shifts, side="right") - 1 - route_starts
+    idx = np.clip(idx, 0, np.maximum(number_of_points - 2, 0)) + route_starts
+    idx_end = np.where(number_of_points >= 2, idx + 1, idx)
+    segment_lengths = all_cumulative_lengths[idx_end] - all_cumulative_lengths[idx]
+    percentages_on_segment = np.zeros(len(distances))
+    has_length = segment_lengths > 0
+    percentages_on_segment[has_length] = np.clip(
+        (distances[has_length] - all_cumulative_lengths[idx][has_length]) / segment_lengths[has_length], 0, 1)
+    d_long = all_points[idx_end, 0] - all_points[idx, 0]
+    # take the short way across the antimeridian
+    d_long = np.where(d_long > 180, d_long - 360, np.where(d_long < -180, d_long + 360, d_long))
+    long_ = all_points[idx, 0] + percentages_on_segment * d_long
+    long_ = np.where(long_ >= 180, long_ - 360, np.where(long_ < -180, long_ + 360, long_))
+    lat_ = all_points[idx, 1] + percentages_on_segment * (all_points[idx_end, 1] - all_points[idx, 1])
+    return np.column_stack((long_, lat_))
+
+
+class _SequenceView(Sequence):
+    """
+    A read-only view of a sequence in forward or reverse order.
+    """
+
+    __slots__ = ("_items", "_is_reversed")
+
+    def __init__(self, items, is_reversed=False):
+        self._items = items
+        self._is_reversed = is_reversed
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        if self._is_reversed:
+            if item < 0:
+                item += len(self._items)
+            if not 0 <= item < len(self._items):
+                raise IndexError("Sequence index out of range")
+            item = len(self._items) - 1 - item
+        return self._items[item]
+
+    def __eq__(self, other):
+        return isinstance(other, (Sequence, _SequenceView)) and len(self) == len(other) and all(
+            np.array_equal(a, b) for a, b in zip(self, other))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class RouteView:
+    """
+    A read-only view of a stored route in the direction of the query.
+    See :py:class:`RouteStore`.
+    """
+
+    __slots__ = ("_route", "_is_reversed", "_points", "_canals", "_cumulative_length")
+
+    def __init__(self, route, is_reversed=False):
+        """
+        :param route: The stored route.
+        :type route: Route
+        :param is_reversed: If the view is in the opposite direction of the stored route.
+        :type is_reversed: bool
+        """
+        self._route = route
+        self._is_reversed = is_reversed
+        self._points = _SequenceView(route.route, is_reversed)
+        self._canals = None
+        if route.canals is not None:
+            self._canals = _SequenceView(route.canals, is_reversed)
+        self._cumulative_length = None
+
+    @property
+    def name(self):
+        return self._route.name
+
+    @property
+    def route(self):
+        """
+        :return: The points of the route in the format [longitude, latitude].
+        :rtype: Sequence[Tuple[float, float]]
+        """
+        return self._points
+
+    @property
+    def length(self):
+        return self._route.length
+
+    @property
+    def canals(self):
+        return self._canals
+
+    @property
+    def points(self):
+        """
+        :return: The points of the route as an array of (longitude, latitude). See :py:func:`Route.points`.
+        :rtype: np.ndarray
+        """
+        points = self._route.points
+        if self._is_reversed:
+            points = points[::-1]
+        return points
+
+    @property
+    def cumulative_length(self):
+        """
+        :return: The distance along the route from the first point to each point in nautical miles.
+            See :py:func:`Route.cumulative_length`.
+        :rtype: np.ndarray
+        """
+        if self._cumulative_length is None:
+            cumulative_length = self._route.cumulative_length
+            if self._is_reversed:
+                cumulative_length = cumulative_length[-1] - cumulative_length[::-1]
+            self._cumulative_length = cumulative_length
+        return self._cumulative_length
+
+    def get_point_at_distance(self, distance):
+        """
+        The point at a distance along the route from the first point.
+
+        :param distance: The distance in nautical miles.
+        :type distance: float
+        :return: The point as (longitude, latitude).
+        :rtype: Tuple[float, float]
+        """
+        return _interpolate_route_point(self.points, self.cumulative_length, distance)
+
+    def __getitem__(self, item):
+        """
+        Legacy method to pretend a route is a tuple. See :py:func:`Route.__getitem__`.
+        """
+        if item == 0:
+            return self.name
+        elif item == 1:
+            return self.route
+        else:
+            return self.length
+
+    def __repr__(self):
+        str_repr = ("RouteView<name: " + str(self.name)
+                    + ", length: " + str(self.length)
+                    + ", #stops: " + str(len(self.route))
+                    + ", reversed: " + str(self._is_reversed) + ">")
+        return str_repr
+
+    def as_tuple(self):
+        return tuple([(pos[0], pos[1]) for pos in self.route])
+
+
+class RouteStore:
+    """
+    A store of routes between ports keyed by the indices of the origin and destination port
+    (see :py:func:`mable.simulation_space.structure.NetworkWithPortDict.get_port_index`).
+
+    Stored routes are never changed. Routes are only stored for one direction and a query for the other direction
+    returns views of the routes in reverse order.
+    """
+
+    def __init__(self, routes=None):
+        """
+        :param routes: The routes per (origin index, destination index).
+        :type routes: Dict[Tuple[int, int], List[Route]] | None
+        """
+        super().__init__()
+        self._routes = {}
+        self._views = {}
+        self._geometry = None
+        self._pair_canals = {}
+        if routes is not None:
+            for (origin_index, destination_index), one_routes in routes.items():
+                self.add_routes(origin_index, destination_index, one_routes)
+
+    @classmethod
+    def from_precomputed_routes(cls, precomputed_routes, ports):
+        """
+        Create a store from precomputed routes keyed by the concatenated names of the origin and destination.
+
+        :param precomputed_routes: The routes per concatenated names.
+        :type precomputed_routes: Dict[str, List[Route]]
+        :param ports: The ports in the order of the port indices.
+        :type ports: List[Port]
+        :return: The store.
+        :rtype: RouteStore
+        """
+        routes = {}
+        for origin_index, origin_port in enumerate(ports):
+            for destination_index, destination_port in enumerate(ports):
+                one_routes = precomputed_routes.get(f"{origin_port.name}{destination_port.name}")
+                if one_routes is not None and (destination_index, origin_index) not in routes:
+                    routes[(origin_index, destination_index)] = one_routes
+        return cls(routes)
+
+    @classmethod
+    def from_route_geometry(cls, route_geometry, ports):
+        """
+        Create a store from routes in the columnar format. The routes are only turned into :py:class:`Route` objects
+        when they are first queried.
+
+        :param route_geometry: The routes.
+        :type route_geometry: RouteGeometry
+        :param ports: The ports in the order of the port indices.
+        :type ports: List[Port]
+        :return: The store.
+        :rtype: RouteStore
+        """
+        route_store = cls()
+        route_store._geometry = route_geometry
+        port_indices = {one_port.name: idx for idx, one_port in enumerate(ports)}
+        network_indices = np.array([port_indices.get(name, -1) for name in route_geometry.port_names.tolist()],
+                                   dtype=np.int64)
+        origins = network_indices[route_geometry.origins].tolist()
+        destinations = network_indices[route_geometry.destinations].tolist()
+        pair_offsets = route_geometry.pair_offsets.tolist()
+        pair_canal_flags = route_geometry.get_pair_canal_flags().tolist()
+        for pair_index, (origin_index, destination_index) in enumerate(zip(origins, destinations)):
+            if origin_index >= 0 and destination_index >= 0:
+                if not route_store.has_routes(origin_index, destination_index):
+                    key = (origin_index, destination_index)
+                    route_store._routes[key] = range(pair_offsets[pair_index], pair_offsets[pair_index + 1])
+                    route_store._pair_canals[key] = frozenset(route_geometry.get_canals(pair_canal_flags[pair_index]))
+        return route_store
+
+    def __len__(self):
+        return len(self._routes)
+
+    def _get_stored_routes(self, key):
+        routes = self._routes[key]
+        if isinstance(routes, range):
+            routes = tuple(self._geometry.get_route(i) for i in routes)
+            self._routes[key] = routes
+        return routes
+
+    def add_routes(self, origin_index, destination_index, routes):
+        """
+        Store the routes between two ports if no routes between the ports are stored.
+
+        :param origin_index: The index of the origin port.
+        :type origin_index: int
+        :param destination_index: The index of the destination port.
+        :type destination_index: int
+        :param routes: The routes from origin to destination.
+        :type routes: List[Route]
+        """
+        if not self.has_routes(origin_index, destination_index):
+            self._routes[(origin_index, destination_index)] = tuple(routes)
+            self._pair_canals[(origin_index, destination_index)] = frozenset(
+                one_canal for one_route in routes for one_canal in (one_route.canals or ()))
+
+    def has_routes(self, origin_index, destination_index):
+        """
+        :param origin_index: The index of the origin port.
+        :type origin_index: int
+        :param destination_index: The index of the destination port.
+        :type destination_index: int
+        :return: True if routes between the ports in either direction are stored.
+        :rtype: bool
+        """
+        return ((origin_index, destination_index) in self._routes
+                or (destination_index, origin_index) in self._routes)
+
+    def get_canal_pairs(self, canal_name):
+        """
+        :param canal_name: The name of the canal.
+        :type canal_name: str
+        :return: The stored (origin index, destination index) pairs with at least one route through the canal.
+        :rtype: List[Tuple[int, int]]
+        """
+        return [key for key, canals in self._pair_canals.items() if canal_name in canals]
+
+    def get_route_lengths(self, origin_index, destination_index, excluded_canals=None):
+        """
+        :param origin_index: The index of the origin port.
+        :type origin_index: int
+        :param destination_index: The index of the destination port.
+        :type destination_index: int
+        :param excluded_canals: Routes through any of these canals are left out.
+        :type excluded_canals: Set[str] | None
+        :return: The lengths of the routes between the ports or None if no routes are stored.
+        :rtype: List[float] | None
+        """
+        key = (origin_index, destination_index)
+        if key not in self._routes:
+            key = (destination_index, origin_index)
+        lengths = None
+        routes = self._routes.get(key)
+        if isinstance(routes, range):
+            lengths = self._geometry.lengths[routes.start:routes.stop]
+            if excluded_canals:
+                excluded_flags = self._geometry.get_canal_flags(excluded_canals)
+                lengths = lengths[self._geometry.canal_flags[routes.start:routes.stop] & excluded_flags == 0]
+            lengths = lengths.tolist()
+        elif routes is not None:
+            lengths = [r.length for r in routes
+                       if not excluded_canals or excluded_canals.isdisjoint(r.canals or ())]
+        return lengths
+
+    def get_distance_matrix(self, number_of_ports):
+        """
+        The lengths of the shortest stored routes between all ports.
+
+        :param number_of_ports: The number of ports.
+        :type number_of_ports: int
+        :return: The float64 matrix indexed by the port indices with NaN for port pairs without stored routes and
+            0 on the diagonal.
+        :rtype: np.ndarray
+        """
+        distance_matrix = np.full((number_of_ports, number_of_ports), np.nan)
+        for i in range(number_of_ports):
+            for j in range(number_of_ports):
+                lengths = self.get_route_lengths(i, j)
+                if lengths is not None:
+                    distance_matrix[i, j] = min(lengths, default=math.inf)
+        np.fill_diagonal(distance_matrix, 0)
+        return distance_matrix
+
+    def get_routes(self, origin_index, destination_index):
+        """
+        :param origin_index: The index of the origin port.
+        :type origin_index: int
+        :param destination_index: The index of the destination port.
+        :type destination_index: int
+        :return: Views of the routes from origin to destination or None if no routes are stored.
+        :rtype: Tuple[RouteView, ...] | None
+        """
+        key = (origin_index, destination_index)
+        views = self._views.get(key)
+        if views is None:
+            if key in self._routes:
+                views = tuple(RouteView(r) for r in self._get_stored_routes(key))
+            elif (destination_index, origin_index) in self._routes:
+                views = tuple(RouteView(r, is_reversed=True)
+                              for r in self._get_stored_routes((destination_index, origin_index)))
+            if views is not None:
+                self._views[key] = views
+        return views
+
+
+class RouteGeometry:
+    """
+    Routes between ports in a columnar format.
+
+    The routes of all port pairs are stored in flat arrays:
+        * port_names: The names of the ports.
+        * origins, destinations: The indices of the origin and destination port names of each port pair.
+        * pair_offsets: The routes of the i-th pair are the routes pair_offsets[i] to pair_offsets[i + 1].
+        * route_offsets: The points of the i-th route are coordinates[route_offsets[i]:route_offsets[i + 1]].
+        * coordinates: The points of all routes in the format [longitude, latitude].
+        * lengths: The length of each route.
+        * canal_flags: The canals of each route as bit flags of canal_names. The flags are of the smallest unsigned
+          integer type with a bit per canal.
+        * canal_names: The names of the canals, at most MAX_NUMBER_OF_CANALS.
+    """
+
+    ARRAY_NAMES = ("port_names", "origins", "destinations", "pair_offsets", "route_offsets", "coordinates",
+                   "lengths", "canal_flags", "canal_names")
+    MAX_NUMBER_OF_CANALS = 64
+
+    def __init__(self, port_names, origins, destinations, pair_offsets, route_offsets, coordinates, lengths,
+                 canal_flags, canal_names):
+        super().__init__()
+        self.port_names = port_names
+        self.origins = origins
+        self.destinations = destinations
+        self.pair_offsets = pair_offsets
+        self.route_offsets = route_offsets
+        self.coordinates = coordinates
+        self.lengths = lengths
+        self.canal_flags = canal_flags
+        self.canal_names = canal_names
+        self._canals_per_flags = {}
+
+    @classmethod
+    def from_precomputed_routes(cls, precomputed_routes, ports, canal_names=("Suez", "Panama")):
+        """
+        Convert precomputed routes keyed by the concatenated names of the origin and destination.
+
+        The names of the routes are not kept.
+
+        :param precomputed_routes: The routes per concatenated names.
+        :type precomputed_routes: Dict[str, List[Route]]
+        :param ports: The ports whose routes are converted.
+        :type ports: List[Port]
+        :param canal_names: The known canal names. Further canals are added in order of appearance.
+        :type canal_names: Tuple[str, ...]
+        :return: The routes.
+        :rtype: RouteGeometry
+        :raises ValueError: if the routes pass more than MAX_NUMBER_OF_CANALS canals.
+        """
+        canal_names = list(canal_names)
+        origins = []
+        destinations = []
+        pair_offsets = [0]
+        route_offsets = [0]
+        all_points = []
+        lengths = []
+        canal_flags = []
+        converted_pairs = set()
+        for origin_index, origin_port in enumerate(ports):
+            for destination_index, destination_port in enumerate(ports):
+                routes = precomputed_routes.get(f"{origin_port.name}{destination_port.name}")
+                if routes is None or (destination_index, origin_index) in converted_pairs:
+                    continue
+                converted_pairs.add((origin_index, destination_index))
+                origins.append(origin_index)
+                destinations.append(destination_index)
+                for one_route in routes:
+                    all_points.extend(one_route.route)
+                    route_offsets.append(len(all_points))
+                    lengths.append(one_route.length)
+                    flags = 0
+                    for one_canal in (one_route.canals or []):
+                        if one_canal not in canal_names:
+                            canal_names.append(one_canal)
+                        flags |= 1 << canal_names.index(one_canal)
+                    canal_flags.append(flags)
+                pair_offsets.append(len(lengths))
+        if len(canal_names) > cls.MAX_NUMBER_OF_CANALS:
+            raise ValueError(f"The routes pass {len(canal_names)} canals but at most {cls.MAX_NUMBER_OF_CANALS}"
+                             f" canals are supported.")
+        coordinates = np.array(all_points, dtype=np.float64).reshape(-1, 2)
+        return cls(
+            port_names=np.array([one_port.name for one_port in ports]),
+            origins=np.array(origins, dtype=np.int32),
+            destinations=np.array(destinations, dtype=np.int32),
+            pair_offsets=np.array(pair_offsets, dtype=np.int64),
+            route_offsets=np.array(route_offsets, dtype=np.int64),
+            coordinates=coordinates,
+            lengths=np.array(lengths, dtype=np.float64),
+            canal_flags=np.array(canal_flags, dtype=np.min_scalar_type((1 << len(canal_names)) - 1)),
+            canal_names=np.array(canal_names))
+
+    def save(self, path):
+        """
+        Save the routes as an uncompressed '.npz' file.
+
+        :param path: The path of the file.
+        :type path: str
+        """
+        np.savez(path, **{name: getattr(self, name) for name in self.ARRAY_NAMES})
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load routes saved with :py:func:`save`.
+
+        :param path: The path of the file.
+        :type path: str
+        :return: The routes.
+        :rtype: RouteGeometry
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            route_geometry = cls(**{name: arrays[name] for name in cls.ARRAY_NAMES})
+        return route_geometry
+
+    def get_canals(self, flags):
+        """
+        :param flags: The canal flags.
+        :type flags: int
+        :return: The names of the canals of the flags.
+        :rtype: Tuple[str, ...]
+        """
+        canals = self._canals_per_flags.get(flags)
+        if canals is None:
+            canals = tuple(name for i, name in enumerate(self.canal_names.tolist()) if flags & (1 << i))
+            self._canals_per_flags[flags] = canals
+        return canals
+
+    def get_canal_flags(self, canals):
+        """
+        :param canals: The names of the canals. Unknown names are ignored.
+        :type canals: Iterable[str]
+        :return: The canal flags of the canals.
+        :rtype: int
+        """
+        canal_names = self.canal_names.tolist()
+        flags = 0
+        for one_canal in canals:
+            if one_canal in canal_names:
+                flags |= 1 << canal_names.index(one_canal)
+        return flags
+
+    def get_pair_canal_flags(self):
+        """
+        :return: The union of the canal flags of all routes of each port pair.
+        :rtype: np.ndarray
+        """
+        pair_canal_flags = np.zeros(len(self.origins), dtype=self.canal_flags.dtype)
+        is_not_empty = self.pair_offsets[1:] > self.pair_offsets[:-1]
+        if np.any(is_not_empty):
+            pair_canal_flags[is_not_empty] = np.bitwise_or.reduceat(
+                self.canal_flags, self.pair_offsets[:-1][is_not_empty])
+        return pair_canal_flags
+
+    def get_route(self, route_index):
+        """
+        :param route_index: The index of the route.
+        :type route_index: int
+        :return: The route with the points as a view of the coordinates.
+        :rtype: Route
+        """
+        canals = self.get_canals(int(self.canal_flags[route_index]))
+        points = self.coordinates[self.route_offsets[route_index]:self.route_offsets[route_index + 1]]
+        return Route("", points, float(self.lengths[route_index]), canals)
+
+
+_loaded_route_stores = {}
+
+
+def load_route_store(precomputed_routes_file, ports):
+    """
+    Load the routes for the ports from a file. Files with the extension '.npz' are read as :py:class:`RouteGeometry`
+    and all other files as pickled precomputed routes.
+
+    Each file is only loaded once per process for the same ports and all callers share the same store. The file is
+    loaded again if it was modified since. The shared store must not be changed, i.e. no routes may be added.
+
+    :param precomputed_routes_file: The path of the file.
+    :type precomputed_routes_file: str
+    :param ports: The ports in the order of the port indices.
+    :type ports: List[Port]
+    :return: The store.
+    :rtype: RouteStore
+    """
+    key = (os.path.abspath(precomputed_routes_file), os.path.getmtime(precomputed_routes_file),
+           tuple(one_port.name for one_port in ports))
+    route_store = _loaded_route_stores.get(key)
+    if route_store is None:
+        if precomputed_routes_file.endswith(".npz"):
+            route_store = RouteStore.from_route_geometry(RouteGeometry.load(precomputed_routes_file), ports)
+        else:
+            with open(precomputed_routes_file, "rb") as file:
+                route_store = RouteStore.from_precomputed_routes(pickle.load(file), ports)
+        for one_key in [k for k in _loaded_route_stores if k[0] == key[0] and k[2] == key[2]]:
+            del _loaded_route_stores[one_key]
+        _loaded_route_stores[key] = route_store
+    return route_store
+
+
+def get_distance_matrix_key(precomputed_routes_file, ports):
+    """
+    The key of a distance matrix built from precomputed routes for ports. The key changes if the routes file is
+    modified or the ports change.
+
+    :param precomputed_routes_file: The path of the precomputed routes file.
+    :type precomputed_routes_file: str
+    :param ports: The ports in the order of the port indices.
+    :type ports: List[Port]
+    :return: The key.
+    :rtype: dict
+    """
+    ports_hash = hashlib.sha256("\n".join(one_port.name for one_port in ports).encode()).hexdigest()
+    return {
+        "precomputed_routes_file": os.path.abspath(precomputed_routes_file),
+        "modification_time": os.path.getmtime(precomputed_routes_file),
+        "ports": ports_hash,
+    }
+
+
+def get_distance_matrix_key_file(distance_matrix_file):
+    """
+    :param distance_matrix_file: The path of the distance matrix file.
+    :type distance_matrix_file: str
+    :return: The path of the file of the key of the distance matrix.
+    :rtype: str
+    """
+    return f"{distance_matrix_file}.key.json"
+
+
+def save_distance_matrix(distance_matrix_file, distance_matrix, precomputed_routes_file, ports):
+    """
+    Save a distance matrix as a '.npy' file and its key (see :py:func:`get_distance_matrix_key`) next to it.
+
+    :param distance_matrix_file: The path of the file.
+    :type distance_matrix_file: str
+    :param distance_matrix: The matrix.
+    :type distance_matrix: np.ndarray
+    :param precomputed_routes_file: The path of the precomputed routes file the matrix was built from.
+    :type precomputed_routes_file: str
+    :param ports: The ports in the order of the port indices.
+    :type ports: List[Port]
+    """
+    np.save(distance_matrix_file, distance_matrix)
+    with open(get_distance_matrix_key_file(distance_matrix_file), "w") as file:
+        json.dump(get_distance_matrix_key(precomputed_routes_file, ports), file)
+
+
+def convert_precomputed_routes(precomputed_routes_file, route_geometry_file, ports):
+    """
+    Convert pickled precomputed routes to the columnar format (see :py:class:`RouteGeometry`).
+
+    :param precomputed_routes_file: The path of the pickle file.
+    :type precomputed_routes_file: str
+    :param route_geometry_file: The path of the '.npz' file.
+    :type route_geometry_file: str
+    :param ports: The ports whose routes are converted.
+    :type ports: List[Port]
+    :return: The routes.
+    :rtype: RouteGeometry
+    """
+    with open(precomputed_routes_file, "rb") as file:
+        precomputed_routes = pickle.load(file)
+    route_geometry = RouteGeometry.from_precomputed_routes(precomputed_routes, ports)
+    route_geometry.save(route_geometry_file)
+    return route_geometry
+
+
 class NoPathsException(Exception):
     pass
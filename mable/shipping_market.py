@@ -7,12 +7,14 @@ from abc import abstractmethod
 from enum import Enum
 from typing import Union, Hashable, TYPE_CHECKING, List, Dict
 import math
+import types
 
 import attrs
 import loguru
+import numpy as np
 
 from mable.util import JsonAble
-from mable.simulation_space.universe import Port
+from mable.simulation_space.universe import Location, Port
 from mable.simulation_environment import SimulationEngineAware
 
 
@@ -70,6 +72,38 @@ class Shipping(SimulationEngineAware):
         times = list(self._all_trades.keys())
         return times
 
+    def get_realisation_random(self, time):
+        """
+        Returns the random to realise the trades of a time with.
+
+        :param time: The time.
+        :type time: float
+        :return: The random. By default, the world's random.
+        :rtype: np.random.RandomState
+        """
+        return self._engine.world.random
+
+    def realise_trades(self, trades, random=None):
+        """
+        Determine which trades occur based on their probabilities with one draw for all trades.
+
+        A trade occurs if its uniform sample is at least one minus its probability. This uses the same samples
+        and decisions as drawing from [0, 1] with probabilities [1 - probability, probability] for each trade in turn.
+
+        :param trades: The trades.
+        :type trades: List[Trade]
+        :param random: The random to draw from. Default is the world's random.
+        :type random: np.random.RandomState | None
+        :return: For each trade if it occurs.
+        :rtype: np.ndarray
+        """
+        if random is None:
+            random = self._engine.world.random
+        probabilities = np.fromiter((t.probability for t in trades), dtype=float, count=len(trades))
+        uniform_samples = random.random_sample(len(trades))
+        is_realised = uniform_samples >= 1 - probabilities
+        return is_realised
+
     def get_trades(self, time):
         """
         Get trades for a specific time.
@@ -84,12 +118,12 @@ class Shipping(SimulationEngineAware):
         else:
             if time in self._all_trades:
                 trades = self._all_trades[time]
-                all_occurring_trades = [
-                    t for t in trades
-                    if self._engine.world.random.choice([0, 1], p=[1 - t.probability, t.probability])]
+                is_realised = self.realise_trades(trades, self.get_realisation_random(time))
+                all_occurring_trades = [t for t, t_is_realised in zip(trades, is_realised) if t_is_realised]
                 logger.info(f"{len(all_occurring_trades)} trades of a total of {len(trades)} trades realised (time: {time}).")
-                for one_trade in [t for t in trades if t not in all_occurring_trades]:
-                    one_trade.status = TradeStatus.NOT_REALISED
+                for one_trade, one_trade_is_realised in zip(trades, is_realised):
+                    if not one_trade_is_realised:
+                        one_trade.status = TradeStatus.NOT_REALISED
                 self._occurred_trades[time] = all_occurring_trades
             else:
                 all_occurring_trades = []
@@ -338,6 +372,222 @@ class Contract(JsonAble):
         return attrs.asdict(self)
 
 
+class ReadOnlyView(JsonAble):
+    """
+    A read-only view of an object that can be shared without copying.
+
+    All attributes are read from the viewed object and are read-only as well: Lists and tuples are returned as copies
+    of their read-only items, dicts as read-only mappings, sets as frozensets, numpy arrays as non-writeable views and
+    all other objects, e.g. vessels, as read-only views. Immutable values, e.g. locations and ports, and methods are
+    returned as they are. Setting or deleting attributes raises an AttributeError. A view compares equal to the viewed
+    object and has the same hash. Copies of a view are the view itself.
+    """
+
+    __slots__ = ("_viewed",)
+
+    _IMMUTABLE_TYPES = (
+        type(None), bool, int, float, complex, str, bytes, Enum, frozenset, range, np.generic, Location,
+        type, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+    def __init__(self, viewed):
+        """
+        :param viewed: The object to view.
+        :type viewed: Any
+        """
+        object.__setattr__(self, "_viewed", viewed)
+
+    @staticmethod
+    def get_read_only(value):
+        """
+        Returns a read-only version of a value.
+
+        :param value: The value.
+        :type value: Any
+        :return: The value itself if it is immutable or a read-only version of it.
+        :rtype: Any
+        """
+        if isinstance(value, (ReadOnlyView, *ReadOnlyView._IMMUTABLE_TYPES)):
+            read_only_value = value
+        elif isinstance(value, list):
+            read_only_value = [ReadOnlyView.get_read_only(v) for v in value]
+        elif isinstance(value, tuple):
+            read_only_value = tuple(ReadOnlyView.get_read_only(v) for v in value)
+        elif isinstance(value, (dict, types.MappingProxyType)):
+            read_only_value = types.MappingProxyType(
+                {ReadOnlyView.get_read_only(k): ReadOnlyView.get_read_only(v) for k, v in value.items()})
+        elif isinstance(value, set):
+            read_only_value = frozenset(ReadOnlyView.get_read_only(v) for v in value)
+        elif isinstance(value, np.ndarray):
+            read_only_value = value.view()
+            read_only_value.flags.writeable = False
+        elif isinstance(value, Contract):
+            read_only_value = ContractView(value)
+        elif isinstance(value, Trade):
+            read_only_value = TradeView.get_trade_view(value)
+        else:
+            read_only_value = ReadOnlyView(value)
+        return read_only_value
+
+    def __getattr__(self, name):
+        return ReadOnlyView.get_read_only(getattr(self._viewed, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Cannot set '{name}' of a read-only {type(self._viewed).__name__}.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Cannot delete '{name}' of a read-only {type(self._viewed).__name__}.")
+
+    def __eq__(self, other):
+        if isinstance(other, ReadOnlyView):
+            other = other._viewed
+        return self._viewed == other
+
+    def __hash__(self):
+        return hash(self._viewed)
+
+    def __repr__(self):
+        return repr(self._viewed)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return type(self), (self._viewed,)
+
+    def to_json(self):
+        return self._viewed.to_json()
+
+
+class TradeView(ReadOnlyView):
+    """
+    A read-only view of a :py:class:`Trade`. See :py:func:`get_trade_view` for the view of a specific trade.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def get_trade_view(trade):
+        """
+        :param trade: The trade.
+        :type trade: Trade
+        :return: A :py:class:`TimeWindowTradeView` for a :py:class:`TimeWindowTrade` and a :py:class:`TradeView`
+            for all other trades.
+        :rtype: TradeView
+        """
+        if isinstance(trade, TimeWindowTrade):
+            trade_view = TimeWindowTradeView(trade)
+        else:
+            trade_view = TradeView(trade)
+        return trade_view
+
+
+class TimeWindowTradeView(TradeView):
+    """
+    A read-only view of a :py:class:`TimeWindowTrade`.
+    """
+
+    __slots__ = ()
+
+
+class ContractView(ReadOnlyView):
+    """
+    A read-only view of a :py:class:`Contract` whose trade is a :py:class:`TradeView`.
+    """
+
+    __slots__ = ("_trade_view",)
+
+    def __init__(self, contract):
+        """
+        :param contract: The contract to view.
+        :type contract: Contract
+        """
+        super().__init__(contract)
+        object.__setattr__(self, "_trade_view", TradeView.get_trade_view(contract.trade))
+
+    @property
+    def trade(self):
+        """
+        :return: The read-only trade of the contract.
+        :rtype: TradeView
+        """
+        return self._trade_view
+
+
+class _LedgerContracts(list):
+    """
+    The contracts of one company in a :py:class:`AuctionLedger` which notify the ledger of every modification.
+    """
+
+    def __init__(self, on_change):
+        """
+        :param on_change: The function to call after every modification.
+        :type on_change: Callable[[], None]
+        """
+        super().__init__()
+        self._on_change = on_change
+
+    def __reduce_ex__(self, protocol):
+        # Copies are independent of the ledger.
+        return list, (list(self),)
+
+    def _notify(self):
+        self._on_change()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._notify()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._notify()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._notify()
+        return result
+
+    def __imul__(self, other):
+        result = super().__imul__(other)
+        self._notify()
+        return result
+
+    def append(self, value):
+        super().append(value)
+        self._notify()
+
+    def extend(self, values):
+        super().extend(values)
+        self._notify()
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._notify()
+
+    def remove(self, value):
+        super().remove(value)
+        self._notify()
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._notify()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._notify()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._notify()
+
+    def reverse(self):
+        super().reverse()
+        self._notify()
+
+
 class AuctionLedger:
     """
     A ledger that collects the auction outcomes.
@@ -348,15 +598,47 @@ class AuctionLedger:
         :param shipping_companies: A list of all shipping companies.
         :type shipping_companies: List[TradingCompany]
         """
-        self._ledger = {one_company: [] for one_company in shipping_companies}
+        self._ledger = {one_company: _LedgerContracts(self._increment_version) for one_company in shipping_companies}
+        self._version = 0
+        self._read_only_ledger = None
+        self._read_only_ledger_views = None
+        self._read_only_ledger_version = None
 
     @property
     def ledger(self):
         """
-        :return: The full ledger as a dict of the trades indexed by the company names.
-        :rtype: Dict[ShippingCompany, List[Contract]]
+        :return: The full ledger as a mapping of the contracts indexed by the companies.
+        :rtype: Mapping[ShippingCompany, List[Contract]]
+        """
+        return types.MappingProxyType(self._ledger)
+
+    @property
+    def version(self):
+        """
+        The version of the ledger which increases with every modification of the contracts.
+
+        :return: The version.
+        :rtype: int
         """
-        return self._ledger
+        return self._version
+
+    def _increment_version(self):
+        self._version += 1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ledger"] = {k: list(v) for k, v in self._ledger.items()}
+        state["_read_only_ledger"] = None
+        state["_read_only_ledger_views"] = None
+        state["_read_only_ledger_version"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        ledger = self._ledger
+        self._ledger = {k: _LedgerContracts(self._increment_version) for k in ledger}
+        for k in ledger:
+            list.extend(self._ledger[k], ledger[k])
 
     @property
     def sanitised_ledger(self):
@@ -381,6 +663,42 @@ class AuctionLedger:
         trades = [copy.deepcopy(t) for t in self[shipping_company]]
         return trades
 
+    def _update_read_only_ledger(self):
+        """
+        Creates the views of all contracts if the ledger has changed since the last creation.
+        """
+        if self._read_only_ledger is None or self._read_only_ledger_version != self._version:
+            self._read_only_ledger_views = {
+                k: tuple(ContractView(c) for c in self._ledger[k]) for k in self._ledger}
+            self._read_only_ledger = types.MappingProxyType(
+                {k.name: self._read_only_ledger_views[k] for k in self._ledger})
+            self._read_only_ledger_version = self._version
+
+    @property
+    def read_only_ledger(self):
+        """
+        A read-only snapshot of the ledger as a mapping of the contract views indexed by the company names.
+
+        The snapshot is only created once and can be shared with all companies.
+
+        :return: The ledger.
+        :rtype: Mapping[str, Tuple[ContractView, ...]]
+        """
+        self._update_read_only_ledger()
+        return self._read_only_ledger
+
+    def get_contracts_for_company_view(self, shipping_company):
+        """
+        The contracts allocated to a specific company as read-only views from :py:func:`read_only_ledger`.
+
+        :param shipping_company: The specific company.
+        :type shipping_company: TradingCompany
+        :return: The contracts.
+        :rtype: Tuple[ContractView, ...]
+        """
+        self._update_read_only_ledger()
+        return self._read_only_ledger_views[shipping_company]
+
     def __getitem__(self, shipping_company):
         return self._ledger[shipping_company]
 
@@ -2,10 +2,14 @@
 The space where the simulation and operation takes place including the seas and the ports.
 """
 from abc import abstractmethod, ABC
+import collections
+import functools
 import logging
 import math
+import threading
 from typing import Union, List, Dict
 
+import attrs
 import numpy as np
 
 from mable.simulation_environment import SimulationEngineAware
@@ -15,13 +19,201 @@ from mable.simulation_space.universe import Location, Port, OnJourney
 logger = logging.getLogger(__name__)
 
 
+@attrs.define(frozen=True)
+class DistanceCacheInfo:
+    """
+    The statistics of a :py:class:`DistanceCache`.
+
+    :param hits: The number of lookups that found a distance.
+    :type hits: int
+    :param misses: The number of lookups that did not find a distance.
+    :type misses: int
+    :param evictions: The number of distances removed to stay within the maximum size.
+    :type evictions: int
+    :param max_size: The maximum number of distances.
+    :type max_size: int
+    :param size: The current number of distances.
+    :type size: int
+    """
+    hits: int
+    misses: int
+    evictions: int
+    max_size: int
+    size: int
+
+
+class DistanceCache:
+    """
+    A thread safe least recently used cache of distances between ports keyed by the two ports or port names.
+
+    Ports are compared by their ids (see :py:func:`mable.simulation_space.universe.Port.port_id`). Other locations,
+    e.g. the positions of vessels on journeys, are not cached (see :py:func:`is_cacheable`) since they rarely repeat.
+    """
+
+    def __init__(self, max_size):
+        """
+        :param max_size: The maximum number of distances.
+        :type max_size: int
+        """
+        super().__init__()
+        self._max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @staticmethod
+    def is_cacheable(location):
+        """
+        :param location: The location.
+        :type location: Location | str
+        :return: True if distances from and to the location can be cached, i.e. the location is a port or a name.
+        :rtype: bool
+        """
+        return isinstance(location, (Port, str))
+
+    def get(self, location_one, location_two):
+        """
+        :param location_one: The first port.
+        :type location_one: Port | str
+        :param location_two: The second port.
+        :type location_two: Port | str
+        :return: The distance or None if the distance is not cached.
+        :rtype: float | None
+        """
+        key = (location_one, location_two)
+        with self._lock:
+            distance = self._entries.get(key)
+            if distance is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+        return distance
+
+    def put(self, location_one, location_two, distance):
+        """
+        Cache a distance and remove the least recently used distance if the cache is full.
+
+        :param location_one: The first port.
+        :type location_one: Port | str
+        :param location_two: The second port.
+        :type location_two: Port | str
+        :param distance: The distance.
+        :type distance: float
+        """
+        key = (location_one, location_two)
+        with self._lock:
+            self._entries[key] = distance
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """
+        Remove all distances. The statistics are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        """
+        :return: The statistics of the cache.
+        :rtype: DistanceCacheInfo
+        """
+        with self._lock:
+            cache_info = DistanceCacheInfo(
+                hits=self._hits, misses=self._misses, evictions=self._evictions, max_size=self._max_size,
+                size=len(self._entries))
+        return cache_info
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _memoise_distance(get_distance):
+    """
+    Wrap a network's get_distance to look up and store the distances between ports in the network's distance cache.
+    """
+    @functools.wraps(get_distance)
+    def get_memoised_distance(self, location_one, location_two):
+        distance_cache = getattr(self, "_distance_cache", None)
+        if (distance_cache is None
+                or not DistanceCache.is_cacheable(location_one)
+                or not DistanceCache.is_cacheable(location_two)):
+            return get_distance(self, location_one, location_two)
+        distance = distance_cache.get(location_one, location_two)
+        if distance is None:
+            distance = get_distance(self, location_one, location_two)
+            distance_cache.put(location_one, location_two, distance)
+        return distance
+    get_memoised_distance.is_memoised = True
+    return get_memoised_distance
+
+
 class ShippingNetwork(SimulationEngineAware):
     """
     An abstract class for the space of operation.
+
+    The :py:func:`get_distance` of every subclass is memoised for ports in a :py:class:`DistanceCache` of at most
+    DISTANCE_CACHE_SIZE distances. Networks whose distances change have to call :py:func:`clear_distance_cache`.
     """
 
+    DISTANCE_CACHE_SIZE = 2 ** 16
+
     def __init__(self):
         super().__init__()
+        self._distance_cache = None
+        if self.DISTANCE_CACHE_SIZE > 0:
+            self._distance_cache = DistanceCache(self.DISTANCE_CACHE_SIZE)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        get_distance = cls.__dict__.get("get_distance")
+        is_instance_method = callable(get_distance) and not isinstance(get_distance, (staticmethod, classmethod))
+        if is_instance_method and not getattr(get_distance, "is_memoised", False):
+            cls.get_distance = _memoise_distance(get_distance)
+
+    def set_distance_cache_size(self, max_size):
+        """
+        Replace the distance cache by an empty cache.
+
+        :param max_size: The maximum number of cached distances. 0 disables the cache.
+        :type max_size: int
+        """
+        self._distance_cache = None
+        if max_size > 0:
+            self._distance_cache = DistanceCache(max_size)
+
+    def clear_distance_cache(self):
+        """
+        Remove all cached distances, e.g. after the distances changed.
+        """
+        if self._distance_cache is not None:
+            self._distance_cache.clear()
+
+    @property
+    def distance_cache_info(self):
+        """
+        :return: The statistics of the distance cache or None if the cache is disabled.
+        :rtype: DistanceCacheInfo | None
+        """
+        distance_cache_info = None
+        if self._distance_cache is not None:
+            distance_cache_info = self._distance_cache.info()
+        return distance_cache_info
 
     @staticmethod
     @abstractmethod
@@ -37,6 +229,23 @@ class ShippingNetwork(SimulationEngineAware):
         """
         pass
 
+    def get_distances(self, origins, destinations):
+        """
+        Returns the distances between all origins and all destinations.
+
+        :param origins: The origins.
+        :type origins: List[Location | str]
+        :param destinations: The destinations.
+        :type destinations: List[Location | str]
+        :return: The matrix of distances with one row per origin and one column per destination.
+        :rtype: np.ndarray
+        """
+        distances = np.array(
+            [[self.get_distance(one_origin, one_destination) for one_destination in destinations]
+             for one_origin in origins],
+            dtype=float).reshape(len(origins), len(destinations))
+        return distances
+
     @abstractmethod
     def get_port(self, name):
         """
@@ -62,6 +271,21 @@ class ShippingNetwork(SimulationEngineAware):
         """
         pass
 
+    def get_journey(self, origin, destination, start_time):
+        """
+        The journey of a vessel that leaves the origin for the destination.
+
+        :param origin: The start location of the journey.
+        :type origin: Location
+        :param destination: The end location of the journey.
+        :type destination: Location
+        :param start_time: The time at which the vessel leaves the origin.
+        :type start_time: float
+        :return: The journey.
+        :rtype: OnJourney
+        """
+        return OnJourney(origin=origin, destination=destination, start_time=start_time)
+
     @abstractmethod
     def get_journey_location(self, journey, vessel, current_time):
         """
@@ -98,6 +322,23 @@ class ShippingNetwork(SimulationEngineAware):
             location = self.get_port_or_default(vessel.location, vessel.location)
         return location
 
+    def get_vessel_locations(self, vessels, current_time):
+        """
+        Returns the coordinates of the locations of all vessels at the current time.
+        See :py:func:`get_vessel_location`.
+
+        :param vessels: The vessels.
+        :type vessels: List[Vessel]
+        :param current_time: The current time.
+        :type current_time: float
+        :return: The coordinates (x, y) of each vessel's location with one row per vessel.
+        :rtype: np.ndarray
+        """
+        locations = [self.get_vessel_location(one_vessel, current_time) for one_vessel in vessels]
+        coordinates = np.array([(one_location.x, one_location.y) for one_location in locations],
+                               dtype=float).reshape(len(vessels), 2)
+        return coordinates
+
 
 class NetworkWithPortDict(ShippingNetwork, ABC):
     """
@@ -110,6 +351,10 @@ class NetworkWithPortDict(ShippingNetwork, ABC):
         self._ports = {}
         if ports is not None:
             self._ports = ports
+        self._port_indices = {name: idx for idx, name in enumerate(self._ports)}
+        self._port_ids = np.array([one_port.port_id for one_port in self._ports.values()], dtype=int)
+        self._port_id_indices = {port_id: idx for idx, port_id in enumerate(self._port_ids.tolist())}
+        self._port_distances = None
 
     @staticmethod
     def _create_port_dict(ports):
@@ -129,10 +374,26 @@ class NetworkWithPortDict(ShippingNetwork, ABC):
                 post_dict[one_port.name] = one_port
         return post_dict
 
+    def clear_distance_cache(self):
+        """
+        Remove all cached distances including the table of the port distances (see :py:func:`get_distances`),
+        e.g. after the distances changed.
+        """
+        super().clear_distance_cache()
+        self._port_distances = None
+
     @property
     def ports(self):
         return list(self._ports.values())
 
+    @property
+    def port_ids(self):
+        """
+        :return: The ids of the ports (see :py:func:`Port.port_id`) in the order of :py:func:`ports`.
+        :rtype: np.ndarray
+        """
+        return self._port_ids
+
     def get_port(self, name):
         """
         Returns the port with the name.
@@ -144,6 +405,83 @@ class NetworkWithPortDict(ShippingNetwork, ABC):
         port = self._ports[name]
         return port
 
+    def get_port_index(self, location):
+        """
+        Returns the index of a port of the network. The index is the position of the port in :py:func:`ports`.
+
+        :param location: The port or the name of the port.
+        :type location: Location | str
+        :return: The index or None if the location is not a port of the network.
+        :rtype: int | None
+        """
+        if isinstance(location, Port):
+            port_index = self._port_id_indices.get(location.port_id)
+        elif isinstance(location, Location):
+            port_index = self._port_indices.get(location.name)
+            port = self._ports.get(location.name)
+            if port_index is not None and port is not location and port != location:
+                port_index = None
+        else:
+            port_index = self._port_indices.get(location)
+        return port_index
+
+    def get_distances(self, origins, destinations):
+        """
+        Returns the distances between all origins and all destinations.
+
+        Distances between ports are taken from a table indexed by the port indices (see :py:func:`get_port_index`).
+        Missing entries of the table are determined once via :py:func:`get_distance`. Any other locations are
+        always determined via :py:func:`get_distance`.
+
+        :param origins: The origins.
+        :type origins: List[Location | str]
+        :param destinations: The destinations.
+        :type destinations: List[Location | str]
+        :return: The matrix of distances with one row per origin and one column per destination.
+        :rtype: np.ndarray
+        """
+        if self._port_distances is None:
+            self._port_distances = np.full((len(self._ports), len(self._ports)), np.nan)
+        origin_indices = self.get_port_indices(origins)
+        destination_indices = self.get_port_indices(destinations)
+        origin_is_port = origin_indices >= 0
+        destination_is_port = destination_indices >= 0
+        port_origin_indices = origin_indices[origin_is_port]
+        port_destination_indices = destination_indices[destination_is_port]
+        port_distances = self._port_distances[np.ix_(port_origin_indices, port_destination_indices)]
+        is_missing = np.isnan(port_distances)
+        if is_missing.any():
+            all_ports = self.ports
+            for i, j in set(zip(port_origin_indices[is_missing.nonzero()[0]],
+                                port_destination_indices[is_missing.nonzero()[1]])):
+                self._port_distances[i, j] = self.get_distance(all_ports[i], all_ports[j])
+            port_distances = self._port_distances[np.ix_(port_origin_indices, port_destination_indices)]
+        distances = np.empty((len(origins), len(destinations)))
+        distances[np.ix_(origin_is_port, destination_is_port)] = port_distances
+        for i in np.flatnonzero(~origin_is_port):
+            distances[i, :] = [self.get_distance(origins[i], one_destination) for one_destination in destinations]
+        for j in np.flatnonzero(~destination_is_port):
+            distances[origin_is_port, j] = [self.get_distance(origins[i], destinations[j])
+                                            for i in np.flatnonzero(origin_is_port)]
+        return distances
+
+    def get_port_indices(self, locations):
+        """
+        Returns the indices of ports of the network (see :py:func:`get_port_index`).
+
+        :param locations: The ports or the names of the ports.
+        :type locations: List[Location | str]
+        :return: The indices with -1 for every location that is not a port of the network.
+        :rtype: np.ndarray
+        """
+        return np.array([self._get_port_index_or_default(one_location) for one_location in locations], dtype=int)
+
+    def _get_port_index_or_default(self, location, default=-1):
+        port_index = self.get_port_index(location)
+        if port_index is None:
+            port_index = default
+        return port_index
+
     def get_port_or_default(self, name, default=None):
         """
         Returns a port by name or the default value in case no port with the specified name exists.
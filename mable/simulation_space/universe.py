@@ -1,3 +1,7 @@
+import itertools
+import threading
+import weakref
+
 import attrs
 
 from mable.util import JsonAble
@@ -52,9 +56,87 @@ class Location:
         return hash((self.name, self._x, self._y))
 
 
+class _PortIdentity:
+    """
+    The identity shared by all equal ports. The registry only keeps a weak reference to it.
+    """
+
+    __slots__ = ("port_id", "__weakref__")
+
+    def __init__(self, port_id):
+        self.port_id = port_id
+
+
+class PortRegistry:
+    """
+    A registry that interns ports, i.e. assigns every distinct port an integer id.
+
+    Ports are distinct if they differ in name or coordinates. Every :py:class:`Port` is interned in the shared
+    :py:data:`PORT_REGISTRY` on construction, so that the ids can be used to compare ports and to look up port
+    information. The registry only references ports weakly: the id of a port is released when no equal port exists
+    any longer, so the registry does not grow with the ports of finished simulations. The ids are unique among the
+    existing ports of one process but are not stable between processes, i.e. they must not be persisted.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._identities = weakref.WeakValueDictionary()
+        self._next_port_id = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._identities)
+
+    @staticmethod
+    def _get_key(port):
+        return port.name, port.x, port.y
+
+    def intern(self, port):
+        """
+        Returns the identity of the port, which is shared by all ports equal to the port. The identity is registered
+        if no equal port exists.
+
+        :param port: The port.
+        :type port: Port
+        :return: The identity of the port.
+        :rtype: _PortIdentity
+        """
+        key = self._get_key(port)
+        with self._lock:
+            identity = self._identities.get(key)
+            if identity is None:
+                identity = _PortIdentity(next(self._next_port_id))
+                self._identities[key] = identity
+        return identity
+
+    def get_port_id(self, location):
+        """
+        Returns the id of an existing port.
+
+        :param location: The port or any location with the name and coordinates of a port.
+        :type location: Location
+        :return: The id or None if no such port exists.
+        :rtype: int | None
+        """
+        identity = self._identities.get(self._get_key(location))
+        port_id = None
+        if identity is not None:
+            port_id = identity.port_id
+        return port_id
+
+
+PORT_REGISTRY = PortRegistry()
+"""
+The registry of all ports.
+"""
+
+
 class Port(Location, JsonAble):
     """
     A port, i.e. a location in the operational space at which cargo gets exchanged.
+
+    Ports are immutable and interned in :py:data:`PORT_REGISTRY`. Two ports are equal if they have the same
+    :py:func:`port_id`, i.e. the same name and coordinates. Copying a port returns the port itself.
     """
 
     def __init__(self, name, x, y):
@@ -67,13 +149,57 @@ class Port(Location, JsonAble):
         :type y: float
         """
         super().__init__(x, y, name)
+        self._intern()
+
+    def _intern(self):
+        self._identity = PORT_REGISTRY.intern(self)
+        self._hash = super().__hash__()
+
+    @property
+    def port_id(self):
+        """
+        :return: The id of the port in :py:data:`PORT_REGISTRY`.
+        :rtype: int
+        """
+        return self._identity.port_id
+
+    def __eq__(self, other):
+        if isinstance(other, Port):
+            are_equal = self._identity is other._identity
+        else:
+            are_equal = super().__eq__(other)
+        return are_equal
+
+    def __hash__(self):
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        # The ids are only valid within one registry, i.e. one process.
+        state = self.__dict__.copy()
+        del state["_identity"]
+        del state["_hash"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._intern()
 
     def __repr__(self):
         str_repr = f"Port<{self.name} ({self.x}, {self.y})>"
         return str_repr
 
     def to_json(self):
-        return self.__dict__
+        """
+        :return: The attributes of the port without the registry identity, i.e. including those of subclasses.
+        :rtype: dict
+        """
+        return self.__getstate__()
 
 
 @attrs.define(repr=False)
@@ -87,10 +213,14 @@ class OnJourney:
     :type destination: Location
     :param start_time: The time at which the journey started, i.e. the time the vessel left origin.
     :type start_time: float
+    :param route: The route of the journey if the network records it at departure, None otherwise.
+        See :py:func:`mable.simulation_space.structure.ShippingNetwork.get_journey`.
+    :type route: Any
     """
     origin: Location
     destination: Location
     start_time: float
+    route: object = attrs.field(default=None, eq=False)
 
     def __repr__(self):
         str_repr = f"OnJourney<{self.origin} -> {self.destination} (start {self.start_time})>"
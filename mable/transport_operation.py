@@ -438,6 +438,20 @@ class Vessel(SimulationEngineAware):
         self._schedule = new_schedule
         self.start_next_event()
 
+    def update_schedule_travel_times(self, location_pairs):
+        """
+        **WARNING**: Part of internal simulation logic. Only allowed to be called by the simulation!
+
+        Recompute the travel times of the current schedule between the location pairs.
+        See :py:func:`Schedule.update_travel_times`. The next event is not changed.
+
+        :param location_pairs: The pairs of locations in either direction.
+        :type location_pairs: Set[Tuple[Location, Location]]
+        :return: True if any travel time was recomputed.
+        :rtype: bool
+        """
+        return self._schedule.update_travel_times(location_pairs)
+
     def event_occurrence(self, event):
         """
         **WARNING**: Part of internal simulation logic. Only allowed to be called by the simulation!
@@ -843,3 +857,20 @@ class Bid:
     amount: float
     trade: Trade
     company: ShippingCompany = None
+
+
+@attrs.define(kw_only=True)
+class BundleBid:
+    """
+    A bid for the transportation of a bundle of cargoes. The bid is only won as a whole, i.e. either all trades of
+    the bundle are allocated to the bidding company or none.
+    :param amount:
+        The amount for which the bidding company is willing to transport all cargoes of the bundle.
+    :type amount: float
+    :param trades:
+        The trades the company is bidding for.
+    :type trades: List[Trade]
+    """
+    amount: float
+    trades: List[Trade]
+    company: ShippingCompany = None
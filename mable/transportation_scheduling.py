@@ -13,7 +13,7 @@ import attrs
 import networkx as nx
 import numpy as np
 
-from mable.shipping_market import TimeWindowTrade
+from mable.shipping_market import TimeWindowTrade, TimeWindowTradeView
 from mable.simulation_environment import SimulationEngineAware
 from mable.event_management import IdleEvent, TravelEvent
 
@@ -200,6 +200,24 @@ class Schedule(SimulationEngineAware):
         travel_time = self._vessel.get_travel_time(travel_distance)
         return travel_time
 
+    def _get_first_operation_start(self, earliest_start):
+        """
+        The earliest start of the operation of the first task after the vessel has travelled from its current location
+        to the task's location.
+
+        :param earliest_start: The earliest start of the first task.
+        :type earliest_start: float
+        :return: The start time.
+        :rtype: float
+        """
+        destination = self._get_vessel_destination(self._stn.nodes[(1, TransportationStartFinishIndicator.START)])
+        vessel_location = self._engine.world.network.get_vessel_location(self._vessel, self._engine.world.current_time)
+        travel_distance = self._engine.world.network.get_distance(vessel_location, destination)
+        travel_time = self._vessel.get_travel_time(travel_distance)
+        arrival_time = travel_time + self._time_schedule_head
+        operation_start = max(arrival_time, earliest_start)
+        return operation_start
+
     def _add_task_edges(self, location, location_type, cargo_transfer_time, earliest_start=0, latest_finish=math.inf):
         """
         Add the edges to and from a task.
@@ -218,15 +236,7 @@ class Schedule(SimulationEngineAware):
         :return:
         """
         if location == 1:
-            if location_type == TransportationSourceDestinationIndicator.PICK_UP:
-                destination = self._stn.nodes[(1, TransportationStartFinishIndicator.START)]["trade"].origin_port
-            else:
-                destination = self._stn.nodes[(1, TransportationStartFinishIndicator.START)]["trade"].destination_port
-            vessel_location = self._engine.world.network.get_vessel_location(self._vessel, self._engine.world.current_time)
-            travel_distance = self._engine.world.network.get_distance(vessel_location, destination)
-            travel_time = self._vessel.get_travel_time(travel_distance)
-            arrival_time = travel_time + self._time_schedule_head
-            operation_start = max(arrival_time, earliest_start)
+            operation_start = self._get_first_operation_start(earliest_start)
             self._stn.add_edge((location, TransportationStartFinishIndicator.START), 0, weight=-operation_start)
         else:
             travel_time = self._get_travel_time(location, TransportationStartFinishIndicator.START)
@@ -273,7 +283,7 @@ class Schedule(SimulationEngineAware):
             location.
         :return:
         """
-        if not isinstance(trade, TimeWindowTrade):
+        if not isinstance(trade, (TimeWindowTrade, TimeWindowTradeView)):
             trade = TimeWindowTrade(origin_port=trade.origin_port,
                                     destination_port=trade.destination_port,
                                     amount=trade.amount,
@@ -494,6 +504,47 @@ class Schedule(SimulationEngineAware):
         valid_schedule = self.verify_schedule_time() and self.verify_schedule_cargo()
         return valid_schedule
 
+    def update_travel_times(self, location_pairs):
+        """
+        Recompute the travel times between consecutive tasks whose locations are one of the location pairs, e.g.
+        after the distances between these locations changed. The travel time to the first task is recomputed if the
+        vessel's current location and the first task's location are one of the location pairs, i.e. not while the
+        vessel is on a journey.
+
+        :param location_pairs: The pairs of locations in either direction.
+        :type location_pairs: Set[Tuple[Location, Location]]
+        :return: True if any travel time was recomputed.
+        :rtype: bool
+        """
+        is_updated = False
+        first_start_node = (1, TransportationStartFinishIndicator.START)
+        if first_start_node in self._stn:
+            first_node = self._stn.nodes[first_start_node]
+            location_first = self._get_vessel_destination(first_node)
+            vessel_location = self._engine.world.network.get_vessel_location(
+                self._vessel, self._engine.world.current_time)
+            if ((vessel_location, location_first) in location_pairs
+                    or (location_first, vessel_location) in location_pairs):
+                if first_node["location_type"] == TransportationSourceDestinationIndicator.PICK_UP:
+                    earliest_start = first_node["trade"].earliest_pickup_clean
+                else:
+                    earliest_start = first_node["trade"].earliest_drop_off_clean
+                operation_start = self._get_first_operation_start(earliest_start)
+                self._stn[first_start_node][0]["weight"] = -operation_start
+                is_updated = True
+        for location in range(2, self._number_tasks + 1):
+            start_node = (location, TransportationStartFinishIndicator.START)
+            previous_finish_node = (location - 1, TransportationStartFinishIndicator.FINISH)
+            if self._stn.has_edge(start_node, previous_finish_node):
+                location_previous = self._get_vessel_destination(self._stn.nodes[previous_finish_node])
+                location_current = self._get_vessel_destination(self._stn.nodes[start_node])
+                if ((location_previous, location_current) in location_pairs
+                        or (location_current, location_previous) in location_pairs):
+                    travel_time = self._get_travel_time(location, TransportationStartFinishIndicator.START)
+                    self._stn[start_node][previous_finish_node]["weight"] = -travel_time
+                    is_updated = True
+        return is_updated
+
     def get_insertion_points(self):
         """
         Get the points where tasks can be inserted.
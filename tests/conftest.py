@@ -0,0 +1,54 @@
+"""
+Shared fixtures of the tests.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from mable import benchmarks
+from mable.extensions import world_ports
+from mable.extensions.routing_graph import CsrRoutingGraph
+
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def ports():
+    """
+    The real world ports of 'ports.csv'.
+    """
+    return world_ports.get_ports(os.path.join(REPOSITORY_PATH, "ports.csv"))
+
+
+@pytest.fixture(scope="session")
+def routing_graph_file(tmp_path_factory):
+    """
+    A synthetic lattice routing graph with a node every 10 degrees and about 15% of the edges removed as land.
+    """
+    graph_file = str(tmp_path_factory.mktemp("graph") / "graph.txt")
+    benchmarks._write_synthetic_graph_file(graph_file, 10, np.random.RandomState(0))
+    return graph_file
+
+
+@pytest.fixture(scope="session")
+def routing_graph(routing_graph_file):
+    return CsrRoutingGraph.from_file(routing_graph_file)
+
+
+@pytest.fixture(scope="module")
+def distribution_world():
+    """
+    A world with the real world ports but without routes. See :py:func:`mable.benchmarks.get_distribution_world`.
+    """
+    return benchmarks.get_distribution_world(REPOSITORY_PATH, seed=0)
+
+
+@pytest.fixture(scope="module")
+def distribution_shipping(distribution_world):
+    """
+    A distribution shipping based on the distribution files of the repository.
+    See :py:func:`mable.benchmarks.get_distribution_shipping`.
+    """
+    return benchmarks.get_distribution_shipping(distribution_world, 0, environment_files_path=REPOSITORY_PATH)
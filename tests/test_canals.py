@@ -0,0 +1,169 @@
+import math
+
+import numpy as np
+import pytest
+
+from mable.engine import SimulationEngine
+from mable.event_management import CanalStatusEvent, EventQueue, TravelEvent
+from mable.extensions.cargo_distributions import DistributionClassFactory
+from mable.extensions.world_ports import LatLongShippingNetwork, Route, RouteGeometry, WorldVessel
+from mable.shipping_market import TimeWindowTrade
+from mable.simulation_environment import World
+from mable.simulation_space.universe import OnJourney
+from mable.transport_operation import CargoCapacity, ShippingCompany
+from mable.transportation_scheduling import Schedule
+
+
+NUMBER_OF_PORTS = 8
+
+
+def _get_routes(port_one, port_two, i, j):
+    """
+    A direct route for all pairs but the first and fourth port and a shorter route through Suez for every third pair,
+    i.e. the first and fourth port only have a route through Suez.
+    """
+    start = (port_one.longitude, port_one.latitude)
+    end = (port_two.longitude, port_two.latitude)
+    length = 1000. * (i + j + 1)
+    routes = []
+    if (i, j) != (0, 3):
+        routes.append(Route("", [start, end], length, ()))
+    if (i + j) % 3 == 0:
+        routes.append(Route("", [start, (32.5, 30.), end], 0.6 * length, ("Suez",)))
+    return sorted(routes, key=lambda r: r.length)
+
+
+@pytest.fixture(scope="module")
+def canal_ports(ports):
+    return ports[:NUMBER_OF_PORTS]
+
+
+@pytest.fixture(scope="module")
+def precomputed_routes(canal_ports):
+    return {f"{one_port.name}{two_port.name}": _get_routes(one_port, two_port, i, i + 1 + j)
+            for i, one_port in enumerate(canal_ports) for j, two_port in enumerate(canal_ports[i + 1:])}
+
+
+@pytest.fixture(scope="module")
+def precomputed_routes_file(tmp_path_factory, canal_ports, precomputed_routes):
+    routes_file = str(tmp_path_factory.mktemp("routes") / "routes.npz")
+    RouteGeometry.from_precomputed_routes(precomputed_routes, canal_ports).save(routes_file)
+    return routes_file
+
+
+@pytest.fixture
+def network(canal_ports, precomputed_routes_file):
+    return LatLongShippingNetwork(canal_ports, precomputed_routes_file=precomputed_routes_file)
+
+
+def _get_expected_distance(precomputed_routes, port_one, port_two, closed_canals=frozenset()):
+    routes = (precomputed_routes.get(f"{port_one.name}{port_two.name}")
+              or precomputed_routes[f"{port_two.name}{port_one.name}"])
+    return min((r.length for r in routes if closed_canals.isdisjoint(r.canals)), default=math.inf)
+
+
+def _get_engine(network, vessel):
+    world = World(network, EventQueue(), np.random.RandomState(0))
+    company = ShippingCompany([vessel], "Company")
+    engine = SimulationEngine(world, [company], None, None, DistributionClassFactory())
+    world.set_engine(engine)
+    company.set_engine(engine)
+    vessel.set_engine(engine)
+    return engine
+
+
+def _get_vessel(location):
+    return WorldVessel([CargoCapacity(cargo_type="Oil", loading_rate=1000, capacity=100000)], location, 10,
+                       name="Vessel")
+
+
+def _get_schedule(engine, vessel, origin_port, destination_port, latest_drop_off=None):
+    trade = TimeWindowTrade(origin_port=origin_port, destination_port=destination_port, amount=1000,
+                            cargo_type="Oil", time_window=[None, None, None, latest_drop_off])
+    schedule = Schedule(vessel, 0)
+    schedule.set_engine(engine)
+    schedule.add_transportation(trade)
+    return schedule
+
+
+def test_close_and_open_canal_update_distances(network, canal_ports, precomputed_routes):
+    distances = network.get_distances(canal_ports, canal_ports).copy()
+    affected_pairs = network.close_canal("Suez")
+    assert {tuple(sorted(p)) for p in affected_pairs} == {
+        (i, j) for i in range(NUMBER_OF_PORTS) for j in range(i + 1, NUMBER_OF_PORTS) if (i + j) % 3 == 0}
+    for one_port in canal_ports:
+        for two_port in canal_ports:
+            if one_port is not two_port:
+                assert network.get_distance(one_port, two_port) == pytest.approx(
+                    _get_expected_distance(precomputed_routes, one_port, two_port, frozenset({"Suez"})))
+    assert network.get_shortest_path_between_points(canal_ports[0], canal_ports[3]) is None
+    network.open_canal("Suez")
+    np.testing.assert_allclose(network.get_distances(canal_ports, canal_ports), distances)
+
+
+def test_pair_without_open_route_is_routed_on_the_graph(canal_ports, precomputed_routes_file, routing_graph_file):
+    network = LatLongShippingNetwork(canal_ports, precomputed_routes_file=precomputed_routes_file,
+                                     graph_file=routing_graph_file)
+    network.close_canal("Suez")
+    route = network.get_shortest_path_between_points(canal_ports[0], canal_ports[3])
+    assert route.canals == ("Panama",)
+    assert network.get_distance(canal_ports[0], canal_ports[3]) == pytest.approx(route.length)
+    network.open_canal("Suez")
+    assert network.get_distance(canal_ports[0], canal_ports[3]) == pytest.approx(2400)
+
+
+def test_journey_keeps_route_after_closure(network, canal_ports):
+    vessel = _get_vessel(canal_ports[1])
+    engine = _get_engine(network, vessel)
+    travel_event = TravelEvent(0, vessel, canal_ports[1], canal_ports[2])
+    travel_event.added_to_queue(engine)
+    journey = vessel.location
+    assert journey.route.canals == ("Suez",)
+    distance = travel_event.distance(engine)
+    halfway_time = vessel.get_travel_time(distance) / 2
+    location = network.get_journey_location(journey, vessel, halfway_time)
+    network.close_canal("Suez")
+    assert travel_event.distance(engine) == distance
+    assert network.get_journey_location(journey, vessel, halfway_time) == location
+    unrecorded_journey = OnJourney(origin=canal_ports[1], destination=canal_ports[2], start_time=0)
+    assert network.get_journey_location(unrecorded_journey, vessel, halfway_time) != location
+
+
+def test_canal_status_event_revalidates_schedules(network, canal_ports, precomputed_routes):
+    vessel = _get_vessel(canal_ports[0])
+    engine = _get_engine(network, vessel)
+    completion_time = _get_schedule(engine, vessel, canal_ports[1], canal_ports[2]).completion_time()
+    schedule = _get_schedule(engine, vessel, canal_ports[1], canal_ports[2], completion_time + 1)
+    assert schedule.verify_schedule()
+    vessel.schedule = schedule
+    event = CanalStatusEvent(0, "Suez", False)
+    assert event.event_action(engine) == {vessel: False}
+    expected_delay = vessel.get_travel_time(
+        _get_expected_distance(precomputed_routes, canal_ports[1], canal_ports[2], frozenset({"Suez"}))
+        - _get_expected_distance(precomputed_routes, canal_ports[1], canal_ports[2]))
+    assert vessel.schedule.completion_time() == pytest.approx(completion_time + expected_delay)
+    event = CanalStatusEvent(0, "Suez", True)
+    assert event.event_action(engine) == {vessel: True}
+    assert vessel.schedule.completion_time() == pytest.approx(completion_time)
+
+
+def test_update_travel_times_only_recomputes_affected_pairs(network, canal_ports):
+    vessel = _get_vessel(canal_ports[0])
+    engine = _get_engine(network, vessel)
+    schedule = _get_schedule(engine, vessel, canal_ports[1], canal_ports[2])
+    completion_time = schedule.completion_time()
+    assert not schedule.update_travel_times({(canal_ports[3], canal_ports[4])})
+    network.close_canal("Suez")
+    assert schedule.completion_time() == completion_time
+    assert schedule.update_travel_times({(canal_ports[2], canal_ports[1])})
+    assert schedule.completion_time() > completion_time
+
+
+def test_revalidate_schedules_reports_affected_vessels(network, canal_ports):
+    vessel = _get_vessel(canal_ports[0])
+    engine = _get_engine(network, vessel)
+    completion_time = _get_schedule(engine, vessel, canal_ports[1], canal_ports[2]).completion_time()
+    vessel.schedule = _get_schedule(engine, vessel, canal_ports[1], canal_ports[2], completion_time + 1)
+    network.close_canal("Suez")
+    assert engine.revalidate_schedules({(canal_ports[3], canal_ports[4])}) == {}
+    assert engine.revalidate_schedules({(canal_ports[1], canal_ports[2])}) == {vessel: False}
@@ -0,0 +1,113 @@
+import collections
+import os
+
+import numpy as np
+import pytest
+
+from mable import benchmarks
+from mable.extensions.cargo_distributions import DistributionClassFactory
+
+
+NUMBER_OF_CARGOES = 20000
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _sample_loop(world, shipping, seed):
+    world.random.seed(seed)
+    return shipping.sample_cargoes_from_port_distributions(
+        world, DistributionClassFactory(), NUMBER_OF_CARGOES, None, None, None, (0, 29), 0,
+        distribution_model=shipping.distribution_model)
+
+
+def _sample_batch(world, shipping, seed):
+    world.random.seed(seed)
+    return shipping.batch_sample_cargoes_from_port_distributions(
+        world, DistributionClassFactory(), NUMBER_OF_CARGOES, (0, 29), 0)
+
+
+def _get_total_variation_distance(trades_one, trades_two, key):
+    counts_one = collections.Counter(key(t) for t in trades_one)
+    counts_two = collections.Counter(key(t) for t in trades_two)
+    return sum(abs(counts_one[k] - counts_two[k]) for k in counts_one.keys() | counts_two.keys()) / (
+        2 * NUMBER_OF_CARGOES)
+
+
+@pytest.fixture(scope="module")
+def sampled_trades(distribution_world, distribution_shipping):
+    """
+    Two samples of the loop sampler and one of the batch sampler.
+    """
+    return (_sample_loop(distribution_world, distribution_shipping, 1),
+            _sample_loop(distribution_world, distribution_shipping, 2),
+            _sample_batch(distribution_world, distribution_shipping, 1))
+
+
+@pytest.mark.parametrize("key", [
+    lambda t: t.origin_port.name,
+    lambda t: t.destination_port.name,
+    lambda t: (t.origin_port.name, t.destination_port.name),
+], ids=["origin", "destination", "pair"])
+def test_batch_port_distributions_match_loop(sampled_trades, key):
+    loop_trades, other_loop_trades, batch_trades = sampled_trades
+    assert len(batch_trades) == NUMBER_OF_CARGOES
+    loop_distance = _get_total_variation_distance(loop_trades, other_loop_trades, key)
+    assert _get_total_variation_distance(loop_trades, batch_trades, key) < 1.5 * loop_distance
+
+
+@pytest.mark.parametrize("value", [
+    lambda t: t.amount,
+    lambda t: t.time_window[0],
+    lambda t: t.time_window[2] - t.time_window[0],
+], ids=["amount", "earliest_pickup", "transit"])
+def test_batch_value_distributions_match_loop(sampled_trades, value):
+    loop_trades, _, batch_trades = sampled_trades
+    loop_values = np.array([value(t) for t in loop_trades], dtype=float)
+    batch_values = np.array([value(t) for t in batch_trades], dtype=float)
+    standard_error = np.sqrt((loop_values.var() + batch_values.var()) / NUMBER_OF_CARGOES)
+    assert abs(loop_values.mean() - batch_values.mean()) < 4 * standard_error
+    np.testing.assert_allclose(np.percentile(batch_values, [10, 50, 90]),
+                               np.percentile(loop_values, [10, 50, 90]), rtol=0.05, atol=1)
+
+
+def test_batch_is_reproducible_and_in_network(distribution_world, distribution_shipping, sampled_trades):
+    batch_trades = sampled_trades[2]
+    assert _sample_batch(distribution_world, distribution_shipping, 1) == batch_trades
+    network_ports = set(distribution_world.network.ports)
+    assert all(t.origin_port in network_ports and t.destination_port in network_ports for t in batch_trades)
+    assert all(t.origin_port != t.destination_port for t in batch_trades)
+
+
+def _get_lazy_shipping(seed, world=None, **kwargs):
+    if world is None:
+        world = benchmarks.get_distribution_world(REPOSITORY_PATH, seed)
+    return benchmarks.get_distribution_shipping(world, 20, num_auctions=4, environment_files_path=REPOSITORY_PATH,
+                                                **kwargs)
+
+
+def test_lazy_trades_do_not_depend_on_the_request_order():
+    eager_shipping = _get_lazy_shipping(0)
+    shipping = _get_lazy_shipping(0, lazy_trades=True)
+    other_world = benchmarks.get_distribution_world(REPOSITORY_PATH, 0)
+    other_shipping = _get_lazy_shipping(0, world=other_world, lazy_trades=True)
+    trading_times = shipping.get_trading_times()
+    assert trading_times == eager_shipping.get_trading_times() and len(trading_times) == 4
+    trades = {t: shipping.get_trades(t) for t in trading_times}
+    # draws from the world's random between the requests do not change the trades either
+    other_world.random.random_sample(10)
+    other_trades = {t: other_shipping.get_trades(t) for t in reversed(trading_times)}
+    assert trades == other_trades
+    assert all(0 < len(trades[t]) <= 20 for t in trading_times)
+    assert [shipping.get_trades(t) for t in trading_times] == [trades[t] for t in trading_times]
+
+
+def test_evicted_trades_are_dropped_and_later_trades_kept():
+    shipping = _get_lazy_shipping(1, lazy_trades=True)
+    other_shipping = _get_lazy_shipping(1, lazy_trades=True)
+    trading_times = shipping.get_trading_times()
+    shipping.get_trades(trading_times[0])
+    assert shipping.evict_trades(trading_times[2]) == trading_times[:2]
+    assert shipping.evict_trades(trading_times[2]) == []
+    assert shipping.get_trades(trading_times[0]) == [] and shipping.get_trades(trading_times[1]) == []
+    assert shipping.get_trading_times() == trading_times
+    assert [shipping.get_trades(t) for t in trading_times[2:]] == [other_shipping.get_trades(t)
+                                                                   for t in trading_times[2:]]
@@ -0,0 +1,77 @@
+import copy
+
+import pytest
+
+from mable.combinatorial_auction import BundleWinnerDetermination, CombinatorialAuctionMarket, TradeIndices
+from mable.shipping_market import TimeWindowTrade
+from mable.simulation_space.universe import Port
+from mable.transport_operation import Bid, BundleBid
+
+
+class _Company:
+
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.fixture
+def trades():
+    ports = [Port(f"Port {i}", i, i) for i in range(5)]
+    return [TimeWindowTrade(origin_port=ports[i], destination_port=ports[i + 1], amount=1,
+                            time_window=[i, None, None, None])
+            for i in range(4)]
+
+
+def test_winner_determination_finds_the_optimum(trades):
+    company = _Company("Company")
+    bundle_bids = [BundleBid(amount=41, trades=trades, company=company),
+                   BundleBid(amount=12, trades=trades[:2], company=company),
+                   BundleBid(amount=30, trades=trades[2:], company=company),
+                   BundleBid(amount=14, trades=[trades[2]], company=company),
+                   BundleBid(amount=14, trades=[trades[3]], company=company),
+                   BundleBid(amount=1, trades=[trades[0], trades[3]], company=company)]
+    result = BundleWinnerDetermination(bundle_bids, trades).solve()
+    # the greedy allocations are bids 5 and 3, which leave trade 1 unallocated, and bid 0 for 41
+    assert result.number_allocated_trades == 4
+    assert result.cost == 40
+    assert result.winning_bundles == [1, 3, 4]
+
+
+def test_vcg_payment_adds_the_externality_of_the_winner(trades):
+    company_one = _Company("Company One")
+    company_two = _Company("Company Two")
+    bundle_bids = [BundleBid(amount=10, trades=trades[:2], company=company_one),
+                   BundleBid(amount=6, trades=[trades[0]], company=company_two),
+                   BundleBid(amount=7, trades=[trades[1]], company=company_two),
+                   BundleBid(amount=5, trades=[trades[2]], company=company_one)]
+    result, payments = BundleWinnerDetermination(bundle_bids, trades).determine_payments()
+    assert result.winning_bundles == [0, 3]
+    # without company one trades 0 and 1 cost 13 instead of 10 and trade 2 cannot be allocated
+    assert payments == {0: 10, 3: 5}
+    bundle_bids.append(BundleBid(amount=8, trades=[trades[2]], company=company_two))
+    result, payments = BundleWinnerDetermination(bundle_bids, trades).determine_payments()
+    assert result.winning_bundles == [0, 3]
+    # without company one the cost is 6 + 7 + 8 = 21 instead of 15, i.e. company one gets the premium of 6
+    assert payments == pytest.approx({0: 10 + 6 * 10 / 15, 3: 5 + 6 * 5 / 15})
+
+
+def test_trade_indices_find_trades_and_copies(trades):
+    trade_indices = TradeIndices(trades)
+    assert [trade_indices.get_index(t) for t in trades] == [0, 1, 2, 3]
+    assert trade_indices.get_index(copy.deepcopy(trades[2])) == 2
+    other_trade = copy.deepcopy(trades[0])
+    other_trade.amount = 2
+    assert trade_indices.get_index(other_trade) is None
+
+
+def test_bids_become_bundle_bids_with_unique_trades(trades):
+    trade_indices = TradeIndices(trades)
+    bundle_bid = CombinatorialAuctionMarket._to_bundle_bid(
+        BundleBid(amount=3, trades=[trades[0], trades[1], copy.deepcopy(trades[0])]), trade_indices)
+    assert bundle_bid.trades == trades[:2]
+    assert CombinatorialAuctionMarket._to_bundle_bid(Bid(amount=3, trade=trades[3]), trade_indices).trades \
+        == [trades[3]]
+    unknown_trade = copy.deepcopy(trades[0])
+    unknown_trade.amount = 2
+    assert CombinatorialAuctionMarket._to_bundle_bid(
+        BundleBid(amount=3, trades=[trades[0], unknown_trade]), trade_indices) is None
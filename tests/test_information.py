@@ -0,0 +1,76 @@
+import types
+
+import numpy as np
+import pytest
+
+from mable.competition.information import CompanyHeadquarters
+from mable.extensions.fuel_emissions import ConsumptionRate, Fuel, VesselEngine, VesselWithEngine
+from mable.simulation_space.structure import UnitShippingNetwork
+from mable.simulation_space.universe import Port
+from mable.transport_operation import CargoCapacity, ShippingCompany
+
+
+def _get_vessel(name, location):
+    consumption_rate = ConsumptionRate(base=1, speed_power=2, factor=1)
+    engine = VesselEngine(Fuel(name="Fuel", price=1, energy_coefficient=1, co2_coefficient=1),
+                          1, consumption_rate, consumption_rate, 1, 1)
+    return VesselWithEngine([CargoCapacity(cargo_type="Oil", capacity=100, loading_rate=10)],
+                            location, 10, engine, name=name)
+
+
+def test_nearest_vessels_in_unit_network_are_euclidean():
+    random = np.random.RandomState(0)
+    ports = [Port(f"Port {i}", *random.uniform(0, 1, 2)) for i in range(30)]
+    network = UnitShippingNetwork(ports)
+    fleet = [_get_vessel(f"Vessel {i}", ports[j]) for i, j in enumerate(random.randint(len(ports), size=10))]
+    engine = types.SimpleNamespace(
+        world=types.SimpleNamespace(network=network, current_time=0),
+        shipping_companies=[types.SimpleNamespace(name="Company", fleet=fleet)])
+    nearest_vessels = CompanyHeadquarters(engine).get_nearest_vessels(ports[0], k=3)["Company"]
+    expected = sorted((network.get_distance(v.location, ports[0]), v.name) for v in fleet)[:3]
+    assert [v.name for v, _ in nearest_vessels] == [name for _, name in expected]
+    assert [d for _, d in nearest_vessels] == pytest.approx([d for d, _ in expected])
+
+
+def _get_headquarters(fleet):
+    engine = types.SimpleNamespace(
+        world=types.SimpleNamespace(network=UnitShippingNetwork([]), current_time=0),
+        shipping_companies=[ShippingCompany(fleet, "Company")])
+    return CompanyHeadquarters(engine), engine
+
+
+def test_company_records_only_renew_changed_vessels():
+    ports = [Port("Port One", 0, 0), Port("Port Two", 1, 1)]
+    fleet = [_get_vessel("Vessel One", ports[0]), _get_vessel("Vessel Two", ports[0])]
+    headquarters, engine = _get_headquarters(fleet)
+    records = headquarters.get_company_records()
+    assert headquarters.get_company_records() is records
+    assert [v.name for v in records[0].fleet] == ["Vessel One", "Vessel Two"]
+    assert records[0].fleet[0].schedule is records[0].fleet[0].schedule
+    engine.world.current_time = 1
+    assert headquarters.get_company_records() is records
+    assert headquarters.companies_version == 1
+    fleet[1].location = ports[1]
+    engine.world.current_time = 2
+    new_records = headquarters.get_company_records()
+    assert headquarters.companies_version == 2
+    assert new_records[0].fleet[0] is records[0].fleet[0]
+    assert new_records[0].fleet[1].location == ports[1]
+
+
+def test_get_companies_returns_deprecated_company_copies():
+    fleet = [_get_vessel("Vessel One", Port("Port One", 0, 0))]
+    headquarters, _ = _get_headquarters(fleet)
+    with pytest.deprecated_call():
+        companies = headquarters.get_companies()
+    assert isinstance(companies[0], ShippingCompany) and companies[0].name == "Company"
+    assert isinstance(companies[0].fleet[0], VesselWithEngine) and companies[0].fleet[0] is not fleet[0]
+    assert companies[0].fleet[0].propelling_engine is not fleet[0].propelling_engine
+
+
+def test_network_distances_by_name_and_location():
+    ports = [Port(f"Port {i}", i / 2, 0.0) for i in range(3)]
+    engine = types.SimpleNamespace(
+        world=types.SimpleNamespace(network=UnitShippingNetwork(ports), current_time=0), shipping_companies=[])
+    distances = CompanyHeadquarters(engine).get_network_distances(["Port 0", ports[1]], [ports[2], "Port 0"])
+    np.testing.assert_allclose(distances, [[1, 0], [0.5, 0.5]])
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from mable.extensions import route_building
+from mable.extensions.world_ports import LatLongShippingNetwork
+
+
+def _get_summary(route):
+    """
+    The length, the canals and the end points of a route since the lattice has ties between equally long paths.
+    """
+    return (route.length, tuple(sorted(route.canals))) + tuple(np.asarray(route.points)[[0, -1]].ravel())
+
+
+def test_built_routes_match_routes_computed_on_the_fly(tmp_path, ports, routing_graph_file):
+    ports = ports[:5]
+    route_geometry_file = str(tmp_path / "routes.npz")
+    distance_matrix_file = str(tmp_path / "distances.npy")
+    route_building.build_routes(ports, routing_graph_file, route_geometry_file, distance_matrix_file, processes=2)
+    built_network = LatLongShippingNetwork(
+        ports, precomputed_routes_file=route_geometry_file, distance_matrix_file=distance_matrix_file)
+    assert built_network.is_distance_matrix_current(distance_matrix_file)
+    network = LatLongShippingNetwork(ports, graph_file=routing_graph_file)
+    for i, one_port in enumerate(ports):
+        for j, two_port in enumerate(ports):
+            if i == j:
+                continue
+            expected_routes = network.compute_all_routes_between_points(one_port, two_port)
+            routes = built_network.route_store.get_routes(i, j)
+            # routes of equal length, e.g. the same route found in several canal scenarios, are in no particular order
+            assert sorted(_get_summary(r) for r in routes) == pytest.approx(
+                sorted(_get_summary(r) for r in expected_routes))
+            assert built_network.get_distance(one_port, two_port) == pytest.approx(expected_routes[0].length)
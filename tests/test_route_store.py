@@ -0,0 +1,122 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from mable.extensions.world_ports import (
+    Route, RouteGeometry, RouteStore, convert_precomputed_routes, load_route_store)
+
+
+NUMBER_OF_PORTS = 6
+
+
+@pytest.fixture(scope="module")
+def store_ports(ports):
+    return ports[:NUMBER_OF_PORTS]
+
+
+@pytest.fixture(scope="module")
+def precomputed_routes(store_ports):
+    random = np.random.RandomState(0)
+    precomputed_routes = {}
+    for i, one_port in enumerate(store_ports):
+        for two_port in store_ports[i + 1:]:
+            routes = []
+            for canals in [(), ("Suez",), ("Suez", "Panama")][:random.randint(1, 4)]:
+                points = [(one_port.longitude, one_port.latitude)]
+                points += [tuple(p) for p in random.uniform(-80, 80, (random.randint(0, 5), 2)).tolist()]
+                points.append((two_port.longitude, two_port.latitude))
+                routes.append(Route("", points, float(random.randint(100, 10000)), canals))
+            precomputed_routes[f"{one_port.name}{two_port.name}"] = sorted(routes, key=lambda r: r.length)
+    return precomputed_routes
+
+
+@pytest.fixture(scope="module")
+def precomputed_routes_file(tmp_path_factory, precomputed_routes):
+    routes_file = str(tmp_path_factory.mktemp("routes") / "routes.pkl")
+    with open(routes_file, "wb") as file:
+        pickle.dump(precomputed_routes, file)
+    return routes_file
+
+
+def test_converted_routes_match_pickled_routes(tmp_path, store_ports, precomputed_routes_file):
+    route_geometry_file = str(tmp_path / "routes.npz")
+    convert_precomputed_routes(precomputed_routes_file, route_geometry_file, store_ports)
+    pickled_store = load_route_store(precomputed_routes_file, store_ports)
+    converted_store = load_route_store(route_geometry_file, store_ports)
+    assert load_route_store(route_geometry_file, store_ports) is converted_store
+    assert len(converted_store) == len(pickled_store) == NUMBER_OF_PORTS * (NUMBER_OF_PORTS - 1) // 2
+    for i in range(NUMBER_OF_PORTS):
+        for j in range(NUMBER_OF_PORTS):
+            if i != j:
+                pickled_routes = pickled_store.get_routes(i, j)
+                converted_routes = converted_store.get_routes(i, j)
+                assert [r.length for r in converted_routes] == [r.length for r in pickled_routes]
+                assert [set(r.canals) for r in converted_routes] == [set(r.canals) for r in pickled_routes]
+                assert [r.route for r in converted_routes] == [r.route for r in pickled_routes]
+                assert [r.as_tuple() for r in converted_routes] == [r.as_tuple() for r in pickled_routes]
+
+
+def test_geometry_routes_equal_precomputed_routes(store_ports, precomputed_routes):
+    route_geometry = RouteGeometry.from_precomputed_routes(precomputed_routes, store_ports)
+    routes = [r for pair_routes in precomputed_routes.values() for r in pair_routes]
+    geometry_routes = [route_geometry.get_route(i) for i in range(len(route_geometry.lengths))]
+    assert geometry_routes == routes
+    assert {hash(r) for r in geometry_routes} == {hash(r) for r in routes}
+
+
+@pytest.mark.parametrize("number_of_canals, dtype", [(8, np.uint8), (9, np.uint16), (64, np.uint64)])
+def test_canal_flags_have_a_bit_per_canal(store_ports, number_of_canals, dtype):
+    start = (store_ports[0].longitude, store_ports[0].latitude)
+    end = (store_ports[1].longitude, store_ports[1].latitude)
+    canal_names = tuple(f"Canal {i}" for i in range(number_of_canals))
+    routes = [Route("", [start, end], 1. + i, (one_canal,)) for i, one_canal in enumerate(canal_names)]
+    route_geometry = RouteGeometry.from_precomputed_routes(
+        {f"{store_ports[0].name}{store_ports[1].name}": routes}, store_ports, canal_names=())
+    assert route_geometry.canal_flags.dtype == dtype
+    assert [route_geometry.get_route(i).canals for i in range(number_of_canals)] == [(c,) for c in canal_names]
+
+
+def test_too_many_canals_are_rejected(store_ports):
+    start = (store_ports[0].longitude, store_ports[0].latitude)
+    end = (store_ports[1].longitude, store_ports[1].latitude)
+    routes = [Route("", [start, end], 1., tuple(f"Canal {i}" for i in range(RouteGeometry.MAX_NUMBER_OF_CANALS + 1)))]
+    with pytest.raises(ValueError):
+        RouteGeometry.from_precomputed_routes({f"{store_ports[0].name}{store_ports[1].name}": routes}, store_ports)
+
+
+def _get_route(points, length, canals=()):
+    return Route("", list(points), length, canals)
+
+
+def test_reverse_views_do_not_change_stored_routes():
+    route = _get_route([(0, 0), (10, 0), (10, 10)], 1200., ("Suez", "Panama"))
+    route_store = RouteStore({(0, 1): [route]})
+    forward_view, = route_store.get_routes(0, 1)
+    reverse_view, = route_store.get_routes(1, 0)
+    assert list(forward_view.route) == [(0, 0), (10, 0), (10, 10)]
+    assert list(reverse_view.route) == [(10, 10), (10, 0), (0, 0)]
+    assert list(reverse_view.canals) == ["Panama", "Suez"] and reverse_view.length == 1200.
+    np.testing.assert_allclose(reverse_view.cumulative_length,
+                               forward_view.cumulative_length[-1] - forward_view.cumulative_length[::-1])
+    np.testing.assert_allclose(reverse_view.get_point_at_distance(reverse_view.cumulative_length[1]), (10, 0))
+    with pytest.raises(TypeError):
+        reverse_view.route[0] = (1, 1)
+    assert route.route == [(0, 0), (10, 0), (10, 10)] and route.canals == ("Suez", "Panama")
+    assert route_store.get_routes(1, 0) is route_store.get_routes(1, 0)
+    assert route_store.get_routes(0, 2) is None
+
+
+def test_routes_are_stored_once_per_port_pair():
+    route_store = RouteStore()
+    direct_route = _get_route([(0, 0), (1, 1)], 500.)
+    canal_route = _get_route([(0, 0), (2, 2), (1, 1)], 300., ("Suez",))
+    route_store.add_routes(0, 1, [canal_route, direct_route])
+    route_store.add_routes(1, 0, [_get_route([(1, 1), (0, 0)], 1.)])
+    assert len(route_store) == 1 and route_store.has_routes(1, 0)
+    assert route_store.get_route_lengths(1, 0) == [300., 500.]
+    assert route_store.get_route_lengths(1, 0, excluded_canals={"Suez"}) == [500.]
+    assert route_store.get_route_lengths(0, 2) is None
+    assert route_store.get_canal_pairs("Suez") == [(0, 1)] and route_store.get_canal_pairs("Panama") == []
+    np.testing.assert_array_equal(
+        route_store.get_distance_matrix(3), [[0, 300, np.nan], [300, 0, np.nan], [np.nan, np.nan, 0]])
@@ -0,0 +1,54 @@
+import networkx
+import numpy as np
+import pytest
+
+from mable.extensions.routing_graph import CsrRoutingGraph
+from mable.extensions.world_ports import LatLongShippingNetwork
+
+
+def _get_path_length(graph, path):
+    return sum(graph.get_edge_weight(node_id_one, node_id_two) for node_id_one, node_id_two in zip(path, path[1:]))
+
+
+def _get_node_id_pairs(graph, number_of_pairs=100):
+    return np.random.RandomState(1).randint(0, graph.number_of_nodes, size=(number_of_pairs, 2)).tolist()
+
+
+def test_dijkstra_matches_networkx(routing_graph, routing_graph_file):
+    networkx_graph = LatLongShippingNetwork(graph_file=routing_graph_file).generate_route_graph_from_file()
+    for source_id in range(0, routing_graph.number_of_nodes, 17):
+        distances, _ = routing_graph.get_shortest_path_tree(source_id)
+        networkx_distances = networkx.single_source_dijkstra_path_length(
+            networkx_graph, routing_graph.get_node(source_id), weight="weight")
+        for node_id in range(routing_graph.number_of_nodes):
+            expected = networkx_distances.get(routing_graph.get_node(node_id), np.inf)
+            assert distances[node_id] == pytest.approx(expected, rel=1e-9)
+
+
+@pytest.mark.parametrize("number_of_landmarks,search", [
+    (0, "get_shortest_path"), (8, "get_shortest_path"), (8, "get_shortest_path_by_astar")])
+def test_point_to_point_search_matches_dijkstra(routing_graph_file, number_of_landmarks, search):
+    graph = CsrRoutingGraph.from_file(routing_graph_file)
+    if number_of_landmarks > 0:
+        graph.set_landmarks(*graph.compute_landmarks(number_of_landmarks))
+    for source_id, target_id in _get_node_id_pairs(graph):
+        distances, predecessors = graph.get_shortest_path_tree(source_id)
+        path = getattr(graph, search)(source_id, target_id)
+        if np.isinf(distances[target_id]):
+            assert path is None
+        else:
+            assert path[0] == source_id and path[-1] == target_id
+            assert _get_path_length(graph, path) == pytest.approx(distances[target_id], rel=1e-9)
+            dijkstra_path = graph.get_path_from_tree(predecessors, source_id, target_id)
+            assert _get_path_length(graph, dijkstra_path) == pytest.approx(distances[target_id], rel=1e-9)
+
+
+@pytest.mark.parametrize("number_of_landmarks", [0, 1])
+def test_point_to_point_search_across_components(number_of_landmarks):
+    graph = CsrRoutingGraph.from_edges([(0, 0, 1, 0, 1), (1, 0, 2, 0, 1), (10, 10, 11, 10, 1)])
+    if number_of_landmarks > 0:
+        graph.set_landmarks(*graph.compute_landmarks(number_of_landmarks))
+    node_ids = [graph.get_node_id(node) for node in [(0, 0), (2, 0), (10, 10), (11, 10)]]
+    assert graph.get_shortest_path(node_ids[0], node_ids[1]) == [node_ids[0], graph.get_node_id((1, 0)), node_ids[1]]
+    assert graph.get_shortest_path(node_ids[0], node_ids[2]) is None
+    assert graph.get_shortest_path(node_ids[2], node_ids[3]) == [node_ids[2], node_ids[3]]
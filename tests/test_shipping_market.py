@@ -0,0 +1,161 @@
+import asyncio
+import copy
+import types
+
+import numpy as np
+import pytest
+
+from mable.cargo_bidding import TradingCompany
+from mable.competition.generation import AuctionCargoEvent
+from mable.shipping_market import (
+    AuctionLedger, Contract, ContractView, ReadOnlyView, Shipping, TimeWindowTrade, TimeWindowTradeView, Trade,
+    TradeStatus, TradeView)
+from mable.simulation_space.universe import Port
+
+
+class _Company:
+
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.fixture
+def company():
+    return _Company("Company")
+
+
+@pytest.fixture
+def contracts():
+    port_one = Port("Port One", 0, 0)
+    port_two = Port("Port Two", 1, 1)
+    return [Contract(payment=1, trade=Trade(origin_port=port_one, destination_port=port_two, amount=1)),
+            Contract(payment=2, trade=Trade(origin_port=port_two, destination_port=port_one, amount=2))]
+
+
+def test_read_only_ledger_follows_every_modification(company, contracts):
+    ledger = AuctionLedger([company])
+    ledger[company].append(contracts[0])
+    assert [c.payment for c in ledger.read_only_ledger[company.name]] == [1]
+    ledger[company][0] = contracts[1]
+    assert [c.payment for c in ledger.read_only_ledger[company.name]] == [2]
+    ledger[company].pop()
+    assert ledger.read_only_ledger[company.name] == ()
+    read_only_ledger = ledger.read_only_ledger
+    assert ledger.read_only_ledger is read_only_ledger
+
+
+def test_copied_ledger_follows_modifications(company, contracts):
+    ledger = AuctionLedger([company])
+    ledger[company].append(contracts[0])
+    ledger_copy = copy.deepcopy(ledger)
+    copied_company = next(iter(ledger_copy.ledger))
+    ledger_copy[copied_company].append(contracts[1])
+    assert len(ledger_copy.read_only_ledger[company.name]) == 2
+    assert len(ledger.read_only_ledger[company.name]) == 1
+
+
+def test_contract_view_wraps_nested_objects(company, contracts):
+    ledger = AuctionLedger([company])
+    ledger[company].append(contracts[0])
+    contract_view = ledger.get_contracts_for_company_view(company)[0]
+    port_view = contract_view.trade.origin_port
+    assert port_view == contracts[0].trade.origin_port and contracts[0].trade.origin_port == port_view
+    assert {contracts[0].trade.origin_port: 1}[port_view] == 1
+    with pytest.raises(AttributeError):
+        contract_view.trade.amount = 5
+    with pytest.raises(AttributeError):
+        port_view.name = "Other Port"
+    assert contracts[0].trade.origin_port.name == "Port One"
+
+
+class _Holder:
+
+    def __init__(self, values):
+        self.values = values
+        self._private_values = values
+
+
+def test_get_read_only_wraps_containers():
+    port = Port("Port One", 0, 0)
+    holder = _Holder([1])
+    read_only = ReadOnlyView.get_read_only(
+        {"ports": [port], "holders": [holder], "distances": np.zeros(2), "names": {"Port One"}})
+    with pytest.raises(TypeError):
+        read_only["ports"] = []
+    assert read_only["ports"][0] is port
+    assert type(read_only["holders"][0]) is ReadOnlyView and read_only["holders"][0] == holder
+    assert not read_only["distances"].flags.writeable
+    assert read_only["names"] == frozenset({"Port One"})
+
+
+def test_views_do_not_leak_modifiable_objects(company, contracts):
+    contract_view = ContractView(contracts[0])
+    assert type(contract_view) is ContractView and not isinstance(contract_view, Contract)
+    assert type(contract_view.trade) is TradeView
+    assert type(TradeView.get_trade_view(TimeWindowTrade(origin_port=None, destination_port=None, amount=1))) \
+        is TimeWindowTradeView
+    assert copy.deepcopy(contract_view) is contract_view
+    holder_view = ReadOnlyView(_Holder([1]))
+    holder_view._private_values.append(2)
+    assert holder_view.values == [1]
+
+
+class _ReceivingCompany(TradingCompany):
+
+    def __init__(self, name):
+        super().__init__([], name)
+        self.errors = []
+
+    def receive(self, contracts, auction_ledger=None, *args, **kwargs):
+        modifications = [lambda: setattr(contracts[0], "payment", 0),
+                         lambda: setattr(contracts[0].trade, "amount", 0),
+                         lambda: auction_ledger[self.name].append(contracts[0]),
+                         lambda: auction_ledger.pop(self.name)]
+        for one_modification in modifications:
+            try:
+                one_modification()
+            except (AttributeError, TypeError) as e:
+                self.errors.append(e)
+
+
+def test_companies_cannot_modify_received_contracts(contracts):
+    company = _ReceivingCompany("Company")
+    ledger = AuctionLedger([company])
+    ledger[company].append(contracts[0])
+    asyncio.run(AuctionCargoEvent._company_receive_timeout(company, ledger))
+    assert len(company.errors) == 4
+    assert contracts[0].payment == 1 and contracts[0].trade.amount == 1
+    assert list(ledger[company]) == [contracts[0]]
+
+
+class _FixedShipping(Shipping):
+
+    def initialise_trades(self, trades):
+        self.add_to_all_trades(trades)
+
+
+def _get_probability_trades(probabilities):
+    port_one = Port("Port One", 0, 0)
+    port_two = Port("Port Two", 1, 1)
+    return [Trade(origin_port=port_one, destination_port=port_two, amount=1, probability=p) for p in probabilities]
+
+
+def test_realised_trades_match_drawing_each_trade():
+    probabilities = np.random.RandomState(1).uniform(0, 1, 500).tolist() + [0, 1, 0.5]
+    trades = _get_probability_trades(probabilities)
+    shipping = _FixedShipping(trades)
+    is_realised = shipping.realise_trades(trades, np.random.RandomState(0))
+    random = np.random.RandomState(0)
+    expected = [bool(random.choice([0, 1], p=[1 - p, p])) for p in probabilities]
+    assert is_realised.tolist() == expected
+
+
+def test_get_trades_marks_unrealised_trades():
+    trades = _get_probability_trades([1, 0, 1, 0])
+    shipping = _FixedShipping(trades)
+    shipping.set_engine(types.SimpleNamespace(world=types.SimpleNamespace(random=np.random.RandomState(0))))
+    occurred_trades = shipping.get_trades(0)
+    assert [id(t) for t in occurred_trades] == [id(trades[0]), id(trades[2])]
+    assert [t.status for t in trades] == [TradeStatus.UNKNOWN, TradeStatus.NOT_REALISED] * 2
+    assert shipping.get_trades(0) is occurred_trades
+    assert shipping.get_trades(1) == []
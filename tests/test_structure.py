@@ -0,0 +1,44 @@
+import numpy as np
+
+from mable.simulation_space.structure import UnitShippingNetwork
+from mable.simulation_space.universe import Location, Port
+
+
+def _get_network():
+    return UnitShippingNetwork([Port(f"p{i}", float(i), 0.0) for i in range(5)])
+
+
+def test_distance_cache_only_keeps_ports():
+    network = _get_network()
+    ports = network.ports
+    for i in range(100):
+        network.get_distance(Location(i, 1, f"l{i}"), ports[0])
+    assert network.distance_cache_info.size == 0
+    network.get_distance(ports[0], ports[1])
+    network.get_distance(Port("p0", 0.0, 0.0), Port("p1", 1.0, 0.0))
+    cache_info = network.distance_cache_info
+    assert cache_info.size == 1 and cache_info.hits == 1
+
+
+def test_clear_distance_cache_resets_port_distances():
+    network = _get_network()
+    ports = network.ports
+    network.get_distances(ports, ports)
+    network.clear_distance_cache()
+    assert network.distance_cache_info.size == 0
+    misses = network.distance_cache_info.misses
+    network.get_distances(ports, ports)
+    assert network.distance_cache_info.misses == misses + len(ports) ** 2
+
+
+def test_distances_match_single_distances():
+    network = _get_network()
+    ports = network.ports
+    origins = [ports[3], "p1", Location(0.5, 2, "l0"), ports[3]]
+    destinations = [Location(2, 2, "l1"), ports[0], "p4", ports[2], "p2"]
+    distances = network.get_distances(origins, destinations)
+    assert distances.shape == (4, 5)
+    np.testing.assert_allclose(
+        distances, [[network.get_distance(o, d) for d in destinations] for o in origins])
+    assert network.get_distances([], destinations).shape == (0, 5)
+    assert network.get_distances(origins, []).shape == (4, 0)
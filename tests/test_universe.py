@@ -0,0 +1,36 @@
+import gc
+import pickle
+
+from mable.simulation_space.universe import Port, PORT_REGISTRY
+
+
+class _PortWithCountry(Port):
+
+    def __init__(self, name, x, y, country):
+        super().__init__(name, x, y)
+        self._country = country
+
+
+def test_equal_ports_share_id():
+    port = Port("registry test", 1.0, 2.0)
+    other_port = Port("registry test", 1.0, 2.0)
+    assert port == other_port and port.port_id == other_port.port_id and hash(port) == hash(other_port)
+    assert port != Port("registry test", 1.0, 3.0)
+    assert pickle.loads(pickle.dumps(port)) == port
+
+
+def test_registry_releases_unused_ports():
+    gc.collect()
+    number_of_ports = len(PORT_REGISTRY)
+    ports = [Port(f"released {i}", float(i), 0.0) for i in range(100)]
+    assert len(PORT_REGISTRY) == number_of_ports + 100
+    port_id = ports[0].port_id
+    del ports[1:]
+    gc.collect()
+    assert len(PORT_REGISTRY) == number_of_ports + 1
+    assert Port("released 0", 0.0, 0.0).port_id == port_id
+
+
+def test_to_json_keeps_subclass_fields():
+    port = _PortWithCountry("json test", 1.0, 2.0, "UK")
+    assert port.to_json() == {"_x": 1.0, "_y": 2.0, "_name": "json test", "_country": "UK"}
@@ -0,0 +1,162 @@
+import concurrent.futures
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from mable import benchmarks
+from mable.extensions.world_ports import LatLongShippingNetwork, NAUTICAL_MILES_PER_METRE, Route, WorldVessel
+from mable.simulation_space.universe import OnJourney
+from mable.transport_operation import CargoCapacity
+
+
+def _get_random_route(random, number_of_points):
+    return [tuple(p) for p in np.column_stack((
+        random.uniform(-180, 180, number_of_points), random.uniform(-80, 80, number_of_points))).tolist()]
+
+
+def _get_scalar_segment_lengths(route):
+    return [LatLongShippingNetwork.get_long_lat_dist(lat_one, long_one, lat_two, long_two)
+            for (long_one, lat_one), (long_two, lat_two) in zip(route, route[1:])]
+
+
+def test_long_lat_dists_match_scalar_haversine(ports):
+    latitudes = np.array([p.latitude for p in ports])
+    longitudes = np.array([p.longitude for p in ports])
+    distances = LatLongShippingNetwork.get_long_lat_dists(
+        latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+    expected = [LatLongShippingNetwork.get_long_lat_dist(lat_one, long_one, lat_two, long_two)
+                for lat_one, long_one, lat_two, long_two
+                in zip(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])]
+    np.testing.assert_allclose(distances, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("number_of_points", [0, 1, 2, 50, 1000])
+def test_route_length_matches_scalar_loop(number_of_points):
+    random = np.random.RandomState(number_of_points)
+    for _ in range(20):
+        route = _get_random_route(random, number_of_points)
+        expected = round(sum(_get_scalar_segment_lengths(route)) * NAUTICAL_MILES_PER_METRE, 2)
+        assert LatLongShippingNetwork.compute_route_length(route) == pytest.approx(expected, abs=0.01)
+
+
+def test_cumulative_route_length_matches_scalar_prefix_sums():
+    route = _get_random_route(np.random.RandomState(0), 200)
+    expected = np.concatenate(([0], np.cumsum(_get_scalar_segment_lengths(route)))) * NAUTICAL_MILES_PER_METRE
+    cumulative_length = LatLongShippingNetwork.compute_cumulative_route_length(route)
+    np.testing.assert_allclose(cumulative_length, expected, rtol=1e-9)
+    assert cumulative_length[-1] == pytest.approx(LatLongShippingNetwork.compute_route_length(route), abs=0.01)
+
+
+def test_route_cache_is_consistent_under_concurrent_queries(ports, routing_graph_file):
+    network = LatLongShippingNetwork(ports[:10], graph_file=routing_graph_file, route_cache_size=3)
+    random = np.random.RandomState(0)
+    longitudes = random.uniform(-150, 150, (40, 2))
+    latitudes = random.uniform(-60, 60, (40, 2))
+    queries = [(longitudes[i, 0], latitudes[i, 0], longitudes[i, 1], latitudes[i, 1]) for i in range(40)]
+    expected = [network.get_shortest_route_between_points(*q) for q in queries]
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        routes = list(executor.map(lambda q: network.get_shortest_route_between_points(*q), queries * 10))
+    assert routes == expected * 10
+    assert len(network._route_cache) == 3
+
+
+def test_distance_matrix_matches_precomputed_routes(tmp_path, ports):
+    ports = ports[:12]
+    precomputed_routes_file = str(tmp_path / "routes.pkl")
+    with open(precomputed_routes_file, "wb") as file:
+        pickle.dump(benchmarks._get_synthetic_precomputed_routes(ports, np.random.RandomState(0)), file)
+    distance_matrix_file = str(tmp_path / "distances.npy")
+    network = LatLongShippingNetwork(
+        ports, precomputed_routes_file=precomputed_routes_file, distance_matrix_file=distance_matrix_file)
+    assert network.is_distance_matrix_current(distance_matrix_file)
+    network_without_matrix = LatLongShippingNetwork(ports, precomputed_routes_file=precomputed_routes_file)
+    for one_port in ports:
+        for two_port in ports:
+            assert network.get_distance(one_port, two_port) == network_without_matrix.get_distance(one_port, two_port)
+    distance_matrix = network.load_distance_matrix(distance_matrix_file)
+    distance_matrix[0, 1] = -1
+    assert network.load_distance_matrix(distance_matrix_file)[0, 1] == network.get_distance(ports[0], ports[1])
+
+
+def test_distance_matrix_is_outdated_for_other_ports_or_routes(tmp_path, ports):
+    ports = ports[:5]
+    precomputed_routes_file = str(tmp_path / "routes.pkl")
+    with open(precomputed_routes_file, "wb") as file:
+        pickle.dump(benchmarks._get_synthetic_precomputed_routes(ports, np.random.RandomState(0)), file)
+    distance_matrix_file = str(tmp_path / "distances.npy")
+    network = LatLongShippingNetwork(ports, precomputed_routes_file=precomputed_routes_file)
+    assert not network.is_distance_matrix_current(distance_matrix_file)
+    network.build_distance_matrix(distance_matrix_file)
+    assert network.is_distance_matrix_current(distance_matrix_file)
+    other_network = LatLongShippingNetwork(ports[::-1], precomputed_routes_file=precomputed_routes_file)
+    assert not other_network.is_distance_matrix_current(distance_matrix_file)
+    with pytest.raises(ValueError):
+        other_network.load_distance_matrix(distance_matrix_file)
+    modification_time = os.path.getmtime(precomputed_routes_file) + 10
+    os.utime(precomputed_routes_file, (modification_time, modification_time))
+    assert not network.is_distance_matrix_current(distance_matrix_file)
+
+
+def test_point_at_distance_interpolates_on_the_segment():
+    route = Route("", [(0, 0), (0, 10), (170, 10), (-170, 10)], 0)
+    cumulative_length = route.cumulative_length
+    for i, point in enumerate(route.route):
+        np.testing.assert_allclose(route.get_point_at_distance(cumulative_length[i]), point, atol=1e-9)
+    long_, lat_ = route.get_point_at_distance(cumulative_length[0] + (cumulative_length[1] - cumulative_length[0]) / 4)
+    assert long_ == 0 and lat_ == pytest.approx(2.5)
+    long_, lat_ = route.get_point_at_distance((cumulative_length[2] + cumulative_length[3]) / 2)
+    assert abs(long_) == pytest.approx(180) and lat_ == pytest.approx(10)
+    assert route.get_point_at_distance(-1) == (0, 0)
+    assert route.get_point_at_distance(cumulative_length[-1] + 1) == (-170, 10)
+    assert Route("", [(5, 5)], 0).get_point_at_distance(1) == (5, 5)
+
+
+def test_journey_location_follows_the_route_in_both_directions(tmp_path, ports):
+    ports = ports[:2]
+    start = (ports[0].longitude, ports[0].latitude)
+    end = (ports[1].longitude, ports[1].latitude)
+    route = Route("", [start, (0, 0), end], 1000., ())
+    precomputed_routes_file = str(tmp_path / "routes.pkl")
+    with open(precomputed_routes_file, "wb") as file:
+        pickle.dump({f"{ports[0].name}{ports[1].name}": [route]}, file)
+    network = LatLongShippingNetwork(ports, precomputed_routes_file=precomputed_routes_file)
+    vessel = WorldVessel([CargoCapacity(cargo_type="Oil", loading_rate=1, capacity=1)], ports[0], 10)
+    travel_time = vessel.get_travel_time(route.length)
+    journey = network.get_journey(ports[0], ports[1], 0)
+    reverse_journey = network.get_journey(ports[1], ports[0], 0)
+    assert network.get_journey_location(journey, vessel, 0) == ports[0]
+    assert network.get_journey_location(journey, vessel, travel_time) == ports[1]
+    for percentage in [0.1, 0.5, 0.9]:
+        location = network.get_journey_location(journey, vessel, percentage * travel_time)
+        expected = route.get_point_at_distance(percentage * route.cumulative_length[-1])
+        assert (location.longitude, location.latitude) == pytest.approx(expected)
+        reverse_location = network.get_journey_location(reverse_journey, vessel, (1 - percentage) * travel_time)
+        assert (reverse_location.longitude, reverse_location.latitude) == pytest.approx(expected)
+
+
+def test_vessel_locations_match_single_vessel_locations(tmp_path, ports):
+    ports = ports[:3]
+    precomputed_routes = {
+        f"{one_port.name}{two_port.name}": [Route(
+            "", [(one_port.longitude, one_port.latitude), (20. * i, 10. * j), (two_port.longitude, two_port.latitude)],
+            1000. * (i + j), ())]
+        for i, one_port in enumerate(ports) for j, two_port in enumerate(ports) if i < j}
+    precomputed_routes_file = str(tmp_path / "routes.pkl")
+    with open(precomputed_routes_file, "wb") as file:
+        pickle.dump(precomputed_routes, file)
+    network = LatLongShippingNetwork(ports, precomputed_routes_file=precomputed_routes_file)
+    locations = [ports[0], ports[2].name,
+                 network.get_journey(ports[0], ports[1], 0),
+                 network.get_journey(ports[2], ports[0], 50),
+                 network.get_journey(ports[1], ports[0], 100),
+                 network.get_journey(ports[1], ports[2], 0),
+                 OnJourney(origin=ports[1], destination=ports[2], start_time=80)]
+    vessels = [WorldVessel([CargoCapacity(cargo_type="Oil", loading_rate=1, capacity=1)], one_location, 10)
+               for one_location in locations]
+    coordinates = network.get_vessel_locations(vessels, 100)
+    expected = [(one_location.x, one_location.y) for one_location in
+                (network.get_vessel_location(one_vessel, 100) for one_vessel in vessels)]
+    np.testing.assert_allclose(coordinates, expected)
+    assert network.get_vessel_locations([], 100).shape == (0, 2)